@@ -0,0 +1,249 @@
+""" Benchmark flattening the StatsBomb events into dataframes.
+
+Compares flattening each event into a dictionary and creating the dataframe from the list of
+dictionaries (before, a frozen copy of the mplsoccer 1.4.0 code) with flattening the events
+straight into columns (after).
+The bundled fixture events are repeated to the size of a full match (around 3500 events).
+
+Run from the repository root with mplsoccer installed (pip install -e .):
+python benchmarks/bench_flatten_event.py
+"""
+
+import copy
+import gc
+import json
+import os
+import time
+import tracemalloc
+
+import pandas as pd
+
+from mplsoccer.statsbomb import flatten_event
+
+DATA = os.path.join(os.path.dirname(__file__), '..', 'tests', 'data', 'statsbomb')
+MATCH_ID = 7478
+NUM_EVENTS = 3500
+REPEATS = 20
+
+
+def full_match(path, num_events=NUM_EVENTS):
+    """ Repeat the fixture events, with new event ids, to the size of a full match."""
+    with open(path, encoding='utf-8') as file:
+        events = json.load(file)
+    match = []
+    copy_num = 0
+    while len(match) < num_events:
+        suffix = f'-{copy_num}'
+        for event in copy.deepcopy(events):
+            event['id'] = event['id'] + suffix
+            event['index'] = len(match) + 1
+            if 'related_events' in event:
+                event['related_events'] = [related + suffix for related in event['related_events']]
+            match.append(event)
+        copy_num += 1
+    return match[:num_events]
+
+
+# A frozen copy of the previous implementation (mplsoccer 1.4.0), so the comparison does not
+# change when the current flatten_event helpers change.
+
+_COLS_TO_DROP = ['pass_through_ball', 'pass_outswinging', 'pass_inswinging', 'clearance_head',
+                 'clearance_left_foot', 'clearance_right_foot', 'pass_straight',
+                 'clearance_other', 'goalkeeper_punched_out',
+                 'goalkeeper_shot_saved_off_target', 'shot_saved_off_target',
+                 'goalkeeper_shot_saved_to_post', 'shot_saved_to_post', 'goalkeeper_lost_out',
+                 'goalkeeper_lost_in_play', 'goalkeeper_success_out',
+                 'goalkeeper_success_in_play', 'goalkeeper_saved_to_post',
+                 'shot_kick_off', 'goalkeeper_penalty_saved_to_post']
+
+
+def _flatten_location(row, value, keyword=''):
+    """ Flatten a list of locations into dictionary keys (x, y, z)."""
+    if len(value) == 2:
+        row[f'{keyword}x'], row[f'{keyword}y'] = value
+    elif len(value) == 3:
+        row[f'{keyword}x'], row[f'{keyword}y'], row[f'{keyword}z'] = value
+    else:
+        msg = 'location length not equal to 2 (x, y) or 3 (x, y, z)'
+        raise AssertionError(msg)
+
+
+def _flatten_freeze(data, match_id, event_id):
+    """ Flatten the freeze-frame events."""
+    for row in data:
+        row['match_id'] = match_id
+        row['id'] = event_id
+        for key in list(row):
+            value = row[key]
+            if key == 'location':
+                _flatten_location(row, value)
+                del row['location']
+            elif key in ['player', 'position']:
+                for nested_key in value:
+                    row[f'{key}_{nested_key}'] = value[nested_key]
+                del row[key]
+    return data
+
+
+def _flatten_tactic(data, match_id, event_id):
+    """ Flatten the tactics events."""
+    for row in data:
+        row['match_id'] = match_id
+        row['id'] = event_id
+        for key in list(row):
+            if key in ['player', 'position']:
+                value = row[key]
+                for nested_key in value:
+                    row[f'{key}_{nested_key}'] = value[nested_key]
+                del row[key]
+    return data
+
+
+def _flatten_list_of_lists(list_of_lists, key):
+    """ Flatten a list of lists into a list"""
+    flat_list = []
+    for sublist in list_of_lists:
+        for idx, item in enumerate(sublist):
+            item[key] = idx + 1
+            flat_list.append(item)
+    return flat_list
+
+
+def _event_dataframe(data):
+    """ Transform the event dictionary into a dataframe."""
+    df = pd.DataFrame(data)
+    if df.empty:
+        return None
+    # tactics_formation from float to string
+    mask = df['tactics_formation'].notnull()
+    tactics = df.loc[mask, 'tactics_formation'].astype(int).astype(str)
+    df['tactics_formation'] = df['tactics_formation'].astype(str)
+    df.loc[mask, 'tactics_formation'] = tactics
+    df.loc[~mask, 'tactics_formation'] = None
+    df['timestamp'] = pd.to_datetime(df['timestamp']).dt.time
+    df.sort_values(['period', 'timestamp', 'index'], inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    for col in ['counterpress', 'under_pressure', 'off_camera', 'out']:
+        if col in df.columns:
+            df[col] = df[col].astype(float)
+    return df
+
+
+def _related_dataframe(data, df_events):
+    """ Transform the related-events dictionary into a dataframe. For carries, we also
+    ensure that both the carry and the related event are related both ways.
+    Sometimes another event is not related to the carry event (but it is the other way round)"""
+    df = pd.DataFrame(data)
+    if df.empty:
+        return None
+    cols = ['id', 'index', 'type_name']
+    df = df.merge(df_events[cols].rename({'id': 'id_related'}, axis='columns'),
+                  how='left', on='id_related', validate='m:1',
+                  suffixes=('', '_related'))
+    df_carry = df[df['type_name'] == 'Carry'].copy()
+    df_carry.rename({'id': 'id_related',
+                     'index': 'index_related',
+                     'type_name': 'type_name_related',
+                     'id_related': 'id',
+                     'index_related': 'index',
+                     'type_name_related': 'type_name'},
+                    axis='columns', inplace=True)
+    df = pd.concat([df, df_carry]).drop_duplicates()
+    return df
+
+
+def flatten_rows(events, match_id):
+    """ The previous implementation: flatten to dictionaries then create the dataframes."""
+    related = []
+    freeze = []
+    tactics = []
+    for row in events:
+        row['match_id'] = match_id
+        for key in list(row):
+            if isinstance(row[key], dict):
+                for nested_key in list(row[key]):
+                    nested_value = row[key][nested_key]
+                    if nested_key == 'end_location':
+                        _flatten_location(row, nested_value, keyword='end_')
+                    elif nested_key == 'aerial_won':
+                        row[f'{nested_key}'] = nested_value
+                    elif nested_key in ['outcome', 'body_part', 'technique', 'aerial_won']:
+                        for k in nested_value:
+                            row[f'{nested_key}_{k}'] = nested_value[k]
+                    elif nested_key == 'freeze_frame':
+                        freeze.append(_flatten_freeze(nested_value, match_id, row['id']))
+                    elif nested_key == 'lineup':
+                        tactics.append(_flatten_tactic(nested_value, match_id, row['id']))
+                    elif nested_key == 'type':
+                        for k in nested_value:
+                            row[f'sub_{nested_key}_{k}'] = nested_value[k]
+                    elif isinstance(nested_value, dict):
+                        for k in nested_value:
+                            row[f'{key}_{nested_key}_{k}'] = nested_value[k]
+                    else:
+                        row[f'{key}_{nested_key}'] = nested_value
+                del row[key]
+        if 'location' in row:
+            _flatten_location(row, row['location'])
+            del row['location']
+        row['type_name'] = row['type_name'].replace('Ball Receipt*', 'Ball Receipt')
+        # pass through ball is deprecated now, but it was not always added to technique name
+        if 'pass_through_ball' in row:
+            row['technique_name'] = 'Through Ball'
+        for col in _COLS_TO_DROP:
+            row.pop(col, None)
+        if 'related_events' in row:
+            related.extend({'match_id': match_id, 'id': row['id'], 'index': row['index'],
+                            'type_name': row['type_name'], 'id_related': related_event}
+                           for related_event in row['related_events'])
+
+            del row['related_events']
+    tactics = _flatten_list_of_lists(tactics, key='event_tactics_id')
+    freeze = _flatten_list_of_lists(freeze, key='event_freeze_id')
+    events = _event_dataframe(events)
+    related = _related_dataframe(related, events)
+    return events, related, pd.DataFrame(freeze), pd.DataFrame(tactics)
+
+
+def flatten_columns(events, match_id):
+    """ The columnar implementation."""
+    return flatten_event(events, match_id, dataframe=True)
+
+
+def measure(flattens, events):
+    """ Return the best time in seconds and the peak memory in MB of flattening the events
+    with each function. The functions take turns so they see the same machine load."""
+    times = {name: [] for name in flattens}
+    for _ in range(REPEATS):
+        for name, flatten in flattens.items():
+            data = copy.deepcopy(events)  # flattening modifies the nested dictionaries
+            gc.collect()
+            start = time.perf_counter()
+            flatten(data, MATCH_ID)
+            times[name].append(time.perf_counter() - start)
+    results = {}
+    for name, flatten in flattens.items():
+        data = copy.deepcopy(events)
+        tracemalloc.start()
+        flatten(data, MATCH_ID)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = min(times[name]), peak / 1024 ** 2
+    return results
+
+
+def main():
+    events = full_match(os.path.join(DATA, 'events', f'{MATCH_ID}.json'))
+    before = flatten_rows(copy.deepcopy(events), MATCH_ID)
+    after = flatten_columns(copy.deepcopy(events), MATCH_ID)
+    for df_before, df_after in zip(before, after):
+        pd.testing.assert_frame_equal(df_before, df_after)
+    print(f'Flattening {len(events)} events ({before[0].shape[1]} columns), best of {REPEATS}')
+    results = measure({'before (rows)': flatten_rows, 'after (columns)': flatten_columns},
+                      events)
+    for name, (seconds, peak) in results.items():
+        print(f'{name:>16}: {seconds * 1000:7.1f} ms per match, peak memory {peak:6.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
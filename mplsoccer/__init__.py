@@ -2,7 +2,9 @@
 from mplsoccer import Pitch."""
 
 from .__about__ import __version__
-from .statsbomb import Sbopen, Sbapi,  Sblocal
+from .statsbomb import Sbopen, Sbapi,  Sblocal, AsyncSbopen, AsyncSbapi
+from .statsbomb_cache import set_memory_cache, clear_memory_cache, memory_cache_info
+from .statsbomb_storage import Sbarrow, Sbstore, Sbcatalog
 from .cm import *
 from .linecollection import *
 from .pitch import *
@@ -8,8 +8,8 @@ from scipy.spatial import Voronoi, ConvexHull
 from scipy.stats import circmean
 
 from mplsoccer._pitch_base import BasePitch
-from mplsoccer.heatmap import (bin_statistic, bin_statistic_positional,
-                               bin_statistic_sonar, sonar, heatmap,
+from mplsoccer.heatmap import (BinAccumulator, BinIndex, bin_statistic,
+                               bin_statistic_positional, bin_statistic_sonar, sonar, heatmap,
                                heatmap_positional)
 from mplsoccer.linecollection import lines
 from mplsoccer.quiver import arrows
@@ -374,9 +374,70 @@ class BasePitchPlot(BasePitch):
 
     @copy_doc(bin_statistic)
     def bin_statistic(self, x, y, values=None, statistic='count', bins=(5, 4),
-                      normalize=False, standardized=False):
+                      normalize=False, standardized=False, groups=None):
         return bin_statistic(x, y, values=values, dim=self.dim, statistic=statistic,
-                             bins=bins, normalize=normalize, standardized=standardized)
+                             bins=bins, normalize=normalize, standardized=standardized,
+                             groups=groups)
+
+    def bin_index(self, x, y, bins=(5, 4), standardized=False):
+        """ Assign the points to bins once so they can be binned repeatedly with
+        different values and statistics. See mplsoccer.heatmap.BinIndex.
+
+        Parameters
+        ----------
+        x, y : array-like or scalar.
+            Commonly, these parameters are 1D arrays.
+        bins : int or [int, int] or array_like or [array, array], optional
+            The bin specification. See bin_statistic.
+        standardized : bool, default False
+            Whether the x, y values have been standardized to the
+            'uefa' pitch coordinates (105m x 68m)
+
+        Returns
+        -------
+        BinIndex
+
+        Examples
+        --------
+        >>> from mplsoccer import Pitch
+        >>> import numpy as np
+        >>> pitch = Pitch()
+        >>> x = np.random.uniform(low=0, high=120, size=100)
+        >>> y = np.random.uniform(low=0, high=80, size=100)
+        >>> xg = np.random.uniform(low=0, high=1, size=100)
+        >>> index = pitch.bin_index(x, y)
+        >>> stats = index.reduce(xg, statistic='sum')
+        """
+        return BinIndex(x, y, dim=self.dim, bins=bins, standardized=standardized)
+
+    def bin_accumulator(self, bins=(5, 4), standardized=False):
+        """ Create an accumulator for binning chunks of points, which can be merged with
+        accumulators for other chunks. See mplsoccer.heatmap.BinAccumulator.
+
+        Parameters
+        ----------
+        bins : int or [int, int] or array_like or [array, array], optional
+            The bin specification. See bin_statistic.
+        standardized : bool, default False
+            Whether the x, y values have been standardized to the
+            'uefa' pitch coordinates (105m x 68m)
+
+        Returns
+        -------
+        BinAccumulator
+
+        Examples
+        --------
+        >>> from mplsoccer import Pitch
+        >>> import numpy as np
+        >>> pitch = Pitch()
+        >>> accumulator = pitch.bin_accumulator()
+        >>> x = np.random.uniform(low=0, high=120, size=100)
+        >>> y = np.random.uniform(low=0, high=80, size=100)
+        >>> accumulator = accumulator.update(x, y)
+        >>> stats = accumulator.result()
+        """
+        return BinAccumulator(dim=self.dim, bins=bins, standardized=standardized)
 
     @copy_doc(bin_statistic_sonar)
     def bin_statistic_sonar(self, x, y, angle, values=None,
@@ -517,8 +578,9 @@ class BasePitchPlot(BasePitch):
 
         Parameters
         ----------
-        stats : A dictionary or list of dictionaries.
+        stats : A dictionary or list of dictionaries or BinIndex.
             This should be calculated via bin_statistic_positional() or bin_statistic().
+            If stats is a BinIndex, the counts are labelled.
         str_format : str
             A format string passed to str_format.format() to format the labels.
         exclude_zeros : bool, default False
@@ -555,6 +617,8 @@ class BasePitchPlot(BasePitch):
         va = kwargs.pop('va', 'center')
         ha = kwargs.pop('ha', 'center')
 
+        if isinstance(stats, BinIndex):
+            stats = stats.count()
         if not isinstance(stats, list):
             stats = [stats]
 
@@ -866,10 +930,12 @@ class BasePitchPlot(BasePitch):
         else:
             standardized = False
 
-        bs_distance = self.bin_statistic(xstart, ystart, values=distance,
-                                         statistic='mean', bins=bins, standardized=standardized)
-        bs_angle = self.bin_statistic(xstart, ystart, values=angle,
-                                      statistic=circmean, bins=bins, standardized=standardized)
+        statistic = {'distance': 'mean', 'angle': circmean}
+        if color is None:
+            statistic['count'] = 'count'
+        bs = self.bin_statistic(xstart, ystart, values={'distance': distance, 'angle': angle},
+                                statistic=statistic, bins=bins, standardized=standardized)
+        bs_distance, bs_angle = bs['distance'], bs['angle']
 
         # calculate the arrow length
         if self.dim.pad_multiplier != 1:
@@ -901,9 +967,7 @@ class BasePitchPlot(BasePitch):
         # plot arrows
         if color is not None:
             return self.arrows(cx, cy, endx, endy, color=color, ax=ax, **kwargs)
-        bs_count = self.bin_statistic(xstart, ystart, statistic='count',
-                                      bins=bins, standardized=standardized)
-        return self.arrows(cx, cy, endx, endy, bs_count['statistic'], ax=ax, **kwargs)
+        return self.arrows(cx, cy, endx, endy, bs['count']['statistic'], ax=ax, **kwargs)
 
     def triplot(self, x, y, ax=None, **kwargs):
         """ Utility wrapper around matplotlib.axes.Axes.triplot
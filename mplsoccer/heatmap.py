@@ -1,6 +1,9 @@
 """ A module with functions for binning data into 2d bins and plotting heatmaps.´´."""
 
-from dataclasses import dataclass, asdict
+import copy
+import operator
+import warnings
+from dataclasses import dataclass, asdict, fields
 from functools import partial
 
 import numpy as np
@@ -25,6 +28,12 @@ class BinnedStatisticResult:
     inside: Optional[np.ndarray] = None
     angle_grid: Optional[np.ndarray] = None
     angle_widths: Optional[np.ndarray] = None
+    groups: Optional[np.ndarray] = None
+
+
+def _asdict(result):
+    """ Convert the result to a dictionary like dataclasses.asdict without copying the arrays."""
+    return {field.name: getattr(result, field.name) for field in fields(result)}
 
 
 def _nan_safe(statistic):
@@ -48,13 +57,160 @@ def _nan_safe(statistic):
     return statistic
 
 
+# the statistics calculated with numpy.bincount rather than scipy.stats.binned_statistic_2d.
+# The strings are nan safe like _nan_safe and scipy's circmean propagates nans.
+_BINCOUNT_STATISTICS = ('count', 'sum', 'mean', 'std', 'min', 'max', 'circmean')
+# the string statistics accepted by bin_statistic
+_STRING_STATISTICS = _BINCOUNT_STATISTICS + ('median',)
+
+
+def _use_bincount(statistic, values):
+    """ Whether the statistic can be calculated with numpy.bincount."""
+    if callable(statistic):
+        if statistic is not circmean:
+            return False
+    elif statistic not in _BINCOUNT_STATISTICS:
+        return False
+    return values.ndim == 1 and values.dtype.kind in 'biuf'
+
+
+def _bin_edges(x, y, bins, pitch_range):
+    """ Create the bin edges in the same way as scipy.stats.binned_statistic_2d.
+    Returns None if the bins should be left to scipy, which raises any errors."""
+    try:
+        bins = operator.index(bins)
+    except TypeError:
+        pass
+    if isinstance(bins, int):
+        if not (np.isfinite(x).all() and np.isfinite(y).all()):
+            return None
+        bins = (bins, bins)
+    elif len(bins) != 2:
+        bins = (np.asarray(bins, float), np.asarray(bins, float))
+    # scipy preserves the sample floating point precision in the bin edges
+    dtype = np.result_type(x, y)
+    edges_dtype = dtype if np.issubdtype(dtype, np.floating) else float
+    edges = []
+    for dim_bins, (start, stop) in zip(bins, pitch_range):
+        if np.isscalar(dim_bins):
+            try:
+                dim_bins = operator.index(dim_bins)
+            except TypeError:
+                return None
+            if stop < start:
+                return None
+            if start == stop:
+                start, stop = start - 0.5, stop + 0.5
+            edge = np.linspace(start, stop, dim_bins + 1, dtype=edges_dtype)
+        else:
+            edge = np.asarray(dim_bins, edges_dtype)
+            if edge.ndim != 1 or edge.size < 2:
+                return None
+        if not np.diff(edge).min() > 0:
+            return None
+        edges.append(edge)
+    return edges
+
+
+def _bin_numbers(x, y, x_edge, y_edge):
+    """ The (2, N) bin numbers, which match scipy.stats.binned_statistic_2d with
+    expand_binnumbers=True. The bins are one indexed, with zero and num_bins + 1
+    for points outside the edges."""
+    dtype = np.result_type(x, y)
+    binnumber = np.empty((2, x.size), dtype=np.intp)
+    for sample, edge, dim_binnumber in ((x, x_edge, binnumber[0]), (y, y_edge, binnumber[1])):
+        sample = sample.astype(dtype, copy=False)
+        dim_binnumber[:] = np.digitize(sample, edge)
+        # like scipy, points on the rightmost edge (to the rounding precision)
+        # are counted in the last bin rather than as outside the edges
+        decimal = int(-np.log10(np.diff(edge).min())) + 6
+        on_edge = np.flatnonzero(sample >= edge[-1])
+        on_edge = on_edge[np.around(sample[on_edge], decimal) == np.around(edge[-1], decimal)]
+        dim_binnumber[on_edge] -= 1
+    return binnumber
+
+
+def _bincount_statistic(binnumber, values, statistic, shape):
+    """ Calculate the statistic for the flattened bin numbers with numpy.bincount.
+    The result has the flattened shape including the bins outside the edges."""
+    size = int(np.prod(shape))
+    if statistic == 'count':
+        return np.bincount(binnumber, minlength=size).astype(np.float64)
+    values = values.astype(np.float64, copy=False)
+    if statistic is not circmean:
+        mask = ~np.isnan(values)
+        if not mask.all():
+            binnumber, values = binnumber[mask], values[mask]
+    if statistic == 'sum':
+        return np.bincount(binnumber, values, minlength=size)
+    if statistic in ('min', 'max'):
+        result = np.full(size, np.nan)
+        (np.fmin if statistic == 'min' else np.fmax).at(result, binnumber, values)
+        return result
+    count = np.bincount(binnumber, minlength=size)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if statistic == 'mean' or statistic == 'std':
+            result = np.bincount(binnumber, values, minlength=size) / count
+            if statistic == 'std':
+                delta = values - result[binnumber]
+                result = np.sqrt(np.bincount(binnumber, delta * delta, minlength=size) / count)
+        else:
+            result = np.arctan2(np.bincount(binnumber, np.sin(values), minlength=size),
+                                np.bincount(binnumber, np.cos(values), minlength=size))
+            result = result % (2 * np.pi)
+    result[count == 0] = np.nan
+    return result
+
+
+def _callable_statistic(binnumber, values, statistic, shape):
+    """ Calculate a callable statistic for the flattened bin numbers in the same way as
+    scipy.stats.binned_statistic_2d, calling the statistic with the values in each bin."""
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        try:
+            null = statistic([])
+        except Exception:  # pylint: disable=broad-except
+            null = np.nan
+    result = np.full(int(np.prod(shape)), null, dtype=np.float64)
+    order = np.argsort(binnumber, kind='stable')
+    bin_ids, starts = np.unique(binnumber[order], return_index=True)
+    for bin_id, bin_values in zip(bin_ids, np.split(values[order], starts[1:])):
+        result[bin_id] = statistic(bin_values)
+    return result
+
+
+def _binned_statistic_2d(x, y, values, statistic, bins, pitch_range):
+    """ A replacement for scipy.stats.binned_statistic_2d with expand_binnumbers=True,
+    which uses numpy.bincount for the statistics in _BINCOUNT_STATISTICS and otherwise
+    falls back to scipy with the nan safe statistic."""
+    values = np.asarray(values)
+    edges = None
+    if (x.dtype.kind in 'iuf' and y.dtype.kind in 'iuf' and values.size == x.size and
+            _use_bincount(statistic, values)):
+        edges = _bin_edges(x, y, bins, pitch_range)
+    if edges is None:
+        return binned_statistic_2d(x, y, values, statistic=_nan_safe(statistic), bins=bins,
+                                   range=pitch_range, expand_binnumbers=True)
+    x_edge, y_edge = edges
+    binnumber = _bin_numbers(x, y, x_edge, y_edge)
+    shape = (x_edge.size + 1, y_edge.size + 1)
+    flat_binnumber = binnumber[0] * shape[1] + binnumber[1]
+    statistic = _bincount_statistic(flat_binnumber, values, statistic, shape)
+    statistic = statistic.reshape(shape)[1:-1, 1:-1]
+    return statistic, x_edge, y_edge, binnumber
+
+
 def bin_statistic(x, y, values=None, dim=None, statistic='count',
-                  bins=(5, 4), normalize=False, standardized=False):
+                  bins=(5, 4), normalize=False, standardized=False, groups=None):
     """ Calculates binned statistics using scipy.stats.binned_statistic_2d.
 
     This method automatically sets the range, changes the scipy defaults,
     and outputs the grids and centers for plotting.
 
+    The 'count', 'sum', 'mean', 'std', 'min', 'max' and 'circmean' statistics
+    are calculated with numpy.bincount, which is much faster for large arrays.
+    The results are the same as scipy's apart from floating point rounding.
+
     The default statistic has been changed to count instead of mean.
     The default bins have been set to (5,4).
 
@@ -63,14 +219,21 @@ def bin_statistic(x, y, values=None, dim=None, statistic='count',
     x, y, values : array-like or scalar.
         Commonly, these parameters are 1D arrays.
         If the statistic is 'count' then values are ignored.
+        The values can also be a dictionary of arrays to calculate several
+        statistics at once (see statistic).
     dim : mplsoccer pitch dimensions
         One of FixedDims, MetricasportsDims, VariableCenterDims, or CustomDims.
         Automatically populated when using Pitch/ VerticalPitch class
-    statistic : string or callable, optional
+    statistic : string or callable or dict, optional
         The statistic to compute (default is 'count').
         The following statistics are available: 'count' (default),
         'mean', 'std', 'median', 'sum', 'min', 'max', 'circmean' or a user-defined function. See:
         https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.binned_statistic_2d.html
+        If statistic is a dictionary of names to statistics, the bins are assigned once and
+        each statistic is calculated for the values with the same name, e.g.
+        values={'distance': distance}, statistic={'n': 'count', 'distance': 'mean'}.
+        If values is a dictionary and statistic is not, the statistic is calculated
+        for each of the values.
     bins : int or [int, int] or array_like or [array, array], optional
         The bin specification.
           * the number of bins for the two dimensions (nx = ny = bins),
@@ -84,6 +247,10 @@ def bin_statistic(x, y, values=None, dim=None, statistic='count',
     standardized : bool, default False
         Whether the x, y values have been standardized to the
         'uefa' pitch coordinates (105m x 68m)
+    groups : array-like, default None
+        The group of each point, e.g. the player ids. If not None, the statistic is
+        calculated for every group at once, giving a statistic with the shape
+        (n_groups, ny, nx), and normalize divides by the total of each group.
 
     Returns
     -------
@@ -94,6 +261,10 @@ def bin_statistic(x, y, values=None, dim=None, statistic='count',
         'binnumber' is a (2, N) array that represents the bin in which the observation falls
         if the observations falls outside the pitch the value is -1 for the dimension. The
         binnumber are zero indexed and start from the top and left handside of the pitch.
+        If values or statistic is a dictionary, a dictionary of the names to the results,
+        which share the same grid, binnumber and inside arrays.
+        If groups is not None, 'groups' is the sorted group labels for the first
+        dimension of the statistic.
 
     Examples
     --------
@@ -105,57 +276,454 @@ def bin_statistic(x, y, values=None, dim=None, statistic='count',
     >>> y = np.random.uniform(low=0, high=80, size=100)
     >>> stats = pitch.bin_statistic(x, y)
     >>> pitch.heatmap(stats, edgecolors='black', cmap='hot', ax=ax)
+
+    Calculate several statistics at once.
+
+    >>> xg = np.random.uniform(low=0, high=1, size=100)
+    >>> stats = pitch.bin_statistic(x, y, values={'xg': xg},
+    ...                             statistic={'shots': 'count', 'xg': 'sum'})
+    >>> pitch.heatmap(stats['xg'], edgecolors='black', cmap='hot', ax=ax)
+
+    Calculate a heatmap for each player and plot them on a grid.
+
+    >>> player = np.random.choice(['A', 'B', 'C', 'D'], size=100)
+    >>> stats = pitch.bin_statistic(x, y, groups=player)
+    >>> fig, axs = pitch.grid(nrows=2, ncols=2, endnote_height=0, title_height=0)
+    >>> meshes = pitch.heatmap(stats, edgecolors='black', cmap='hot', ax=axs)
     """
+    if isinstance(values, dict) or isinstance(statistic, dict) or groups is not None:
+        # assign the bins once for several statistics or groups
+        index = BinIndex(x, y, dim=dim, bins=bins, standardized=standardized)
+        return index.reduce(values, statistic=statistic, normalize=normalize, groups=groups)
     x = np.ravel(x)
     y = np.ravel(y)
     if x.size != y.size:
         raise ValueError("x and y must be the same size")
-    statistic = _nan_safe(statistic)
     if (values is None) & (statistic == 'count'):
         values = x
     if (values is None) & (statistic != 'count'):
         raise ValueError("values on which to calculate the statistic are missing")
-    if standardized:
-        pitch_range = [[0, 105], [0, 68]]
-    elif dim.invert_y:
-        pitch_range = [[dim.left, dim.right], [dim.top, dim.bottom]]
-        y = dim.bottom - y
-    else:
-        pitch_range = [[dim.left, dim.right], [dim.bottom, dim.top]]
-    statistic, x_edge, y_edge, binnumber = binned_statistic_2d(x, y, values, statistic=statistic,
+    y, pitch_range = _pitch_range(y, dim, standardized)
+    statistic, x_edge, y_edge, binnumber = _binned_statistic_2d(x, y, values, statistic, bins,
+                                                                pitch_range)
+    statistic = _orient_statistic(statistic, normalize)
+    x_grid, y_grid, cx, cy = _bin_grids(x_edge, y_edge, dim, standardized)
+    binnumber, inside = _zero_index(binnumber, x_edge.size - 1, y_edge.size - 1)
+    return _asdict(BinnedStatisticResult(statistic, x_grid, y_grid,
+                                         cx, cy, binnumber=binnumber,
+                                         inside=inside))
+
+
+class BinIndex:
+    """ The bins that each point falls in, assigned once so the same points can be binned
+    repeatedly, e.g. with different values, statistics, subsets or bootstrap resamples.
+    The results are the same as bin_statistic with the same x, y and bins.
+
+    Parameters
+    ----------
+    x, y : array-like or scalar.
+        Commonly, these parameters are 1D arrays.
+    dim : mplsoccer pitch dimensions
+        One of FixedDims, MetricasportsDims, VariableCenterDims, or CustomDims.
+        Automatically populated when using Pitch/ VerticalPitch class
+    bins : int or [int, int] or array_like or [array, array], optional
+        The bin specification. See bin_statistic.
+    standardized : bool, default False
+        Whether the x, y values have been standardized to the
+        'uefa' pitch coordinates (105m x 68m)
+
+    Attributes
+    ----------
+    x_grid, y_grid, cx, cy : numpy.ndarray
+        The bin's edges and the bin centers, as in the bin_statistic results.
+    binnumber : numpy.ndarray
+        The (2, N) zero indexed bin numbers, as in the bin_statistic results.
+    inside : numpy.ndarray
+        Whether each point is inside the pitch.
+
+    Examples
+    --------
+    >>> from mplsoccer import Pitch
+    >>> import numpy as np
+    >>> pitch = Pitch(line_zorder=2, pitch_color='black')
+    >>> fig, ax = pitch.draw()
+    >>> x = np.random.uniform(low=0, high=120, size=100)
+    >>> y = np.random.uniform(low=0, high=80, size=100)
+    >>> xg = np.random.uniform(low=0, high=1, size=100)
+    >>> index = pitch.bin_index(x, y, bins=(6, 4))
+    >>> stats = index.reduce(xg, statistic='mean')
+    >>> resample = np.random.randint(0, 100, size=100)
+    >>> resample_stats = index.subset(resample).reduce(xg[resample], 'mean')
+    >>> pitch.heatmap(index, edgecolors='black', cmap='hot', ax=ax)
+    """
+
+    def __init__(self, x, y, dim=None, bins=(5, 4), standardized=False):
+        x = np.ravel(x)
+        y = np.ravel(y)
+        if x.size != y.size:
+            raise ValueError("x and y must be the same size")
+        y, pitch_range = _pitch_range(y, dim, standardized)
+        edges = None
+        if x.dtype.kind in 'iuf' and y.dtype.kind in 'iuf':
+            edges = _bin_edges(x, y, bins, pitch_range)
+        if edges is None:
+            # leave the bins to scipy, which raises any errors
+            _, x_edge, y_edge, binnumber = binned_statistic_2d(x, y, None, statistic='count',
                                                                bins=bins, range=pitch_range,
                                                                expand_binnumbers=True)
+        else:
+            x_edge, y_edge = edges
+            binnumber = _bin_numbers(x, y, x_edge, y_edge)
+        self._shape = (x_edge.size + 1, y_edge.size + 1)
+        self._flat_binnumber = binnumber[0] * self._shape[1] + binnumber[1]
+        self.x_grid, self.y_grid, self.cx, self.cy = _bin_grids(x_edge, y_edge, dim, standardized)
+        self.binnumber, self.inside = _zero_index(binnumber, x_edge.size - 1, y_edge.size - 1)
+
+    def __len__(self):
+        return self._flat_binnumber.size
+
+    def _grouped(self, groups):
+        """ The group labels, flattened bin numbers and shape of the statistic. The groups are
+        binned at once by offsetting the bin numbers by the group code times the bins."""
+        if groups is None:
+            return None, self._flat_binnumber, self._shape
+        groups = np.ravel(groups)
+        if groups.size != len(self):
+            raise ValueError("groups must have a group for each point")
+        labels, codes = np.unique(groups, return_inverse=True)
+        flat_binnumber = codes.ravel() * int(np.prod(self._shape)) + self._flat_binnumber
+        return labels, flat_binnumber, (labels.size,) + self._shape
+
+    def _result(self, statistic, normalize, labels=None):
+        """ Create the bin_statistic result from the flattened statistic."""
+        if labels is None:
+            statistic = statistic.reshape(self._shape)[1:-1, 1:-1]
+            statistic = _orient_statistic(statistic, normalize)
+        else:
+            statistic = statistic.reshape((labels.size,) + self._shape)[:, 1:-1, 1:-1]
+            statistic = np.flip(np.swapaxes(statistic, 1, 2), axis=1)
+            if normalize:
+                statistic = statistic / statistic.sum(axis=(1, 2), keepdims=True)
+        return _asdict(BinnedStatisticResult(statistic, self.x_grid, self.y_grid,
+                                             self.cx, self.cy, binnumber=self.binnumber,
+                                             inside=self.inside, groups=labels))
 
+    def count(self, normalize=False, groups=None):
+        """ Count the points in each bin.
+
+        Parameters
+        ----------
+        normalize : bool, default False
+            Whether to normalize the statistic by dividing by the total.
+        groups : array-like, default None
+            The group of each point to count the points in each group. See reduce.
+
+        Returns
+        -------
+        bin_statistic : dict.
+            The counts in the same format as bin_statistic.
+        """
+        return self.reduce(None, statistic='count', normalize=normalize, groups=groups)
+
+    def reduce(self, values=None, statistic='count', normalize=False, groups=None):
+        """ Calculate a statistic of the values in each bin.
+
+        Parameters
+        ----------
+        values : array-like or dict of array-like.
+            A 1D array with a value for each point, in the same order as the points
+            (after any subset). If the statistic is 'count' then values are ignored.
+            The values can also be a dictionary of arrays to calculate several
+            statistics at once (see bin_statistic).
+        statistic : string or callable or dict, optional
+            The statistic to compute (default is 'count'). See bin_statistic.
+        normalize : bool, default False
+            Whether to normalize the statistic by dividing by the total
+            (the total of each group if groups is not None).
+        groups : array-like, default None
+            The group of each point, e.g. the player ids. If not None, the statistic
+            is calculated for each group with one numpy.bincount.
+
+        Returns
+        -------
+        bin_statistic : dict.
+            The statistic in the same format as bin_statistic. If values or statistic
+            is a dictionary, a dictionary of the names to the results.
+            If groups is not None, the statistic has the shape (n_groups, ny, nx)
+            and 'groups' is the sorted group labels.
+        """
+        labels, flat_binnumber, shape = self._grouped(groups)
+        if isinstance(values, dict) or isinstance(statistic, dict):
+            names = list(statistic if isinstance(statistic, dict) else values)
+            if not isinstance(statistic, dict):
+                statistic = dict.fromkeys(names, statistic)
+            if not isinstance(values, dict):
+                values = dict.fromkeys(names, values)
+            return {name: self._reduce(values.get(name), statistic[name], normalize,
+                                       labels, flat_binnumber, shape)
+                    for name in names}
+        return self._reduce(values, statistic, normalize, labels, flat_binnumber, shape)
+
+    def _reduce(self, values, statistic, normalize, labels, flat_binnumber, shape):
+        """ Calculate one statistic for the flattened bin numbers."""
+        if (values is None) & (statistic == 'count'):
+            return self._result(_bincount_statistic(flat_binnumber, None, 'count', shape),
+                                normalize, labels)
+        if values is None:
+            raise ValueError("values on which to calculate the statistic are missing")
+        values = np.asarray(values)
+        if values.shape != flat_binnumber.shape:
+            raise ValueError("values must be a 1D array with a value for each point")
+        if isinstance(statistic, str) and statistic not in _STRING_STATISTICS:
+            raise ValueError(f"invalid statistic {statistic!r}")
+        if _use_bincount(statistic, values):
+            result = _bincount_statistic(flat_binnumber, values, statistic, shape)
+        else:
+            result = _callable_statistic(flat_binnumber, values, _nan_safe(statistic), shape)
+        return self._result(result, normalize, labels)
+
+    def subset(self, mask):
+        """ Select some of the points without assigning the bins again.
+
+        Parameters
+        ----------
+        mask : array-like
+            A boolean mask or the integer indices of the points to select.
+            The indices can repeat, e.g. for bootstrap resamples.
+
+        Returns
+        -------
+        BinIndex
+            The values passed to its reduce method must line up with the selected
+            points, e.g. values[mask].
+        """
+        index = copy.copy(self)
+        index._flat_binnumber = self._flat_binnumber[mask]
+        index.binnumber = self.binnumber[:, mask]
+        index.inside = self.inside[mask]
+        return index
+
+
+class BinAccumulator:
+    """ Accumulate binned statistics over chunks of points, e.g. for tracking data that is too
+    large to bin at once. It keeps the sufficient statistics for each bin (the counts, sums,
+    sums of squared deviations from the mean, minimums, maximums and the sums of the sines and
+    cosines for the circular mean), so accumulators for different chunks, e.g. calculated in
+    different processes, can be merged. The results are the same as bin_statistic for all the
+    points apart from floating point rounding.
+
+    Parameters
+    ----------
+    dim : mplsoccer pitch dimensions
+        One of FixedDims, MetricasportsDims, VariableCenterDims, or CustomDims.
+        Automatically populated when using Pitch/ VerticalPitch class
+    bins : int or [int, int] or array_like or [array, array], optional
+        The bin specification. See bin_statistic.
+    standardized : bool, default False
+        Whether the x, y values have been standardized to the
+        'uefa' pitch coordinates (105m x 68m)
+
+    Examples
+    --------
+    >>> from mplsoccer import Pitch
+    >>> import numpy as np
+    >>> pitch = Pitch()
+    >>> accumulator = pitch.bin_accumulator(bins=(6, 4))
+    >>> for _ in range(10):
+    ...     x = np.random.uniform(low=0, high=120, size=1000)
+    ...     y = np.random.uniform(low=0, high=80, size=1000)
+    ...     speed = np.random.uniform(low=0, high=10, size=1000)
+    ...     accumulator = accumulator.update(x, y, speed)
+    >>> stats = accumulator.result('mean')
+    """
+
+    def __init__(self, dim=None, bins=(5, 4), standardized=False):
+        self.dim = dim
+        self.bins = bins
+        self.standardized = standardized
+        _, self._pitch_range = _pitch_range(np.empty(0), dim, standardized)
+        edges = _bin_edges(np.empty(0), np.empty(0), bins, self._pitch_range)
+        if edges is None:
+            raise ValueError("bins should be either an int, [int, int], an array of increasing "
+                             "bin edges or [array, array]")
+        self._x_edge, self._y_edge = edges
+        self._shape = (self._x_edge.size + 1, self._y_edge.size + 1)
+        size = int(np.prod(self._shape))
+        self._count = np.zeros(size, dtype=np.int64)
+        self._num_values = np.zeros(size, dtype=np.int64)
+        self._sum = np.zeros(size)
+        self._sum_squares = np.zeros(size)  # squared deviations from the mean
+        self._min = np.full(size, np.nan)
+        self._max = np.full(size, np.nan)
+        self._sin = np.zeros(size)
+        self._cos = np.zeros(size)
+
+    def update(self, x, y, values=None):
+        """ Add a chunk of points.
+
+        Parameters
+        ----------
+        x, y, values : array-like or scalar.
+            Commonly, these parameters are 1D arrays. If values is None, only the counts
+            are updated. Values that are numpy.nan are counted, but are otherwise ignored.
+
+        Returns
+        -------
+        self : BinAccumulator
+        """
+        x = np.ravel(x)
+        y = np.ravel(y)
+        if x.size != y.size:
+            raise ValueError("x and y must be the same size")
+        y, _ = _pitch_range(y, self.dim, self.standardized)
+        binnumber = _bin_numbers(x, y, self._x_edge, self._y_edge)
+        binnumber = binnumber[0] * self._shape[1] + binnumber[1]
+        size = self._count.size
+        self._count += np.bincount(binnumber, minlength=size)
+        if values is None:
+            return self
+        values = np.ravel(values).astype(np.float64, copy=False)
+        if values.size != x.size:
+            raise ValueError("x and values must be the same size")
+        mask = ~np.isnan(values)
+        binnumber, values = binnumber[mask], values[mask]
+        num_values = np.bincount(binnumber, minlength=size)
+        total = np.bincount(binnumber, values, minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            delta = values - (total / num_values)[binnumber]
+        sum_squares = np.bincount(binnumber, delta * delta, minlength=size)
+        self._combine(num_values, total, sum_squares)
+        np.fmin.at(self._min, binnumber, values)
+        np.fmax.at(self._max, binnumber, values)
+        self._sin += np.bincount(binnumber, np.sin(values), minlength=size)
+        self._cos += np.bincount(binnumber, np.cos(values), minlength=size)
+        return self
+
+    def _combine(self, num_values, total, sum_squares):
+        """ Combine the counts, sums and squared deviations with the parallel algorithm
+        of Chan et al. for the variance."""
+        both = (self._num_values > 0) & (num_values > 0)
+        count_a, count_b = self._num_values[both], num_values[both]
+        delta = total[both] / count_b - self._sum[both] / count_a
+        self._sum_squares += sum_squares
+        self._sum_squares[both] += delta * delta * count_a * count_b / (count_a + count_b)
+        self._num_values += num_values
+        self._sum += total
+
+    def merge(self, other):
+        """ Merge the statistics from another accumulator with the same bins.
+
+        Parameters
+        ----------
+        other : BinAccumulator
+
+        Returns
+        -------
+        self : BinAccumulator
+        """
+        if not (np.array_equal(self._x_edge, other._x_edge) and
+                np.array_equal(self._y_edge, other._y_edge) and
+                self._pitch_range == other._pitch_range and
+                self.standardized == other.standardized and
+                self.dim.invert_y == other.dim.invert_y):
+            raise ValueError("Only accumulators with the same dim and bins can be merged.")
+        self._count += other._count
+        self._combine(other._num_values, other._sum, other._sum_squares)
+        np.fmin(self._min, other._min, out=self._min)
+        np.fmax(self._max, other._max, out=self._max)
+        self._sin += other._sin
+        self._cos += other._cos
+        return self
+
+    def result(self, statistic='count', normalize=False):
+        """ The binned statistic for all the points so far.
+
+        Parameters
+        ----------
+        statistic : string or dict, optional
+            The statistic to compute (default is 'count'). One of 'count', 'sum',
+            'mean', 'std', 'min', 'max' or 'circmean', or a dictionary of names to
+            statistics.
+        normalize : bool, default False
+            Whether to normalize the statistic by dividing by the total.
+
+        Returns
+        -------
+        bin_statistic : dict.
+            The keys are 'statistic' (the calculated statistic),
+            'x_grid' and 'y_grid (the bin's edges), and cx and cy (the bin centers)
+            as in bin_statistic. The points are not kept, so there is no
+            'binnumber' or 'inside'. If statistic is a dictionary, a dictionary
+            of the names to the results.
+        """
+        if isinstance(statistic, dict):
+            return {name: self.result(name_statistic, normalize=normalize)
+                    for name, name_statistic in statistic.items()}
+        if statistic not in _BINCOUNT_STATISTICS:
+            raise ValueError(f"statistic must be one of {_BINCOUNT_STATISTICS}")
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if statistic == 'count':
+                result = self._count.astype(np.float64)
+            elif statistic == 'sum':
+                result = self._sum.copy()
+            elif statistic == 'mean':
+                result = self._sum / self._num_values
+            elif statistic == 'std':
+                result = np.sqrt(self._sum_squares / self._num_values)
+            elif statistic == 'min':
+                result = self._min.copy()
+            elif statistic == 'max':
+                result = self._max.copy()
+            else:
+                result = np.arctan2(self._sin, self._cos) % (2 * np.pi)
+        if statistic in ('mean', 'std', 'circmean'):
+            result[self._num_values == 0] = np.nan
+        result = _orient_statistic(result.reshape(self._shape)[1:-1, 1:-1], normalize)
+        x_grid, y_grid, cx, cy = _bin_grids(self._x_edge, self._y_edge, self.dim,
+                                            self.standardized)
+        return _asdict(BinnedStatisticResult(result, x_grid, y_grid, cx, cy))
+
+
+def _pitch_range(y, dim, standardized):
+    """ The pitch range for binning the data. The y coordinates are returned flipped
+    if the pitch has an inverted y-axis."""
+    if standardized:
+        return y, [[0, 105], [0, 68]]
+    if dim.invert_y:
+        return dim.bottom - y, [[dim.left, dim.right], [dim.top, dim.bottom]]
+    return y, [[dim.left, dim.right], [dim.bottom, dim.top]]
+
+
+def _orient_statistic(statistic, normalize):
+    """ Transpose and flip the statistic so the rows are the y bins starting from the top."""
     statistic = np.flip(statistic.T, axis=0)
-    if statistic.ndim == 3:
-        num_y, num_x, _ = statistic.shape
-    else:
-        num_y, num_x = statistic.shape
     if normalize:
         statistic = statistic / statistic.sum()
-    binnumber[1, :] = num_y - binnumber[1, :] + 1
+    return statistic
+
+
+def _bin_grids(x_edge, y_edge, dim, standardized):
+    """ The grids of the bin edges and the bin centers for plotting."""
     x_grid, y_grid = np.meshgrid(x_edge, y_edge)
     cx, cy = np.meshgrid(x_edge[:-1] + 0.5 * np.diff(x_edge), y_edge[:-1] + 0.5 * np.diff(y_edge))
 
     if not dim.invert_y or standardized is not False:
         y_grid = np.flip(y_grid, axis=0)
         cy = np.flip(cy, axis=0)
+    return x_grid, y_grid, cx, cy
 
-    # if outside the pitch set the bin number to minus one
-    # else zero index the results by removing one
-    mask_x_out = np.logical_or(binnumber[0, :] == 0,
-                               binnumber[0, :] == num_x + 1)
-    binnumber[0, mask_x_out] = -1
-    binnumber[0, ~mask_x_out] = binnumber[0, ~mask_x_out] - 1
 
-    mask_y_out = np.logical_or(binnumber[1, :] == 0,
-                               binnumber[1, :] == num_y + 1)
+def _zero_index(binnumber, num_x, num_y):
+    """ Flip the y bin numbers and zero index the results by removing one.
+    If outside the pitch set the bin number to minus one."""
+    np.subtract(num_y, binnumber[1], out=binnumber[1])
+    binnumber[0] -= 1
+    mask_x_out = (binnumber[0] < 0) | (binnumber[0] >= num_x)
+    mask_y_out = (binnumber[1] < 0) | (binnumber[1] >= num_y)
+    binnumber[0, mask_x_out] = -1
     binnumber[1, mask_y_out] = -1
-    binnumber[1, ~mask_y_out] = binnumber[1, ~mask_y_out] - 1
-    inside = np.logical_and(~mask_x_out, ~mask_y_out)
-    return asdict(BinnedStatisticResult(statistic, x_grid, y_grid,
-                                        cx, cy, binnumber=binnumber,
-                                        inside=inside))
+    inside = ~(mask_x_out | mask_y_out)
+    return binnumber, inside
 
 
 def bin_statistic_sonar(x, y, angle, values=None, dim=None, statistic='count',
@@ -304,12 +872,14 @@ def heatmap(stats, ax=None, vertical=False, **kwargs):
 
     Parameters
     ----------
-    stats : dict.
+    stats : dict or BinIndex.
         This should be calculated via bin_statistic().
         The keys are 'statistic' (the calculated statistic),
         'x_grid' and 'y_grid (the bin's edges), and cx and cy (the bin centers).
+        If stats is a BinIndex, the counts are plotted.
     ax : matplotlib.axes.Axes, default None
-        The axis to plot on.
+        The axis to plot on. If the stats were calculated with groups, an array of axes
+        (or the dictionary of axes from Pitch.grid) with an axis for each group.
     vertical : bool, default False
         If the orientation is vertical (True), then the code switches the x and y coordinates.
     **kwargs : All other keyword arguments are passed on to matplotlib.axes.Axes.pcolormesh.
@@ -317,6 +887,8 @@ def heatmap(stats, ax=None, vertical=False, **kwargs):
     Returns
     -------
     mesh : matplotlib.collections.QuadMesh
+        Or a list of meshes, one for each group, if the stats were calculated with groups.
+        The groups share the same vmin and vmax.
 
     Examples
     --------
@@ -330,11 +902,29 @@ def heatmap(stats, ax=None, vertical=False, **kwargs):
     >>> pitch.heatmap(stats, edgecolors='black', cmap='hot', ax=ax)
     """
     validate_ax(ax)
+    if isinstance(stats, BinIndex):
+        stats = stats.count()
+    if stats.get('groups') is not None:
+        return _heatmap_groups(stats, ax=ax, vertical=vertical, **kwargs)
     if vertical:
         return ax.pcolormesh(stats['y_grid'], stats['x_grid'], stats['statistic'], **kwargs)
     return ax.pcolormesh(stats['x_grid'], stats['y_grid'], stats['statistic'], **kwargs)
 
 
+def _heatmap_groups(stats, ax=None, vertical=False, **kwargs):
+    """ Plot the heatmap for each group on a separate axis with the same vmin and vmax."""
+    axs = np.ravel(ax['pitch'] if isinstance(ax, dict) else ax)
+    num_groups = len(stats['groups'])
+    if axs.size < num_groups:
+        raise ValueError(f"There are {num_groups} groups but only {axs.size} axes to plot on.")
+    # make vmin/vmax nan safe with np.nanmax/ np.nanmin
+    vmax = kwargs.pop('vmax', np.nanmax(stats['statistic']))
+    vmin = kwargs.pop('vmin', np.nanmin(stats['statistic']))
+    return [heatmap({**stats, 'statistic': statistic, 'groups': None}, ax=group_ax,
+                    vertical=vertical, vmin=vmin, vmax=vmax, **kwargs)
+            for statistic, group_ax in zip(stats['statistic'], axs)]
+
+
 def sonar(stats_length, xindex=0, yindex=0,
           stats_color=None, cmap=None, vmin=None, vmax=None,
           rmin=0, rmax=None,
@@ -1,32 +1,503 @@
 """`mplsoccer.statsbomb` is a python module for loading StatsBomb open, local and API data."""
 
+import asyncio
+import base64
+import gzip
+import io
 import json
+import logging
 import os
-
+import threading
+import time
+import tracemalloc
+import warnings
+import zipfile
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-__all__ = ['Sbopen', 'Sbapi', 'Sblocal']
+# the memory cache functions are also imported so they can still be used from this module
+from .statsbomb_cache import (_MEMORY_CACHE, _create_cache,  # pylint: disable=unused-import
+                              set_memory_cache, clear_memory_cache, memory_cache_info)
 
+__all__ = ['Sbopen', 'Sbapi', 'Sblocal', 'AsyncSbopen', 'AsyncSbapi']
 
-class Sbopen:
-    """ Class for loading data from the StatsBomb open-data.
-    The data is available at: https://github.com/statsbomb/open-data under
-    a non-commercial license.
+# the results returned by the event methods and flatten_event
+_EVENT_TABLES = ('events', 'related', 'freeze', 'tactics')
+_TIMESTAMP_TYPES = ('time', 'timedelta', 'seconds')
+# the values of dataframe that return numpy arrays rather than dataframes or lists
+_ARRAY_OUTPUTS = ('numpy', 'structured')
+
+
+def create_session(pool_size=10, retries=3, backoff_factor=0.5):
+    """ Create a requests.Session for the StatsBomb loaders with a connection pool
+    that keeps connections alive between requests, gzip compression, and
+    retries with an exponential backoff for rate-limited (429) and server errors (5xx).
 
     Parameters
     ----------
-    dataframe : bool, default True
-        Whether to return dataframes (True) or flattened list of dictionaries (False)
-        from the class methods.
+    pool_size : int, default 10
+        The maximum number of connections to keep alive in the pool for each host.
+        Set this to at least the number of threads sharing the session.
+    retries : int, default 3
+        The number of times to retry a request that fails with a connection error,
+        a 429 or a 5xx status code.
+    backoff_factor : float, default 0.5
+        The exponential backoff between retries in seconds,
+        i.e. backoff_factor * 2 ** (retry number - 1). A Retry-After header takes precedence.
+
+    Returns
+    -------
+    session : requests.Session
+
+    Examples
+    --------
+    >>> from mplsoccer import Sbopen
+    >>> from mplsoccer.statsbomb import create_session
+    >>> session = create_session(pool_size=16, retries=5)
+    >>> parser = Sbopen(session=session)
+    """
+    retry = Retry(total=retries, backoff_factor=backoff_factor,
+                  status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=frozenset(['GET']),
+                  respect_retry_after_header=True,
+                  raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept-Encoding': 'gzip, deflate', 'Connection': 'keep-alive'})
+    return session
+
+
+@dataclass
+class LoadRecord:
+    """ Dataclass for the instrumentation of one call to a StatsBomb loader method,
+    see ``add_load_hook``. The times are in seconds.
+
+    Attributes
+    ----------
+    endpoint : str
+        One of 'competitions', 'matches', 'events', 'lineups' or 'three-sixty'.
+    match_id : int
+        The StatsBomb match identifier (None for the competitions and matches).
+    source : str
+        The url or the path of the file.
+    cache : str
+        Where the data came from: 'memory' (the process-wide memory cache), 'disk'
+        (the on-disk response cache), 'revalidated' (the on-disk response cache after
+        a 304 Not Modified response), 'network' or 'file'.
+    num_bytes : int
+        The size of the response content or of the file (None if it is not known,
+        e.g. for zip members, or not read).
+    fetch_time : float
+        The time getting the response content, including the HTTP latency.
+    parse_time : float
+        The time decoding the JSON (including reading the file for local files).
+        Zero for streamed files, which are decoded while they are flattened.
+    flatten_time : float
+        The time flattening the nested data.
+    dataframe_time : float
+        The time creating the dataframes/ arrays from the flattened data.
+    total_time : float
+        The total time of the call.
+    num_rows : int
+        The number of rows in the (first) result, e.g. the events.
+    peak_memory : int
+        The peak memory allocated during the call in bytes. Only measured with
+        add_load_hook(trace_memory=True), otherwise None.
+    """
+    endpoint: str
+    match_id: Optional[int] = None
+    source: Optional[str] = None
+    cache: Optional[str] = None
+    num_bytes: Optional[int] = None
+    fetch_time: float = 0.
+    parse_time: float = 0.
+    flatten_time: float = 0.
+    dataframe_time: float = 0.
+    total_time: float = 0.
+    num_rows: Optional[int] = None
+    peak_memory: Optional[int] = None
+
+
+_STAGES = ('fetch_time', 'parse_time', 'flatten_time', 'dataframe_time', 'total_time')
+
+
+class LoadStats:
+    """ Aggregate the instrumentation records by endpoint. A LoadStats is a hook, so it
+    can be added with ``add_load_hook``.
+
+    Examples
+    --------
+    >>> from mplsoccer import Sbopen
+    >>> from mplsoccer.statsbomb import LoadStats, add_load_hook
+    >>> stats = LoadStats()
+    >>> add_load_hook(stats)
+    >>> events = Sbopen().event(3788741)
+    >>> stats.as_dict()['events']['fetch_time']
     """
 
-    def __init__(self, dataframe=True):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+
+    def __call__(self, record):
+        with self._lock:
+            totals = self._totals.get(record.endpoint)
+            if totals is None:
+                totals = self._totals[record.endpoint] = {
+                    'calls': 0, 'cache_hits': 0, 'num_bytes': 0, 'num_rows': 0,
+                    **{stage: 0. for stage in _STAGES}, 'peak_memory': 0}
+            totals['calls'] += 1
+            totals['cache_hits'] += record.cache in ['memory', 'disk', 'revalidated']
+            totals['num_bytes'] += record.num_bytes or 0
+            totals['num_rows'] += record.num_rows or 0
+            for stage in _STAGES:
+                totals[stage] += getattr(record, stage)
+            totals['peak_memory'] = max(totals['peak_memory'], record.peak_memory or 0)
+
+    def as_dict(self):
+        """ Get the totals for each endpoint as a dictionary of dictionaries with the number of
+        calls, cache hits, bytes, rows, the summed times of each stage and the peak memory."""
+        with self._lock:
+            return {endpoint: dict(totals) for endpoint, totals in self._totals.items()}
+
+    def reset(self):
+        """ Remove all the totals."""
+        with self._lock:
+            self._totals = {}
+
+
+_LOGGER = logging.getLogger(__name__)
+_HOOKS = []
+_CURRENT_RECORD = threading.local()
+
+
+def add_load_hook(hook, trace_memory=False):
+    """ Add a function called with a ``LoadRecord`` after each call to the event, lineup,
+    match, competition and frame methods of Sbopen, Sbapi and Sblocal.
+
+    The records are also logged at the DEBUG level by the 'mplsoccer.statsbomb' logger.
+    The loaders are only instrumented if there are hooks or this logger is enabled
+    for DEBUG messages.
+
+    Parameters
+    ----------
+    hook : callable
+        Called as hook(record) in the thread that called the loader method.
+    trace_memory : bool, default False
+        Whether to measure the peak memory allocated with tracemalloc. This slows down
+        the loaders and the peak includes allocations by other threads at the same time.
+
+    Examples
+    --------
+    >>> from mplsoccer import Sbopen
+    >>> from mplsoccer.statsbomb import add_load_hook
+    >>> add_load_hook(lambda record: print(record.endpoint, record.fetch_time))
+    >>> events = Sbopen().event(3788741)
+    """
+    _HOOKS.append((hook, trace_memory))
+
+
+def remove_load_hook(hook):
+    """ Remove a function added with ``add_load_hook``."""
+    _HOOKS[:] = [(other, trace_memory) for other, trace_memory in _HOOKS if other != hook]
+
+
+def _current_record():
+    """ Get the LoadRecord for the loader call in progress in this thread (None if the call
+    is not instrumented)."""
+    return getattr(_CURRENT_RECORD, 'record', None)
+
+
+@contextmanager
+def _timed(stage):
+    """ Add the time spent in the block to a stage of the current LoadRecord."""
+    record = _current_record()
+    if record is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(record, stage, getattr(record, stage) + time.perf_counter() - start)
+
+
+def _set_cache_status(cache):
+    record = _current_record()
+    if record is not None:
+        record.cache = cache
+
+
+def _add_bytes(num_bytes):
+    record = _current_record()
+    if record is not None and num_bytes is not None:
+        record.num_bytes = (record.num_bytes or 0) + num_bytes
+
+
+def _num_rows(result):
+    """ The number of rows in the first result."""
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, FrameArrays):
+        return len(result.id)
+    if isinstance(result, dict):
+        return len(next(iter(result.values()))) if result else 0
+    if result is None:
+        return 0
+    return len(result)
+
+
+def _flatten_timed(flatten, data, *args):
+    """ Call flatten(data, *args), splitting the time into the flatten and dataframe stages.
+    The flatten functions time their flattening step, if not the whole call is flattening."""
+    record = _current_record()
+    if record is None:
+        return flatten(data, *args)
+    flatten_time = record.flatten_time
+    start = time.perf_counter()
+    result = flatten(data, *args)
+    total = time.perf_counter() - start
+    if record.flatten_time > flatten_time:
+        record.dataframe_time += total - (record.flatten_time - flatten_time)
+    else:
+        record.flatten_time += total
+    return result
+
+
+def _instrumented(endpoint, match_id, source, load):
+    """ Call load() and report a LoadRecord to the hooks and the logger."""
+    if len(_HOOKS) == 0 and not _LOGGER.isEnabledFor(logging.DEBUG):
+        return load()
+    record = LoadRecord(endpoint=endpoint, match_id=match_id, source=os.fspath(source))
+    trace_memory = any(trace for _, trace in _HOOKS)
+    started_tracing = False
+    if trace_memory:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        elif hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        memory_start = tracemalloc.get_traced_memory()[0]
+    previous = _current_record()
+    _CURRENT_RECORD.record = record
+    start = time.perf_counter()
+    try:
+        result = load()
+    finally:
+        _CURRENT_RECORD.record = previous
+        record.total_time = time.perf_counter() - start
+        if trace_memory:
+            record.peak_memory = max(tracemalloc.get_traced_memory()[1] - memory_start, 0)
+            if started_tracing:
+                tracemalloc.stop()
+    record.num_rows = _num_rows(result)
+    _LOGGER.debug('%s', record)
+    for hook, _ in list(_HOOKS):
+        hook(record)
+    return result
+
+
+def _flatten_content(flatten, content, *args):
+    """ Decode the raw content and flatten it with the flatten function. This is a module level
+    function so that it can be pickled and run in a process pool."""
+    return flatten(json.loads(content), *args)
+
+
+def _flatten_competition(data, dataframe=True):
+    """ The competitions are not nested so only need converting to a dataframe."""
+    if dataframe in _ARRAY_OUTPUTS:
+        return _array_output(_rows_to_arrays(data), dataframe)
+    return pd.DataFrame(data) if dataframe else data
+
+
+def _load_many(get_content, urls, match_ids, dataframe, max_workers=8, processes=None,
+               errors='raise', compact=False, timestamp='time', columns=None, types=None,
+               include=_EVENT_TABLES):
+    """ Generator that downloads the events in a thread pool and flattens them in a
+    process pool, yielding (match_id, (events, related, freeze, tactics)) in order.
+
+    Only a window of matches twice the size of the thread pool is in flight at any time,
+    so the results are not all held in memory when they are consumed one at a time.
+    """
+    if errors not in ['raise', 'warn']:
+        raise ValueError("errors must be one of 'raise' or 'warn'")
+    match_ids = list(match_ids)
+    if len(urls) != len(match_ids):
+        raise ValueError('urls and match_ids must be the same length')
+    process_pool = None if processes == 0 else ProcessPoolExecutor(max_workers=processes)
+
+    def load(url, match_id):
+        content = get_content(url)
+        if process_pool is None:
+            return _flatten_content(flatten_event, content, match_id, dataframe, compact,
+                                    columns, types, include, timestamp)
+        return process_pool.submit(_flatten_content, flatten_event, content,
+                                   match_id, dataframe, compact,
+                                   columns, types, include, timestamp).result()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as thread_pool:
+            pending = deque()
+
+            def submit(task):
+                url, match_id = task
+                pending.append((match_id, thread_pool.submit(load, url, match_id)))
+
+            tasks = iter(zip(urls, match_ids))
+            for task in islice(tasks, 2 * max_workers):
+                submit(task)
+            while pending:
+                match_id, future = pending.popleft()
+                task = next(tasks, None)
+                if task is not None:
+                    submit(task)
+                try:
+                    result = future.result()
+                except Exception as err:  # pylint: disable=broad-except
+                    msg = f'Failed to load the events for match_id={match_id}: {err!r}'
+                    if errors == 'raise':
+                        for _, other in pending:
+                            other.cancel()
+                        raise RuntimeError(msg) from err
+                    warnings.warn(msg)
+                    continue
+                yield match_id, result
+    finally:
+        if process_pool is not None:
+            process_pool.shutdown()
+
+
+def _prefetch(func, items, prefetch=1):
+    """ Generator of func(item) for each item in order, where the next prefetch items are
+    computed in a background thread while the current result is being consumed."""
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = deque()
+        items = iter(items)
+        try:
+            for item in islice(items, prefetch + 1):
+                pending.append(pool.submit(func, item))
+            while pending:
+                result = pending.popleft().result()
+                for item in islice(items, 1):
+                    pending.append(pool.submit(func, item))
+                yield result
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _iter_batches(frames, chunk_size, arrays=False):
+    """ Regroup an iterable of dataframes into batches of chunk_size rows (the last batch may
+    be smaller). Only the current dataframe and one batch are held in memory.
+    The batches are either dataframes or dictionaries of numpy arrays (arrays=True)."""
+    if chunk_size < 1:
+        raise ValueError('chunk_size must be at least one')
+    pending = deque()
+    num_pending = 0
+    frames = iter(frames)
+    finished = False
+    while not finished or num_pending > 0:
+        if not finished and num_pending < chunk_size:
+            df = next(frames, None)
+            if df is None:
+                finished = True
+            elif len(df) > 0:
+                pending.append(df)
+                num_pending += len(df)
+            continue
+        num_rows = min(chunk_size, num_pending)
+        num_pending -= num_rows
+        pieces = []
+        while num_rows > 0:
+            df = pending[0]
+            if len(df) <= num_rows:
+                pieces.append(pending.popleft())
+                num_rows -= len(df)
+            else:
+                pieces.append(df.iloc[:num_rows])
+                pending[0] = df.iloc[num_rows:]
+                num_rows = 0
+        batch = pd.concat(pieces, ignore_index=True) if len(pieces) > 1 else \
+            pieces[0].reset_index(drop=True)
+        if arrays:
+            batch = {name: batch[name].to_numpy() for name in batch.columns}
+        yield batch
+
+
+def _concat(frames, dataframe):
+    """ Concatenate dataframes or lists of dictionaries (ignoring None)."""
+    frames = [frame for frame in frames if frame is not None]
+    if len(frames) == 0:
+        return None
+    if not dataframe:
+        return [row for frame in frames for row in frame]
+    if dataframe in _ARRAY_OUTPUTS:
+        return _concat_arrays(frames, dataframe)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _concat_event_results(results, dataframe):
+    """ Concatenate the (events, related, freeze, tactics) results for many matches."""
+    events, related, freeze, tactics = [], [], [], []
+    for _, (match_events, match_related, match_freeze, match_tactics) in results:
+        events.append(match_events)
+        related.append(match_related)
+        freeze.append(match_freeze)
+        tactics.append(match_tactics)
+    return (_concat(events, dataframe), _concat(related, dataframe),
+            _concat(freeze, dataframe), _concat(tactics, dataframe))
+
+
+class _SbBase:
+    """ Base class for the Sbopen and Sbapi loaders. It manages the requests session and the
+    on-disk cache, and loads the events of many matches concurrently."""
+
+    # the user the cached responses and results are kept separate for
+    _user = None
+
+    def __init__(self, dataframe=True, cache_dir=None, ttl=None, max_bytes=None,
+                 session=None, pool_size=10, retries=3, backoff_factor=0.5, compact=False,
+                 timestamp='time'):
         self.dataframe = dataframe
-        self.url = 'https://raw.githubusercontent.com/statsbomb/open-data/master/data/'
+        self.compact = compact
+        self.timestamp = timestamp
+        self.cache = _create_cache(cache_dir, ttl, max_bytes)
+        if session is None:
+            session = create_session(pool_size=pool_size, retries=retries,
+                                     backoff_factor=backoff_factor)
+        self.session = session
+
+    def _fetch(self, url, headers):
+        """ Make the HTTP request."""
+        return self.session.get(url=url, headers=headers)
+
+    def _get_content(self, url):
+        """ Get the raw content of the response for a url (from the cache if enabled)."""
+        with _timed('fetch_time'):
+            if self.cache is not None:
+                content, status = self.cache.get(url, self._fetch, user=self._user)
+            else:
+                resp = self._fetch(url, {})
+                resp.raise_for_status()
+                content, status = resp.content, 'network'
+        _set_cache_status(status)
+        _add_bytes(len(content))
+        return content
 
-    @staticmethod
-    def _get_data(url):
+    def _get_data(self, url):
         """ Get the StatsBomb data as a list of dictionaries.
 
         Parameters
@@ -38,16 +509,116 @@ class Sbopen:
         json-encoded content of a request's response
             For the StatsBomb data this is typically a list of dictionaries.
         """
-        resp = requests.get(url=url)
-        resp.raise_for_status()
-        return resp.json()
+        content = self._get_content(url)
+        with _timed('parse_time'):
+            return json.loads(content)
+
+    def _load(self, url, endpoint, match_id, flatten, *args):
+        """ Get the data for a url and flatten it with flatten(data, *args), using the
+        process-wide memory cache if it is enabled (see ``set_memory_cache``) and
+        reporting the call to the hooks (see ``add_load_hook``).
+        The cached results are kept separate for each user."""
+        def load():
+            result, hit = _MEMORY_CACHE.get(
+                (self._user, url, flatten.__name__) + args, endpoint, match_id,
+                lambda: _flatten_timed(flatten, self._get_data(url), *args))
+            if hit:
+                _set_cache_status('memory')
+            return result
+
+        return _instrumented(endpoint, match_id, url, load)
+
+    def _events_many(self, urls, match_ids, max_workers, processes, concat, errors,
+                     columns, types, include):
+        """ Load the events for the urls. See ``Sbopen.events_many``."""
+        results = _load_many(self._get_content, urls, match_ids, self.dataframe,
+                             max_workers=max_workers, processes=processes, errors=errors,
+                             compact=self.compact, timestamp=self.timestamp, columns=columns,
+                             types=types, include=include)
+        if concat:
+            return _concat_event_results(results, self.dataframe)
+        return results
+
+    def _iter_events(self, urls, match_ids, chunk_size, columns, types, arrays, max_workers,
+                     processes, errors):
+        """ Iterate over the events for the urls in batches. See ``Sbopen.iter_events``."""
+        results = _load_many(self._get_content, urls, match_ids, True, max_workers=max_workers,
+                             processes=processes, errors=errors, compact=self.compact,
+                             timestamp=self.timestamp, columns=columns, types=types,
+                             include=('events',))
+        return _iter_batches((events for _, (events, *_) in results), chunk_size, arrays)
+
+
+class Sbopen(_SbBase):
+    """ Class for loading data from the StatsBomb open-data.
+    The data is available at: https://github.com/statsbomb/open-data under
+    a non-commercial license.
 
-    def event(self, match_id):
+    Parameters
+    ----------
+    dataframe : bool, default True
+        Whether to return dataframes (True) or flattened list of dictionaries (False)
+        from the class methods. Use 'numpy' for dictionaries of numpy arrays or 'structured'
+        for numpy structured arrays, see ``mplsoccer.statsbomb.flatten_event``.
+    cache_dir : str, default None
+        A directory for caching the raw responses on disk. The cache is keyed by url.
+        If None, the responses are not cached.
+    ttl : float, default None
+        The number of seconds a cached response is considered fresh. After this
+        the response is revalidated with the server using the ETag/ Last-Modified headers.
+        If None, cached responses never expire. Ignored if cache_dir is None.
+    max_bytes : int, default None
+        The maximum size of the cache in bytes. The least-recently-used responses are
+        removed when the cache is larger than this. If None, the cache size is unbounded.
+        Ignored if cache_dir is None.
+    session : requests.Session, default None
+        The session used for the HTTP requests. Pass the same session to several loaders
+        to share its connection pool. If None, a session is created with
+        pool_size, retries and backoff_factor. See ``create_session``.
+    pool_size : int, default 10
+        The maximum number of connections kept alive for each host. Ignored if session is given.
+    retries : int, default 3
+        The number of retries for connection errors, 429 and 5xx responses.
+        Ignored if session is given.
+    backoff_factor : float, default 0.5
+        The exponential backoff between retries in seconds. Ignored if session is given.
+    compact : bool, default False
+        Whether to return compact dataframes with smaller dtypes (only used if dataframe=True).
+        See ``mplsoccer.statsbomb.flatten_event``.
+    timestamp : str, default 'time'
+        The type of the event timestamps: 'time', 'timedelta' or 'seconds'.
+        See ``mplsoccer.statsbomb.flatten_event``.
+
+    Examples
+    --------
+    >>> from mplsoccer import Sbopen
+    >>> parser = Sbopen(cache_dir='statsbomb_cache', ttl=24 * 60 * 60, max_bytes=2 * 1024 ** 3)
+    >>> events, related, freeze, tactics = parser.event(3788741)
+    """
+
+    def __init__(self, dataframe=True, cache_dir=None, ttl=None, max_bytes=None,
+                 session=None, pool_size=10, retries=3, backoff_factor=0.5, compact=False,
+                 timestamp='time'):
+        super().__init__(dataframe=dataframe, cache_dir=cache_dir, ttl=ttl,
+                         max_bytes=max_bytes, session=session, pool_size=pool_size,
+                         retries=retries, backoff_factor=backoff_factor, compact=compact,
+                         timestamp=timestamp)
+        self.url = 'https://raw.githubusercontent.com/statsbomb/open-data/master/data/'
+
+    def event(self, match_id, columns=None, types=None, include=_EVENT_TABLES):
         """ StatsBomb event open-data.
 
         Parameters
         ----------
         match_id : int
+        columns : list of str, default None
+            The columns of the events to return. The default None returns all the columns.
+        types : list of str, default None
+            The event type names to return, e.g. ['Pass', 'Shot'].
+            The default None returns all the events.
+        include : tuple of str, default ('events', 'related', 'freeze', 'tactics')
+            The results to flatten. Results not included are returned as None.
+            See ``mplsoccer.statsbomb.flatten_event``.
 
         Returns
         -------
@@ -61,8 +632,104 @@ class Sbopen:
         >>> events, related, freeze, tactics = parser.event(3788741)
         """
         url = f'{self.url}events/{match_id}.json'
-        data = self._get_data(url)
-        return flatten_event(data, match_id, self.dataframe)
+        return self._load(url, 'events', match_id, flatten_event, match_id, self.dataframe,
+                          self.compact, columns, types, include, self.timestamp)
+
+    def events_many(self, match_ids, max_workers=8, processes=None, concat=True, errors='raise',
+                    columns=None, types=None, include=_EVENT_TABLES):
+        """ StatsBomb event open-data for many matches.
+
+        The matches are downloaded concurrently in a pool of threads and flattened
+        in a pool of processes.
+
+        Parameters
+        ----------
+        match_ids : sequence of int
+        max_workers : int, default 8
+            The maximum number of matches downloaded at the same time.
+        processes : int, default None
+            The number of processes used to flatten the events. If None, it is the number
+            of CPUs. If 0, the events are flattened in the download threads instead.
+        concat : bool, default True
+            Whether to concatenate the results for all the matches (True) or return
+            a generator yielding (match_id, (events, related, freeze, tactics)) for each
+            match (False).
+        errors : str, default 'raise'
+            One of 'raise' or 'warn'. If 'raise', a failed match raises a RuntimeError
+            with the original error as the cause. If 'warn', a warning is issued for
+            each failed match and the match is left out of the results.
+        columns : list of str, default None
+            The columns of the events to return. The default None returns all the columns.
+        types : list of str, default None
+            The event type names to return, e.g. ['Pass', 'Shot'].
+            The default None returns all the events.
+        include : tuple of str, default ('events', 'related', 'freeze', 'tactics')
+            The results to flatten. Results not included are returned as None.
+            See ``mplsoccer.statsbomb.flatten_event``.
+
+        Returns
+        -------
+        events, related, freeze, tactics
+            If concat=True, either concatenated dataframes or flattened lists of dictionaries
+            in the order of match_ids. If concat=False, a generator of (match_id, results)
+            in the order of match_ids.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbopen
+        >>> parser = Sbopen(dataframe=True)
+        >>> matches = parser.match(competition_id=37, season_id=42)
+        >>> events, related, freeze, tactics = parser.events_many(matches.match_id)
+        """
+        urls = [f'{self.url}events/{match_id}.json' for match_id in match_ids]
+        return self._events_many(urls, match_ids, max_workers, processes, concat, errors,
+                                 columns, types, include)
+
+    def iter_events(self, match_ids, chunk_size=10000, columns=None, types=None, arrays=False,
+                    max_workers=2, processes=0, errors='raise'):
+        """ Iterate over the events of many matches in batches with a fixed number of rows.
+
+        The next matches are downloaded and flattened in the background while a batch is being
+        consumed, and only the current match and batch are held in memory. The batches are
+        dataframes even if dataframe=False. Matches with different columns are combined with
+        missing values, so use columns for a fixed set of columns.
+
+        Parameters
+        ----------
+        match_ids : sequence of int
+        chunk_size : int, default 10000
+            The number of rows in each batch. The last batch may be smaller.
+        columns : list of str, default None
+            The columns of the events to return. The default None returns all the columns.
+        types : list of str, default None
+            The event type names to return, e.g. ['Pass', 'Shot'].
+            The default None returns all the events.
+        arrays : bool, default False
+            Whether to yield dataframes (False) or dictionaries of numpy arrays (True).
+        max_workers : int, default 2
+            The maximum number of matches downloaded at the same time. Up to twice this
+            number of matches are loaded ahead of the current batch.
+        processes : int, default 0
+            The number of processes used to flatten the events. If 0, the events are
+            flattened in the download threads. If None, it is the number of CPUs.
+        errors : str, default 'raise'
+            One of 'raise' or 'warn'. See ``events_many``.
+
+        Returns
+        -------
+        generator of pandas.DataFrame or dict of numpy.ndarray
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbopen
+        >>> parser = Sbopen()
+        >>> matches = parser.match(competition_id=37, season_id=42)
+        >>> for batch in parser.iter_events(matches.match_id, columns=['type_name', 'x', 'y']):
+        ...     print(len(batch))
+        """
+        urls = [f'{self.url}events/{match_id}.json' for match_id in match_ids]
+        return self._iter_events(urls, match_ids, chunk_size, columns, types, arrays,
+                                 max_workers, processes, errors)
 
     def lineup(self, match_id):
         """ StatsBomb lineup open-data.
@@ -83,8 +750,8 @@ class Sbopen:
         >>> lineups = parser.lineup(3788741)
         """
         url = f'{self.url}lineups/{match_id}.json'
-        data = self._get_data(url)
-        return flatten_lineup(data, match_id, self.dataframe)
+        return self._load(url, 'lineups', match_id, flatten_lineup, match_id, self.dataframe,
+                          self.compact)
 
     def match(self, competition_id, season_id):
         """ StatsBomb match open-data.
@@ -106,8 +773,7 @@ class Sbopen:
         >>> matches = parser.match(11, 1)
         """
         url = f'{self.url}matches/{competition_id}/{season_id}.json'
-        data = self._get_data(url)
-        return flatten_match(data, self.dataframe)
+        return self._load(url, 'matches', None, flatten_match, self.dataframe)
 
     def competition(self):
         """ StatsBomb competition open-data.
@@ -124,20 +790,23 @@ class Sbopen:
         >>> competition = parser.competition()
         """
         url = f'{self.url}competitions.json'
-        data = self._get_data(url)
-        return pd.DataFrame(data) if self.dataframe else data
+        return self._load(url, 'competitions', None, _flatten_competition, self.dataframe)
 
-    def frame(self, match_id):
+    def frame(self, match_id, arrays=False):
         """ StatsBomb 360 open-data.
 
         Parameters
         ----------
         match_id : int
+        arrays : bool, default False
+            Whether to return the frames as arrays (a FrameArrays) rather than
+            frames, visible. See ``mplsoccer.statsbomb.flatten_360``.
 
         Returns
         -------
         frames, visible
             Either dataframes or flattened list of dictionaries.
+            Or a FrameArrays if arrays=True.
 
         Examples
         --------
@@ -146,11 +815,11 @@ class Sbopen:
         >>> frames, visible = parser.frame(3788741)
         """
         url = f'{self.url}three-sixty/{match_id}.json'
-        data = self._get_data(url)
-        return flatten_360(data, match_id, self.dataframe)
+        return self._load(url, 'three-sixty', match_id, flatten_360, match_id, self.dataframe,
+                          self.compact, arrays)
 
 
-class Sbapi:
+class Sbapi(_SbBase):
     """ Class for loading data from the StatsBomb API. You can either set the SB_USERNAME and
     SB_PASSWORD environmental variables or use the username and password arguments.
 
@@ -164,56 +833,190 @@ class Sbapi:
         If None then uses the SB_PASSWORD environmental variable.
     dataframe : bool, default True
         Whether to return dataframes (True) or flattened list of dictionaries (False)
-        from the class methods.
+        from the class methods. Use 'numpy' for dictionaries of numpy arrays or 'structured'
+        for numpy structured arrays, see ``mplsoccer.statsbomb.flatten_event``.
+    cache_dir : str, default None
+        A directory for caching the raw responses on disk. The cache is keyed by url.
+        If None, the responses are not cached.
+    ttl : float, default None
+        The number of seconds a cached response is considered fresh. After this
+        the response is revalidated with the server using the ETag/ Last-Modified headers.
+        If None, cached responses never expire. Ignored if cache_dir is None.
+    max_bytes : int, default None
+        The maximum size of the cache in bytes. The least-recently-used responses are
+        removed when the cache is larger than this. If None, the cache size is unbounded.
+        Ignored if cache_dir is None.
+    session : requests.Session, default None
+        The session used for the HTTP requests. Pass the same session to several loaders
+        to share its connection pool. If None, a session is created with
+        pool_size, retries and backoff_factor. See ``create_session``.
+    pool_size : int, default 10
+        The maximum number of connections kept alive for each host. Ignored if session is given.
+    retries : int, default 3
+        The number of retries for connection errors, 429 and 5xx responses.
+        Ignored if session is given.
+    backoff_factor : float, default 0.5
+        The exponential backoff between retries in seconds. Ignored if session is given.
+    compact : bool, default False
+        Whether to return compact dataframes with smaller dtypes (only used if dataframe=True).
+        See ``mplsoccer.statsbomb.flatten_event``.
+    timestamp : str, default 'time'
+        The type of the event timestamps: 'time', 'timedelta' or 'seconds'.
+        See ``mplsoccer.statsbomb.flatten_event``.
     """
 
-    def __init__(self, username=None, password=None, dataframe=True):
+    def __init__(self, username=None, password=None, dataframe=True,
+                 cache_dir=None, ttl=None, max_bytes=None,
+                 session=None, pool_size=10, retries=3, backoff_factor=0.5, compact=False,
+                 timestamp='time'):
         if username is None:
             username = os.environ.get("SB_USERNAME")
         if password is None:
             password = os.environ.get("SB_PASSWORD")
+        super().__init__(dataframe=dataframe, cache_dir=cache_dir, ttl=ttl,
+                         max_bytes=max_bytes, session=session, pool_size=pool_size,
+                         retries=retries, backoff_factor=backoff_factor, compact=compact,
+                         timestamp=timestamp)
         self.auth = requests.auth.HTTPBasicAuth(username, password)
-        self.dataframe = dataframe
         self.url = 'https://data.statsbombservices.com/api/v'
 
-    def _get_data(self, url):
-        """ Get the StatsBomb data as a list of dictionaries.
+    @property
+    def _user(self):
+        """ The username the cached responses and results are kept separate for."""
+        return self.auth.username
+
+    def _fetch(self, url, headers):
+        """ Make the HTTP request."""
+        return self.session.get(url=url, headers=headers, auth=self.auth)
+
+    def event(self, match_id, version=6, columns=None, types=None, include=_EVENT_TABLES):
+        """ StatsBomb event data from the API.
 
         Parameters
         ----------
-        url : str
+        match_id : int
+        version : int, default 6
+        columns : list of str, default None
+            The columns of the events to return. The default None returns all the columns.
+        types : list of str, default None
+            The event type names to return, e.g. ['Pass', 'Shot'].
+            The default None returns all the events.
+        include : tuple of str, default ('events', 'related', 'freeze', 'tactics')
+            The results to flatten. Results not included are returned as None.
+            See ``mplsoccer.statsbomb.flatten_event``.
 
         Returns
         -------
-        json-encoded content of a request's response
-            For the StatsBomb data this is typically a list of dictionaries.
+        events, related, freeze, tactics
+            Either dataframes or flattened list of dictionaries.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbapi
+        >>> parser = Sbapi(dataframe=True)
+        >>> events, related, freeze, tactics = parser.event(3788741)
         """
-        resp = requests.get(url=url, auth=self.auth)
-        resp.raise_for_status()
-        return resp.json()
+        url = f'{self.url}{version}/events/{match_id}'
+        return self._load(url, 'events', match_id, flatten_event, match_id, self.dataframe,
+                          self.compact, columns, types, include, self.timestamp)
 
-    def event(self, match_id, version=6):
-        """ StatsBomb event data from the API.
+    def events_many(self, match_ids, version=6, max_workers=8, processes=None,
+                    concat=True, errors='raise', columns=None, types=None,
+                    include=_EVENT_TABLES):
+        """ StatsBomb event data from the API for many matches.
+
+        The matches are downloaded concurrently in a pool of threads and flattened
+        in a pool of processes.
 
         Parameters
         ----------
-        match_id : int
+        match_ids : sequence of int
         version : int, default 6
+        max_workers : int, default 8
+            The maximum number of matches downloaded at the same time.
+        processes : int, default None
+            The number of processes used to flatten the events. If None, it is the number
+            of CPUs. If 0, the events are flattened in the download threads instead.
+        concat : bool, default True
+            Whether to concatenate the results for all the matches (True) or return
+            a generator yielding (match_id, (events, related, freeze, tactics)) for each
+            match (False).
+        errors : str, default 'raise'
+            One of 'raise' or 'warn'. If 'raise', a failed match raises a RuntimeError
+            with the original error as the cause. If 'warn', a warning is issued for
+            each failed match and the match is left out of the results.
+        columns : list of str, default None
+            The columns of the events to return. The default None returns all the columns.
+        types : list of str, default None
+            The event type names to return, e.g. ['Pass', 'Shot'].
+            The default None returns all the events.
+        include : tuple of str, default ('events', 'related', 'freeze', 'tactics')
+            The results to flatten. Results not included are returned as None.
+            See ``mplsoccer.statsbomb.flatten_event``.
 
         Returns
         -------
         events, related, freeze, tactics
-            Either dataframes or flattened list of dictionaries.
+            If concat=True, either concatenated dataframes or flattened lists of dictionaries
+            in the order of match_ids. If concat=False, a generator of (match_id, results)
+            in the order of match_ids.
 
         Examples
         --------
         >>> from mplsoccer import Sbapi
         >>> parser = Sbapi(dataframe=True)
-        >>> events, related, freeze, tactics = parser.event(3788741)
+        >>> events, related, freeze, tactics = parser.events_many([3788741, 3788742])
         """
-        url = f'{self.url}{version}/events/{match_id}'
-        data = self._get_data(url)
-        return flatten_event(data, match_id, self.dataframe)
+        urls = [f'{self.url}{version}/events/{match_id}' for match_id in match_ids]
+        return self._events_many(urls, match_ids, max_workers, processes, concat, errors,
+                                 columns, types, include)
+
+    def iter_events(self, match_ids, version=6, chunk_size=10000, columns=None, types=None,
+                    arrays=False, max_workers=2, processes=0, errors='raise'):
+        """ Iterate over the events of many matches in batches with a fixed number of rows.
+
+        The next matches are downloaded and flattened in the background while a batch is being
+        consumed, and only the current match and batch are held in memory. The batches are
+        dataframes even if dataframe=False. Matches with different columns are combined with
+        missing values, so use columns for a fixed set of columns.
+
+        Parameters
+        ----------
+        match_ids : sequence of int
+        version : int, default 6
+        chunk_size : int, default 10000
+            The number of rows in each batch. The last batch may be smaller.
+        columns : list of str, default None
+            The columns of the events to return. The default None returns all the columns.
+        types : list of str, default None
+            The event type names to return, e.g. ['Pass', 'Shot'].
+            The default None returns all the events.
+        arrays : bool, default False
+            Whether to yield dataframes (False) or dictionaries of numpy arrays (True).
+        max_workers : int, default 2
+            The maximum number of matches downloaded at the same time. Up to twice this
+            number of matches are loaded ahead of the current batch.
+        processes : int, default 0
+            The number of processes used to flatten the events. If 0, the events are
+            flattened in the download threads. If None, it is the number of CPUs.
+        errors : str, default 'raise'
+            One of 'raise' or 'warn'. See ``events_many``.
+
+        Returns
+        -------
+        generator of pandas.DataFrame or dict of numpy.ndarray
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbapi
+        >>> parser = Sbapi(username='username', password='password')
+        >>> matches = parser.match(competition_id=37, season_id=42)
+        >>> for batch in parser.iter_events(matches.match_id, columns=['type_name', 'x', 'y']):
+        ...     print(len(batch))
+        """
+        urls = [f'{self.url}{version}/events/{match_id}' for match_id in match_ids]
+        return self._iter_events(urls, match_ids, chunk_size, columns, types, arrays,
+                                 max_workers, processes, errors)
 
     def lineup(self, match_id, version=2):
         """ StatsBomb lineup data from the API.
@@ -235,8 +1038,8 @@ class Sbapi:
         >>> lineups = parser.lineup(3788741)
         """
         url = f'{self.url}{version}/lineups/{match_id}'
-        data = self._get_data(url)
-        return flatten_lineup(data, match_id, self.dataframe)
+        return self._load(url, 'lineups', match_id, flatten_lineup, match_id, self.dataframe,
+                          self.compact)
 
     def match(self, competition_id, season_id, version=5):
         """ StatsBomb match data from the API.
@@ -259,8 +1062,7 @@ class Sbapi:
         >>> matches = parser.match(11, 1)
         """
         url = f'{self.url}{version}/competitions/{competition_id}/seasons/{season_id}/matches'
-        data = self._get_data(url)
-        return flatten_match(data, self.dataframe)
+        return self._load(url, 'matches', None, flatten_match, self.dataframe)
 
     def competition(self, version=4):
         """ StatsBomb competition from the API.
@@ -281,21 +1083,24 @@ class Sbapi:
         >>> competition = parser.competition()
         """
         url = f'{self.url}{version}/competitions'
-        data = self._get_data(url)
-        return pd.DataFrame(data) if self.dataframe else data
+        return self._load(url, 'competitions', None, _flatten_competition, self.dataframe)
 
-    def frame(self, match_id, version=1):
+    def frame(self, match_id, version=1, arrays=False):
         """ StatsBomb 360 data from the API.
 
         Parameters
         ----------
         match_id : int
         version : int, default 1
+        arrays : bool, default False
+            Whether to return the frames as arrays (a FrameArrays) rather than
+            frames, visible. See ``mplsoccer.statsbomb.flatten_360``.
 
         Returns
         -------
         frames, visible
             Either dataframes or flattened list of dictionaries.
+            Or a FrameArrays if arrays=True.
 
         Examples
         --------
@@ -304,22 +1109,588 @@ class Sbapi:
         >>> frames, visible = parser.frame(3788741)
         """
         url = f'{self.url}{version}/360-frames/{match_id}'
-        data = self._get_data(url)
-        return flatten_360(data, match_id, self.dataframe)
+        return self._load(url, 'three-sixty', match_id, flatten_360, match_id, self.dataframe,
+                          self.compact, arrays)
+
+
+class _AsyncSbBase:
+    """ Base class for the asyncio StatsBomb loaders. It manages the aiohttp session,
+    limits the number of concurrent requests, and flattens the data in an executor
+    so that the JSON decoding and flattening do not block the event loop."""
+
+    def __init__(self, dataframe=True, max_concurrency=10, session=None, executor=None,
+                 compact=False, timestamp='time'):
+        try:
+            import aiohttp  # pylint: disable=import-outside-toplevel
+        except ImportError as err:
+            raise ImportError('The asyncio StatsBomb loaders require aiohttp. '
+                              'Install it with: pip install aiohttp') from err
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least one')
+        self._aiohttp = aiohttp
+        self.dataframe = dataframe
+        self.compact = compact
+        self.timestamp = timestamp
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        self.session = session
+        self._owns_session = session is None
+        self._semaphore = None
+        self.headers = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """ Close the aiohttp session if it was created by the loader."""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _get_content(self, url):
+        """ Get the raw content of the response for a url."""
+        # the session and semaphore are created lazily so they bind to the running loop
+        if self.session is None:
+            self.session = self._aiohttp.ClientSession()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            async with self.session.get(url, headers=self.headers) as resp:
+                resp.raise_for_status()
+                return await resp.read()
+
+    async def _load(self, url, flatten, *args):
+        """ Get the data for a url and flatten it in the executor."""
+        content = await self._get_content(url)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor,
+                                          partial(_flatten_content, flatten, content, *args))
+
+
+class AsyncSbopen(_AsyncSbBase):
+    """ Class for loading data from the StatsBomb open-data with asyncio.
+    The data is available at: https://github.com/statsbomb/open-data under
+    a non-commercial license.
+
+    The methods are coroutines with the same arguments and results as ``Sbopen``.
+    This requires aiohttp.
+
+    Parameters
+    ----------
+    dataframe : bool, default True
+        Whether to return dataframes (True) or flattened list of dictionaries (False)
+        from the class methods. Use 'numpy' for dictionaries of numpy arrays or 'structured'
+        for numpy structured arrays, see ``mplsoccer.statsbomb.flatten_event``.
+    max_concurrency : int, default 10
+        The maximum number of requests in flight at the same time.
+    session : aiohttp.ClientSession, default None
+        The session used for the HTTP requests. If None, a session is created on the
+        first request and closed by ``close`` or when exiting the ``async with`` block.
+    executor : concurrent.futures.Executor, default None
+        The executor for decoding and flattening the data off the event loop.
+        If None, the event loop's default executor is used. Use a
+        concurrent.futures.ProcessPoolExecutor to flatten in other processes.
+    compact : bool, default False
+        Whether to return compact dataframes with smaller dtypes (only used if dataframe=True).
+        See ``mplsoccer.statsbomb.flatten_event``.
+    timestamp : str, default 'time'
+        The type of the event timestamps: 'time', 'timedelta' or 'seconds'.
+        See ``mplsoccer.statsbomb.flatten_event``.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from mplsoccer import AsyncSbopen
+    >>> async def main():
+    ...     async with AsyncSbopen() as parser:
+    ...         return await asyncio.gather(parser.event(3788741), parser.event(3788742))
+    >>> results = asyncio.run(main())
+    """
+
+    def __init__(self, dataframe=True, max_concurrency=10, session=None, executor=None,
+                 compact=False, timestamp='time'):
+        super().__init__(dataframe=dataframe, max_concurrency=max_concurrency,
+                         session=session, executor=executor, compact=compact,
+                         timestamp=timestamp)
+        self.url = 'https://raw.githubusercontent.com/statsbomb/open-data/master/data/'
+
+    async def event(self, match_id, columns=None, types=None, include=_EVENT_TABLES):
+        """ StatsBomb event open-data.
+
+        Parameters
+        ----------
+        match_id : int
+        columns : list of str, default None
+            The columns of the events to return. The default None returns all the columns.
+        types : list of str, default None
+            The event type names to return, e.g. ['Pass', 'Shot'].
+            The default None returns all the events.
+        include : tuple of str, default ('events', 'related', 'freeze', 'tactics')
+            The results to flatten. Results not included are returned as None.
+            See ``mplsoccer.statsbomb.flatten_event``.
+
+        Returns
+        -------
+        events, related, freeze, tactics
+            Either dataframes or flattened list of dictionaries.
+        """
+        url = f'{self.url}events/{match_id}.json'
+        return await self._load(url, flatten_event, match_id, self.dataframe,
+                                self.compact, columns, types, include, self.timestamp)
+
+    async def lineup(self, match_id):
+        """ StatsBomb lineup open-data.
+
+        Parameters
+        ----------
+        match_id : int
+
+        Returns
+        -------
+        lineups
+            A dataframe or a flattened list of dictionaries.
+        """
+        url = f'{self.url}lineups/{match_id}.json'
+        return await self._load(url, flatten_lineup, match_id, self.dataframe,
+                                self.compact)
+
+    async def match(self, competition_id, season_id):
+        """ StatsBomb match open-data.
+
+        Parameters
+        ----------
+        competition_id : int
+        season_id : int
+
+        Returns
+        -------
+        matches
+            A dataframe or a flattened list of dictionaries.
+        """
+        url = f'{self.url}matches/{competition_id}/{season_id}.json'
+        return await self._load(url, flatten_match, self.dataframe)
+
+    async def competition(self):
+        """ StatsBomb competition open-data.
+
+        Returns
+        -------
+        competition
+            A dataframe or a flattened list of dictionaries.
+        """
+        url = f'{self.url}competitions.json'
+        return await self._load(url, _flatten_competition, self.dataframe)
+
+    async def frame(self, match_id, arrays=False):
+        """ StatsBomb 360 open-data.
+
+        Parameters
+        ----------
+        match_id : int
+        arrays : bool, default False
+            Whether to return the frames as arrays (a FrameArrays) rather than
+            frames, visible. See ``mplsoccer.statsbomb.flatten_360``.
+
+        Returns
+        -------
+        frames, visible
+            Either dataframes or flattened list of dictionaries.
+            Or a FrameArrays if arrays=True.
+        """
+        url = f'{self.url}three-sixty/{match_id}.json'
+        return await self._load(url, flatten_360, match_id, self.dataframe,
+                                self.compact, arrays)
+
+
+class AsyncSbapi(_AsyncSbBase):
+    """ Class for loading data from the StatsBomb API with asyncio. You can either set
+    the SB_USERNAME and SB_PASSWORD environmental variables or use the username and
+    password arguments.
+
+    The methods are coroutines with the same arguments and results as ``Sbapi``.
+    This requires aiohttp.
+
+    Parameters
+    ----------
+    username : str, default None
+        Username for accessing StatsBomb API.
+        If None then uses the SB_USERNAME environmental variable.
+    password : str, default None
+        Password for accessing the StatsBomb API.
+        If None then uses the SB_PASSWORD environmental variable.
+    dataframe : bool, default True
+        Whether to return dataframes (True) or flattened list of dictionaries (False)
+        from the class methods. Use 'numpy' for dictionaries of numpy arrays or 'structured'
+        for numpy structured arrays, see ``mplsoccer.statsbomb.flatten_event``.
+    max_concurrency : int, default 10
+        The maximum number of requests in flight at the same time.
+    session : aiohttp.ClientSession, default None
+        The session used for the HTTP requests. If None, a session is created on the
+        first request and closed by ``close`` or when exiting the ``async with`` block.
+    executor : concurrent.futures.Executor, default None
+        The executor for decoding and flattening the data off the event loop.
+        If None, the event loop's default executor is used.
+    compact : bool, default False
+        Whether to return compact dataframes with smaller dtypes (only used if dataframe=True).
+        See ``mplsoccer.statsbomb.flatten_event``.
+    timestamp : str, default 'time'
+        The type of the event timestamps: 'time', 'timedelta' or 'seconds'.
+        See ``mplsoccer.statsbomb.flatten_event``.
+
+    Examples
+    --------
+    >>> import asyncio
+    >>> from mplsoccer import AsyncSbapi
+    >>> async def main():
+    ...     async with AsyncSbapi() as parser:
+    ...         return await parser.event(3788741)
+    >>> events, related, freeze, tactics = asyncio.run(main())
+    """
+
+    def __init__(self, username=None, password=None, dataframe=True, max_concurrency=10,
+                 session=None, executor=None, compact=False, timestamp='time'):
+        super().__init__(dataframe=dataframe, max_concurrency=max_concurrency,
+                         session=session, executor=executor, compact=compact,
+                         timestamp=timestamp)
+        if username is None:
+            username = os.environ.get("SB_USERNAME")
+        if password is None:
+            password = os.environ.get("SB_PASSWORD")
+        credentials = base64.b64encode(f'{username}:{password}'.encode('utf-8')).decode('ascii')
+        self.headers = {'Authorization': f'Basic {credentials}'}
+        self.url = 'https://data.statsbombservices.com/api/v'
+
+    async def event(self, match_id, version=6, columns=None, types=None,
+                    include=_EVENT_TABLES):
+        """ StatsBomb event data from the API.
+
+        Parameters
+        ----------
+        match_id : int
+        version : int, default 6
+        columns : list of str, default None
+            The columns of the events to return. The default None returns all the columns.
+        types : list of str, default None
+            The event type names to return, e.g. ['Pass', 'Shot'].
+            The default None returns all the events.
+        include : tuple of str, default ('events', 'related', 'freeze', 'tactics')
+            The results to flatten. Results not included are returned as None.
+            See ``mplsoccer.statsbomb.flatten_event``.
+
+        Returns
+        -------
+        events, related, freeze, tactics
+            Either dataframes or flattened list of dictionaries.
+        """
+        url = f'{self.url}{version}/events/{match_id}'
+        return await self._load(url, flatten_event, match_id, self.dataframe,
+                                self.compact, columns, types, include, self.timestamp)
+
+    async def lineup(self, match_id, version=2):
+        """ StatsBomb lineup data from the API.
+
+        Parameters
+        ----------
+        match_id : int
+        version : int, default 2
+
+        Returns
+        -------
+        lineups
+            A dataframe or a flattened list of dictionaries.
+        """
+        url = f'{self.url}{version}/lineups/{match_id}'
+        return await self._load(url, flatten_lineup, match_id, self.dataframe,
+                                self.compact)
+
+    async def match(self, competition_id, season_id, version=5):
+        """ StatsBomb match data from the API.
+
+        Parameters
+        ----------
+        competition_id : int
+        season_id : int
+        version : int, default 5
+
+        Returns
+        -------
+        matches
+            A dataframe or a flattened list of dictionaries.
+        """
+        url = f'{self.url}{version}/competitions/{competition_id}/seasons/{season_id}/matches'
+        return await self._load(url, flatten_match, self.dataframe)
+
+    async def competition(self, version=4):
+        """ StatsBomb competition from the API.
+
+        Parameters
+        ----------
+        version : int, default 4
+
+        Returns
+        -------
+        competition
+            A dataframe or a flattened list of dictionaries.
+        """
+        url = f'{self.url}{version}/competitions'
+        return await self._load(url, _flatten_competition, self.dataframe)
+
+    async def frame(self, match_id, version=1, arrays=False):
+        """ StatsBomb 360 data from the API.
+
+        Parameters
+        ----------
+        match_id : int
+        version : int, default 1
+        arrays : bool, default False
+            Whether to return the frames as arrays (a FrameArrays) rather than
+            frames, visible. See ``mplsoccer.statsbomb.flatten_360``.
+
+        Returns
+        -------
+        frames, visible
+            Either dataframes or flattened list of dictionaries.
+            Or a FrameArrays if arrays=True.
+        """
+        url = f'{self.url}{version}/360-frames/{match_id}'
+        return await self._load(url, flatten_360, match_id, self.dataframe,
+                                self.compact, arrays)
+
+
+def _iter_json_array(file, chunk_size=65536):
+    """ Parse a JSON array incrementally from a text file, yielding one element at a time.
+
+    The file is read in chunks and each element is decoded as soon as it is complete, so only
+    the current element (not the whole file) is held in memory.
+
+    Parameters
+    ----------
+    file : a file object opened in text mode
+    chunk_size : int, default 65536
+        The number of characters to read at a time.
+
+    Yields
+    ------
+    The elements of the array, which for the StatsBomb data are typically dictionaries.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def read_more(buffer, pos):
+        chunk = file.read(chunk_size)
+        return buffer[pos:] + chunk, 0, chunk == ''
+
+    # find the opening bracket
+    while True:
+        buffer = buffer.lstrip()
+        if buffer or eof:
+            break
+        buffer, pos, eof = read_more(buffer, pos)
+    if not buffer.startswith('['):
+        raise ValueError('Expected the file to contain a JSON array')
+    pos = 1
+    expect_comma = False
+    while True:
+        # skip the whitespace and separators between elements
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\n\r':
+                pos += 1
+            if pos < len(buffer):
+                break
+            if eof:
+                raise ValueError('Unexpected end of file while parsing the JSON array')
+            buffer, pos, eof = read_more(buffer, pos)
+        char = buffer[pos]
+        if char == ']':
+            return
+        if expect_comma:
+            if char != ',':
+                raise ValueError(f'Expected a comma between the array elements at: {char!r}')
+            pos += 1
+            expect_comma = False
+            continue
+        # decode the next element, reading more of the file until it is complete
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                buffer, pos, eof = read_more(buffer, pos)
+                continue
+            # a number may be cut short by the end of the buffer (e.g. -0.5 read as -0),
+            # so check it is followed by whitespace, a comma or the closing bracket
+            if (not eof and not isinstance(element, (dict, list, str)) and
+                    (end == len(buffer) or buffer[end] not in ' \t\n\r,]')):
+                buffer, pos, eof = read_more(buffer, pos)
+                continue
+            break
+        yield element
+        pos = end
+        expect_comma = True
+        if pos > chunk_size:  # drop the parsed text so the buffer does not grow
+            buffer, pos = buffer[pos:], 0
+
+
+def _import_zstandard():
+    """ Import zstandard, which is an optional dependency only needed for .zst files."""
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel
+    except ImportError as err:
+        raise ImportError('Reading .zst files requires zstandard. '
+                          'Install it with: pip install zstandard') from err
+    return zstandard
+
+
+def _split_zip_path(path):
+    """ Split a path to a member of a zip file, e.g. open-data.zip/data/events/7478.json,
+    into the path to the zip file and the member name. Returns (None, path) for other paths."""
+    path = os.fspath(path)
+    for idx, character in enumerate(path[:-1]):
+        if character in '/' + os.sep and path[:idx].lower().endswith('.zip') and \
+                os.path.isfile(path[:idx]):
+            return path[:idx], path[idx + 1:].replace(os.sep, '/')
+    return None, path
+
+
+@contextmanager
+def _open_local(path):
+    """ Open a local StatsBomb file as a text stream. Paths ending in .gz or .zst are
+    decompressed and zip members (see ``_split_zip_path``) are read straight from the zip
+    file, as the stream is read and without temporary files."""
+    with ExitStack() as stack:
+        archive, name = _split_zip_path(path)
+        if archive is None:
+            file = stack.enter_context(open(name, 'rb'))
+        else:
+            file = stack.enter_context(stack.enter_context(zipfile.ZipFile(archive)).open(name))
+        if name.endswith('.gz'):
+            file = stack.enter_context(gzip.GzipFile(fileobj=file))
+        elif name.endswith('.zst'):
+            decompressor = _import_zstandard().ZstdDecompressor()
+            file = stack.enter_context(decompressor.stream_reader(file))
+        yield io.TextIOWrapper(file, encoding='utf-8')
+
+
+def _local_size(path):
+    """ Get the size of a local file in bytes (None for zip members)."""
+    archive, name = _split_zip_path(path)
+    return os.path.getsize(name) if archive is None else None
+
+
+def _local_match_id(path):
+    """ Get the match identifier from a file name, e.g. 7478.json or 7478.json.gz."""
+    name = os.path.basename(_split_zip_path(path)[1].replace('/', os.sep))
+    return int(name.split('.')[0])
+
+
+def _flatten_local(options, method, args, path):
+    """ Flatten a local file with a Sblocal method. This is a module level function so that it
+    can be pickled and run in a process pool. The dataframes are returned as dictionaries of
+    numpy arrays with the same dtypes, which are quicker to send back from the process."""
+    results = getattr(Sblocal(**options), method)(path, *args)
+    if options['dataframe'] is True:
+        return tuple(_dataframe_to_arrays(df) for df in results)
+    return results
+
+
+def _map_local(func, paths, processes=None, errors='raise'):
+    """ Generator that calls func(path) in a process pool, yielding (path, result) in order.
+    Only a window of files twice the number of processes is in flight at any time."""
+    if errors not in ['raise', 'warn']:
+        raise ValueError("errors must be one of 'raise' or 'warn'")
+    pool = None if processes == 0 else ProcessPoolExecutor(max_workers=processes)
+    window = 1 if pool is None else 2 * (processes or os.cpu_count() or 1)
+
+    def submit(path):
+        if pool is None:
+            return path, None, partial(func, path)
+        future = pool.submit(func, path)
+        return path, future, future.result
+
+    try:
+        paths = iter(paths)
+        pending = deque(submit(path) for path in islice(paths, window))
+        while pending:
+            path, _, result = pending.popleft()
+            pending.extend(submit(path) for path in islice(paths, 1))
+            try:
+                result = result()
+            except Exception as err:  # pylint: disable=broad-except
+                msg = f'Failed to load {os.fspath(path)}: {err!r}'
+                if errors == 'raise':
+                    for _, future, _ in pending:
+                        if future is not None:
+                            future.cancel()
+                    raise RuntimeError(msg) from err
+                warnings.warn(msg)
+                continue
+            yield path, result
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
 
 class Sblocal:
     """ Class for loading local StatsBomb data.
 
+    The files can be plain JSON, compressed with gzip (.json.gz) or zstandard (.json.zst),
+    or members of a zip file, e.g. a download of the open-data repository, with paths like
+    open-data-master.zip/open-data-master/data/events/7478.json. The files are decompressed
+    as they are read. Reading .zst files requires zstandard.
+
     Parameters
     ----------
     dataframe : bool, default True
         Whether to return dataframes (True) or flattened list of dictionaries (False)
-        from the class methods.
+        from the class methods. Use 'numpy' for dictionaries of numpy arrays or 'structured'
+        for numpy structured arrays, see ``mplsoccer.statsbomb.flatten_event``.
+    stream : bool, default False
+        Whether to parse the event and 360 files incrementally, flattening each event/ frame
+        as it is read (True), rather than loading the whole file first (False).
+        This keeps the peak memory close to the size of the results for large files.
+        The results are the same either way. Streaming is only used for the dataframe results.
+    compact : bool, default False
+        Whether to return compact dataframes with smaller dtypes (only used if dataframe=True).
+        See ``mplsoccer.statsbomb.flatten_event``.
+    timestamp : str, default 'time'
+        The type of the event timestamps: 'time', 'timedelta' or 'seconds'.
+        See ``mplsoccer.statsbomb.flatten_event``.
     """
 
-    def __init__(self, dataframe=True):
+    def __init__(self, dataframe=True, stream=False, compact=False, timestamp='time'):
         self.dataframe = dataframe
+        self.stream = stream
+        self.compact = compact
+        self.timestamp = timestamp
+
+    @staticmethod
+    def _iter_data(path):
+        """ Read the StatsBomb data (a list) one element at a time.
+
+        Parameters
+        ----------
+        path : path to file
+
+        Yields
+        ------
+        For the StatsBomb data this typically yields dictionaries.
+        """
+        _set_cache_status('file')
+        _add_bytes(_local_size(path))
+        with _open_local(path) as file:
+            yield from _iter_json_array(file)
+
+    def _get_rows(self, path, arrays=False):
+        """ Read the rows of the data either incrementally or all at once."""
+        if self.stream and (self.dataframe or arrays):
+            return self._iter_data(path)
+        return self._get_data(path)
 
     @staticmethod
     def _get_data(path):
@@ -333,16 +1704,32 @@ class Sblocal:
         -------
         For the StatsBomb data this typically returns a list of dictionaries.
         """
-        with open(path, encoding='utf-8') as file:
+        _set_cache_status('file')
+        _add_bytes(_local_size(path))
+        with _timed('parse_time'), _open_local(path) as file:
             data = json.load(file)
         return data
 
-    def event(self, path):
+    def _load(self, path, endpoint, match_id, read, flatten, *args):
+        """ Read a local file with read(path) and flatten it with flatten(data, *args),
+        reporting the call to the hooks (see ``add_load_hook``)."""
+        return _instrumented(endpoint, match_id, path,
+                             lambda: _flatten_timed(flatten, read(path), *args))
+
+    def event(self, path, columns=None, types=None, include=_EVENT_TABLES):
         """ Read the event data from a local file.
 
         Parameters
         ----------
         path : path to file
+        columns : list of str, default None
+            The columns of the events to return. The default None returns all the columns.
+        types : list of str, default None
+            The event type names to return, e.g. ['Pass', 'Shot'].
+            The default None returns all the events.
+        include : tuple of str, default ('events', 'related', 'freeze', 'tactics')
+            The results to flatten. Results not included are returned as None.
+            See ``mplsoccer.statsbomb.flatten_event``.
 
         Returns
         -------
@@ -355,9 +1742,162 @@ class Sblocal:
         >>> parser = Sblocal(dataframe=True)
         >>> events, related, freeze, tactics = parser.event(path)
         """
-        data = self._get_data(path)
-        match_id = int(os.path.basename(path)[:-5])
-        return flatten_event(data, match_id, self.dataframe)
+        match_id = _local_match_id(path)
+        return self._load(path, 'events', match_id, self._get_rows, flatten_event, match_id,
+                          self.dataframe, self.compact, columns, types, include, self.timestamp)
+
+    def _read_events(self, path, columns=None, types=None):
+        """ Read the events from a local file as a dataframe."""
+        match_id = _local_match_id(path)
+        return self._load(path, 'events', match_id, partial(self._get_rows, arrays=True),
+                          flatten_event, match_id, True, self.compact, columns, types,
+                          ('events',), self.timestamp)[0]
+
+    def _many(self, method, tables, paths, args, processes, concat, errors):
+        """ Flatten many files in a process pool. The workers return dictionaries of numpy arrays
+        (or lists of dictionaries if dataframe=False), which are concatenated and converted to
+        the output once in this process."""
+        columnar = self.dataframe is not False
+        options = {'dataframe': 'numpy' if self.dataframe in _ARRAY_OUTPUTS else self.dataframe,
+                   'stream': self.stream, 'timestamp': self.timestamp}
+        results = _map_local(partial(_flatten_local, options, method, args), paths,
+                             processes=processes, errors=errors)
+        if not columnar:
+            if concat:
+                return tuple(_concat(frames, False) for frames in zip(*(result for _, result
+                                                                          in results)))
+            return results
+
+        def output(frames, table):
+            if self.dataframe in _ARRAY_OUTPUTS:
+                return _array_output(_concat(frames, 'numpy'), self.dataframe)
+            df = _concat_dataframe_arrays([frame for frame in frames if frame is not None])
+            if df is None or not self.compact:
+                return df
+            return _compact_dataframe(df, table)
+
+        if not concat:
+            return ((path, tuple(output([frames], table) for frames, table in zip(result, tables)))
+                    for path, result in results)
+        frames = [[] for _ in tables]
+        for _, result in results:
+            for table_frames, frame in zip(frames, result):
+                table_frames.append(frame)
+        return tuple(output(table_frames, table) for table_frames, table in zip(frames, tables))
+
+    def events_many(self, paths, processes=None, concat=True, errors='raise', columns=None,
+                    types=None, include=_EVENT_TABLES):
+        """ Read the event data from many local files, flattening them in a pool of processes.
+
+        The workers send the results back as numpy arrays rather than dataframes, which are
+        quicker to send back to this process, and the arrays for all the files are concatenated
+        before creating one dataframe for each result. The dataframes have the same columns and
+        dtypes as concatenating the results of ``Sblocal.event`` with pandas.concat.
+
+        Parameters
+        ----------
+        paths : sequence of paths to files
+        processes : int, default None
+            The number of processes used to flatten the events. If None, it is the number
+            of CPUs. If 0, the events are flattened in this process.
+        concat : bool, default True
+            Whether to concatenate the results for all the files (True) or return
+            a generator yielding (path, (events, related, freeze, tactics)) for each
+            file (False).
+        errors : str, default 'raise'
+            One of 'raise' or 'warn'. If 'raise', a failed file raises a RuntimeError
+            with the original error as the cause. If 'warn', a warning is issued for
+            each failed file and the file is left out of the results.
+        columns, types, include
+            See ``Sblocal.event``.
+
+        Returns
+        -------
+        events, related, freeze, tactics
+            If concat=True, the concatenated results in the order of paths.
+            If concat=False, a generator of (path, results) in the order of paths.
+
+        Examples
+        --------
+        >>> import glob
+        >>> from mplsoccer import Sblocal
+        >>> parser = Sblocal()
+        >>> paths = sorted(glob.glob('open-data/data/events/*.json'))
+        >>> events, related, freeze, tactics = parser.events_many(paths)
+        """
+        return self._many('event', _EVENT_TABLES, paths, (columns, types, include), processes,
+                          concat, errors)
+
+    def frames_many(self, paths, processes=None, concat=True, errors='raise'):
+        """ Read the 360 data from many local files, flattening them in a pool of processes.
+        See ``Sblocal.events_many``.
+
+        Parameters
+        ----------
+        paths : sequence of paths to files
+        processes : int, default None
+            The number of processes used to flatten the frames. If None, it is the number
+            of CPUs. If 0, the frames are flattened in this process.
+        concat : bool, default True
+            Whether to concatenate the results for all the files (True) or return
+            a generator yielding (path, (frames, visible)) for each file (False).
+        errors : str, default 'raise'
+            One of 'raise' or 'warn'. See ``Sblocal.events_many``.
+
+        Returns
+        -------
+        frames, visible
+            If concat=True, the concatenated results in the order of paths.
+            If concat=False, a generator of (path, results) in the order of paths.
+
+        Examples
+        --------
+        >>> import glob
+        >>> from mplsoccer import Sblocal
+        >>> parser = Sblocal()
+        >>> paths = sorted(glob.glob('open-data/data/three-sixty/*.json'))
+        >>> frames, visible = parser.frames_many(paths)
+        """
+        return self._many('frame', ('frames', 'visible'), paths, (), processes, concat, errors)
+
+    def iter_events(self, paths, chunk_size=10000, columns=None, types=None, arrays=False,
+                    prefetch=1):
+        """ Iterate over the events in many local files in batches with a fixed number of rows.
+
+        The next files are read and flattened in a background thread while a batch is being
+        consumed, and only the current file and batch are held in memory. The batches are
+        dataframes even if dataframe=False. Files with different columns are combined with
+        missing values, so use columns for a fixed set of columns.
+
+        Parameters
+        ----------
+        paths : sequence of paths to files
+        chunk_size : int, default 10000
+            The number of rows in each batch. The last batch may be smaller.
+        columns : list of str, default None
+            The columns of the events to return. The default None returns all the columns.
+        types : list of str, default None
+            The event type names to return, e.g. ['Pass', 'Shot'].
+            The default None returns all the events.
+        arrays : bool, default False
+            Whether to yield dataframes (False) or dictionaries of numpy arrays (True).
+        prefetch : int, default 1
+            The number of files loaded ahead of the current file.
+
+        Returns
+        -------
+        generator of pandas.DataFrame or dict of numpy.ndarray
+
+        Examples
+        --------
+        >>> from mplsoccer import Sblocal
+        >>> parser = Sblocal()
+        >>> for batch in parser.iter_events(paths, chunk_size=5000, arrays=True):
+        ...     print(batch['x'].mean())
+        """
+        frames = _prefetch(partial(self._read_events, columns=columns, types=types),
+                           paths, prefetch=prefetch)
+        return _iter_batches(frames, chunk_size, arrays)
 
     def lineup(self, path):
         """ Read the lineup data from a local file.
@@ -377,9 +1917,9 @@ class Sblocal:
         >>> parser = Sblocal(dataframe=True)
         >>> lineups = parser.lineup(path)
         """
-        data = self._get_data(path)
-        match_id = int(os.path.basename(path)[:-5])
-        return flatten_lineup(data, match_id, self.dataframe)
+        match_id = _local_match_id(path)
+        return self._load(path, 'lineups', match_id, self._get_data, flatten_lineup, match_id,
+                          self.dataframe, self.compact)
 
     def match(self, path):
         """ Read the match data from a local file.
@@ -399,8 +1939,7 @@ class Sblocal:
         >>> parser = Sblocal(dataframe=True)
         >>> matches = parser.match(path)
         """
-        data = self._get_data(path)
-        return flatten_match(data, self.dataframe)
+        return self._load(path, 'matches', None, self._get_data, flatten_match, self.dataframe)
 
     def competition(self, path):
         """ Read the competition data from a local file.
@@ -420,21 +1959,24 @@ class Sblocal:
         >>> parser = Sblocal(dataframe=True)
         >>> competition = parser.competition(path)
         """
-        data = self._get_data(path)
-        return pd.DataFrame(data) if self.dataframe else data
+        return self._load(path, 'competitions', None, self._get_data, _flatten_competition,
+                          self.dataframe)
 
-    def frame(self, path):
+    def frame(self, path, arrays=False):
         """ Read the 360 data from a local file.
 
-
         Parameters
         ----------
         path : path to file
+        arrays : bool, default False
+            Whether to return the frames as arrays (a FrameArrays) rather than
+            frames, visible. See ``mplsoccer.statsbomb.flatten_360``.
 
         Returns
         -------
         frames, visible
             Either dataframes or flattened list of dictionaries.
+            Or a FrameArrays if arrays=True.
 
         Examples
         --------
@@ -442,9 +1984,204 @@ class Sblocal:
         >>> parser = Sblocal(dataframe=True)
         >>> frames, visible = parser.frame(path)
         """
-        data = self._get_data(path)
-        match_id = int(os.path.basename(path)[:-5])
-        return flatten_360(data, match_id, self.dataframe)
+        match_id = _local_match_id(path)
+        return self._load(path, 'three-sixty', match_id, partial(self._get_rows, arrays=arrays),
+                          flatten_360, match_id, self.dataframe, self.compact, arrays)
+
+
+# the columns and types of the flattened StatsBomb data. These keep the tables written by Sbarrow
+# the same for every match: missing columns are written as nulls. The kinds are 'int', 'float',
+# 'bool', 'str', 'time' and 'float_list'. Integer columns with nulls are read back as floats,
+# like the dataframes from flatten_event.
+_EVENT_SCHEMA = {
+    'id': 'str', 'index': 'int', 'period': 'int', 'timestamp': 'time', 'minute': 'int',
+    'second': 'int', 'possession': 'int', 'duration': 'float', 'match_id': 'int',
+    'type_id': 'int', 'type_name': 'str', 'possession_team_id': 'int',
+    'possession_team_name': 'str', 'play_pattern_id': 'int', 'play_pattern_name': 'str',
+    'team_id': 'int', 'team_name': 'str', 'tactics_formation': 'str', 'player_id': 'int',
+    'player_name': 'str', 'position_id': 'int', 'position_name': 'str',
+    'x': 'float', 'y': 'float', 'z': 'float', 'end_x': 'float', 'end_y': 'float', 'end_z': 'float',
+    'under_pressure': 'float', 'counterpress': 'float', 'off_camera': 'float', 'out': 'float',
+    'outcome_id': 'int', 'outcome_name': 'str', 'technique_id': 'int', 'technique_name': 'str',
+    'body_part_id': 'int', 'body_part_name': 'str', 'sub_type_id': 'int', 'sub_type_name': 'str',
+    'aerial_won': 'bool',
+    # pass
+    'pass_recipient_id': 'int', 'pass_recipient_name': 'str', 'pass_length': 'float',
+    'pass_angle': 'float', 'pass_height_id': 'int', 'pass_height_name': 'str',
+    'pass_assisted_shot_id': 'str', 'pass_shot_assist': 'bool', 'pass_goal_assist': 'bool',
+    'pass_cross': 'bool', 'pass_switch': 'bool', 'pass_cut_back': 'bool', 'pass_deflected': 'bool',
+    'pass_no_touch': 'bool', 'pass_miscommunication': 'bool',
+    # shot and goalkeeper
+    'shot_statsbomb_xg': 'float', 'shot_key_pass_id': 'str', 'shot_first_time': 'bool',
+    'shot_one_on_one': 'bool', 'shot_open_goal': 'bool', 'shot_deflected': 'bool',
+    'shot_redirect': 'bool', 'shot_follows_dribble': 'bool',
+    'goalkeeper_position_id': 'int', 'goalkeeper_position_name': 'str',
+    # other event types
+    'dribble_overrun': 'bool', 'dribble_nutmeg': 'bool', 'dribble_no_touch': 'bool',
+    'ball_recovery_recovery_failure': 'bool', 'ball_recovery_offensive': 'bool',
+    'block_deflection': 'bool', 'block_offensive': 'bool', 'block_save_block': 'bool',
+    'block_counterpress': 'bool',
+    'foul_committed_card_id': 'int', 'foul_committed_card_name': 'str',
+    'foul_committed_offensive': 'bool', 'foul_committed_advantage': 'bool',
+    'foul_committed_penalty': 'bool',
+    'foul_won_defensive': 'bool', 'foul_won_advantage': 'bool', 'foul_won_penalty': 'bool',
+    'bad_behaviour_card_id': 'int', 'bad_behaviour_card_name': 'str',
+    'substitution_replacement_id': 'int', 'substitution_replacement_name': 'str',
+    'injury_stoppage_in_chain': 'bool', 'player_off_permanent': 'bool',
+    'half_start_late_video_start': 'bool', 'half_end_early_video_end': 'bool',
+}
+
+_TABLE_SCHEMAS = {
+    'events': _EVENT_SCHEMA,
+    'related': {'match_id': 'int', 'id': 'str', 'index': 'int', 'type_name': 'str',
+                'id_related': 'str', 'index_related': 'int', 'type_name_related': 'str'},
+    'freeze': {'teammate': 'bool', 'match_id': 'int', 'id': 'str', 'x': 'float', 'y': 'float',
+               'player_id': 'int', 'player_name': 'str', 'position_id': 'int',
+               'position_name': 'str', 'event_freeze_id': 'int'},
+    'tactics': {'jersey_number': 'int', 'match_id': 'int', 'id': 'str', 'player_id': 'int',
+                'player_name': 'str', 'position_id': 'int', 'position_name': 'str',
+                'event_tactics_id': 'int'},
+    'lineups': {'player_id': 'int', 'player_name': 'str', 'player_nickname': 'str',
+                'jersey_number': 'int', 'match_id': 'int', 'team_id': 'int', 'team_name': 'str',
+                'country_id': 'int', 'country_name': 'str'},
+    'frames': {'teammate': 'bool', 'actor': 'bool', 'keeper': 'bool', 'match_id': 'int',
+               'id': 'str', 'x': 'float', 'y': 'float'},
+    'visible': {'match_id': 'int', 'id': 'str', 'visible_area': 'float_list'},
+}
+
+
+# the categories of the compact dataframes for the columns with a fixed StatsBomb vocabulary.
+# The categories are the same for every match so the compact dataframes can be concatenated.
+_TYPE_NAMES = ['Starting XI', 'Half Start', 'Pass', 'Ball Receipt', 'Carry', 'Pressure',
+               'Ball Recovery', 'Duel', 'Clearance', 'Block', 'Dribble', 'Dribbled Past',
+               'Dispossessed', 'Foul Committed', 'Foul Won', 'Goal Keeper', 'Shot',
+               'Interception', 'Miscontrol', 'Substitution', 'Tactical Shift', 'Injury Stoppage',
+               'Half End', 'Referee Ball-Drop', 'Player Off', 'Player On', 'Offside', 'Error',
+               'Shield', 'Bad Behaviour', '50/50', 'Own Goal Against', 'Own Goal For',
+               'Camera On', 'Camera off']
+_POSITION_NAMES = ['Goalkeeper', 'Right Back', 'Right Center Back', 'Center Back',
+                   'Left Center Back', 'Left Back', 'Right Wing Back', 'Left Wing Back',
+                   'Right Defensive Midfield', 'Center Defensive Midfield',
+                   'Left Defensive Midfield', 'Right Midfield', 'Right Center Midfield',
+                   'Center Midfield', 'Left Center Midfield', 'Left Midfield', 'Right Wing',
+                   'Right Attacking Midfield', 'Center Attacking Midfield',
+                   'Left Attacking Midfield', 'Left Wing', 'Right Center Forward', 'Striker',
+                   'Left Center Forward', 'Secondary Striker', 'Center Forward']
+_CARD_NAMES = ['Yellow Card', 'Second Yellow', 'Red Card']
+_COMPACT_CATEGORIES = {
+    'type_name': _TYPE_NAMES,
+    'type_name_related': _TYPE_NAMES,
+    'position_name': _POSITION_NAMES,
+    'goalkeeper_position_name': ['Set', 'Moving', 'Prone', 'Diving'],
+    'play_pattern_name': ['Regular Play', 'From Corner', 'From Free Kick', 'From Throw In',
+                          'Other', 'From Counter', 'From Goal Kick', 'From Keeper',
+                          'From Kick Off'],
+    'outcome_name': ['Blocked', 'Claim', 'Clear', 'Collected Twice', 'Complete', 'Fail', 'Goal',
+                     'In Play', 'In Play Danger', 'In Play Safe', 'Incomplete',
+                     'Injury', 'Injury Clearance', 'Lost', 'Lost In Play', 'Lost Out',
+                     'No Touch', 'Off T', 'Out', 'Pass Offside', 'Post', 'Punched out',
+                     'Saved', 'Saved Off Target', 'Saved Twice', 'Saved to Post', 'Success',
+                     'Success In Play', 'Success Out', 'Success To Opposition',
+                     'Success To Team', 'Tactical', 'Touched In', 'Touched Out', 'Unknown',
+                     'Wayward', 'Won'],
+    'body_part_name': ['Right Foot', 'Left Foot', 'Head', 'Other', 'No Touch', 'Drop Kick',
+                       'Keeper Arm', 'Both Hands', 'Chest', 'Left Hand', 'Right Hand'],
+    'technique_name': ['Inswinging', 'Outswinging', 'Straight', 'Through Ball', 'Backheel',
+                       'Diving Header', 'Half Volley', 'Lob', 'Normal', 'Overhead Kick',
+                       'Volley', 'Diving', 'Standing'],
+    'sub_type_name': ['Corner', 'Free Kick', 'Goal Kick', 'Interception', 'Kick Off', 'Recovery',
+                      'Throw-in', 'Open Play', 'Penalty', 'Aerial Lost', 'Tackle', 'Collected',
+                      'Goal Conceded', 'Keeper Sweeper', 'Penalty Conceded', 'Penalty Saved',
+                      'Penalty Saved to Post', 'Punch', 'Save', 'Shot Faced', 'Shot Saved',
+                      'Shot Saved Off Target', 'Shot Saved to Post', 'Smother', '6 Seconds',
+                      'Backpass Pick', 'Dangerous Play', 'Dive', 'Foul Out', 'Handball'],
+    'pass_height_name': ['Ground Pass', 'Low Pass', 'High Pass'],
+    'foul_committed_card_name': _CARD_NAMES,
+    'bad_behaviour_card_name': _CARD_NAMES,
+}
+
+# the integer columns of the compact dataframes that fit in fewer than 32 bits
+_COMPACT_INTS = {'period': 'Int8', 'second': 'Int8', 'jersey_number': 'Int8',
+                 'minute': 'Int16', 'possession': 'Int16', 'event_freeze_id': 'Int16',
+                 'event_tactics_id': 'Int16'}
+_COMPACT_DTYPES = {'float': 'float32', 'bool': 'boolean', 'str': pd.StringDtype()}
+
+
+def _compact_dtype(name, kind):
+    """ Get the compact dtype for a column in the schema (None keeps the column as it is)."""
+    if name in _COMPACT_CATEGORIES:
+        return pd.CategoricalDtype(_COMPACT_CATEGORIES[name])
+    if kind == 'int':
+        if name in _COMPACT_INTS:
+            return _COMPACT_INTS[name]
+        # the ids of the fixed vocabularies are small, but players/ teams/ matches are not
+        if name.endswith('_id') and name[:-3] + '_name' in _COMPACT_CATEGORIES:
+            return 'Int16'
+        return 'Int32'
+    return _COMPACT_DTYPES.get(kind)
+
+
+def _compact_dataframe(df, table):
+    """ Convert a flattened dataframe to the compact dtypes. The result has all the columns in
+    the table's schema (columns missing from the data are all missing values) followed by any
+    other columns, so the compact dataframes for different matches can be concatenated
+    without changing the dtypes."""
+    columns = {}
+    schema = _TABLE_SCHEMAS[table]
+    for name, kind in schema.items():
+        dtype = _compact_dtype(name, kind)
+        if name not in df.columns:
+            columns[name] = pd.Series(None, index=df.index,
+                                      dtype=object if dtype is None else dtype)
+            continue
+        column = df[name]
+        if isinstance(dtype, pd.CategoricalDtype):
+            unknown = set(column.dropna().unique()) - set(dtype.categories)
+            if len(unknown) > 0:
+                warnings.warn(f'The values {sorted(unknown)} are not in the categories for the '
+                              f'column {name}. They are added to the categories for these '
+                              'results, which will not concatenate with other results '
+                              'as categoricals.')
+                dtype = pd.CategoricalDtype(list(dtype.categories) + sorted(unknown))
+        columns[name] = column if dtype is None else column.astype(dtype)
+    for name in df.columns:
+        if name not in schema:
+            columns[name] = df[name]
+    return pd.DataFrame(columns, index=df.index)
+
+
+@dataclass
+class FrameArrays:
+    """ Dataclass for the 360 data as arrays (flatten_360 with arrays=True).
+
+    Attributes
+    ----------
+    match_id : int
+        The StatsBomb match identifier.
+    id : numpy.ndarray
+        The event identifiers of the frames with the shape (n_frames,).
+    num_players : numpy.ndarray
+        The number of players in each frame with the shape (n_frames,).
+    players : numpy.ndarray
+        The players with the shape (n_frames, max_players, 5) and dtype float32.
+        The last axis is x, y, teammate, actor, keeper (with 1 for True and 0 for False).
+        The frames with fewer players are padded with numpy.nan.
+    visible_area : numpy.ndarray
+        The (x, y) coordinates of the visible area polygons with the shape (n_points, 2).
+    visible_offsets : numpy.ndarray
+        The offsets of each frame's polygon in visible_area with the shape (n_frames + 1,),
+        i.e. the polygon for frame i is visible_area[visible_offsets[i]:visible_offsets[i + 1]].
+    """
+    match_id: int
+    id: np.ndarray
+    num_players: np.ndarray
+    players: np.ndarray
+    visible_area: np.ndarray
+    visible_offsets: np.ndarray
+
+    def visible_polygon(self, idx):
+        """ Get the visible area polygon of the frame at position idx."""
+        return self.visible_area[self.visible_offsets[idx]:self.visible_offsets[idx + 1]]
 
 
 def _flatten_location(row, value, keyword=''):
@@ -499,47 +2236,420 @@ def _flatten_list_of_lists(list_of_lists, key):
     return flat_list
 
 
-def _event_dataframe(data):
-    """ Transform the event dictionary into a dataframe."""
+def _append_columns(columns, row, idx, drop=(), keep=None):
+    """ Append the values of the flattened row (a dictionary) at index idx to the columns
+    (a dictionary of lists). New columns and values missing for the previous rows are
+    filled with numpy.nan, as when creating a dataframe from a list of dictionaries.
+    Columns in drop, or not in keep if it is given, are not added."""
+    for name, value in row.items():
+        column = columns.get(name)
+        if column is None:
+            if name in drop or (keep is not None and name not in keep):
+                continue
+            column = columns[name] = [_NAN] * idx
+        elif len(column) < idx:
+            column.extend([_NAN] * (idx - len(column)))
+        column.append(value)
+
+
+def _fill_columns(columns, num_rows):
+    """ Fill the columns with numpy.nan up to num_rows for values missing from the last rows."""
+    for column in columns.values():
+        if len(column) < num_rows:
+            column.extend([_NAN] * (num_rows - len(column)))
+
+
+_NUMBER_TYPES = frozenset([int, float, bool, type(None)])
+
+
+def _to_array(values):
+    """ Convert a column (list) to a numpy array. Numbers and booleans with missing values
+    are floats with numpy.nan, as in the dataframes. Strings and other values are objects."""
+    array = None
+    try:
+        array = np.array(values)
+    except ValueError:  # lists of different lengths
+        pass
+    if array is None or array.ndim != 1:
+        array = np.empty(len(values), dtype=object)
+        for idx, value in enumerate(values):
+            array[idx] = value
+        return array
+    if array.dtype.kind == 'U':
+        return np.array(values, dtype=object)
+    if array.dtype == object and set(map(type, values)) <= _NUMBER_TYPES:
+        return np.array(values, dtype=np.float64)
+    return array
+
+
+def _columns_to_arrays(columns):
+    """ Convert the columns (a dictionary of lists) to a dictionary of numpy arrays."""
+    return {name: _to_array(values) for name, values in columns.items()}
+
+
+def _rows_to_arrays(rows):
+    """ Convert the rows (a list of dictionaries) to a dictionary of numpy arrays with the
+    columns in the same order as a dataframe created from the rows. Returns None if empty."""
+    columns = {}
+    num_rows = 0
+    for row in rows:
+        _append_columns(columns, row, num_rows)
+        num_rows += 1
+    if num_rows == 0:
+        return None
+    _fill_columns(columns, num_rows)
+    return _columns_to_arrays(columns)
+
+
+def _dataframe_to_arrays(df):
+    """ Convert a dataframe to a dictionary of numpy arrays. Returns None for None."""
+    if df is None:
+        return None
+    return {name: df[name].to_numpy() for name in df.columns}
+
+
+def _array_output(arrays, dataframe):
+    """ Return the dictionary of numpy arrays as it is (dataframe='numpy') or as a numpy
+    structured array (dataframe='structured')."""
+    if arrays is None or dataframe == 'numpy':
+        return arrays
+    num_rows = len(next(iter(arrays.values()))) if arrays else 0
+    structured = np.empty(num_rows, dtype=[(name, array.dtype) for name, array in arrays.items()])
+    for name, array in arrays.items():
+        structured[name] = array
+    return structured
+
+
+def _concat_arrays(frames, dataframe):
+    """ Concatenate dictionaries of numpy arrays or structured arrays. Columns missing from
+    some of the results are filled with numpy.nan."""
+    if dataframe == 'structured':
+        frames = [{name: frame[name] for name in frame.dtype.names} for frame in frames]
+    names = list(dict.fromkeys(name for frame in frames for name in frame))
+    arrays = {}
+    for name in names:
+        arrays[name] = np.concatenate([
+            frame[name] if name in frame else np.full(len(next(iter(frame.values()))), _NAN)
+            for frame in frames])
+    return _array_output(arrays, dataframe)
+
+
+def _concat_dataframe_arrays(frames):
+    """ Concatenate the numpy arrays of dataframes (see _dataframe_to_arrays) into a dataframe
+    with the same columns and dtypes as pandas.concat. Numbers missing from some of the
+    dataframes are filled with numpy.nan as floats and other values as objects.
+    Returns None if there are no dataframes."""
+    if len(frames) == 0:
+        return None
+    names = list(dict.fromkeys(name for frame in frames for name in frame))
+    arrays = {}
+    for name in names:
+        numeric = all(frame[name].dtype.kind in 'iuf' for frame in frames if name in frame)
+        arrays[name] = np.concatenate([
+            frame[name] if name in frame else
+            np.full(len(next(iter(frame.values()))), _NAN, dtype=None if numeric else object)
+            for frame in frames])
+    return pd.DataFrame(arrays, copy=False)
+
+
+_NAN = float('nan')
+
+_EVENT_COLS_TO_DROP = frozenset(['pass_through_ball', 'pass_outswinging', 'pass_inswinging',
+                                 'clearance_head', 'clearance_left_foot', 'clearance_right_foot',
+                                 'pass_straight', 'clearance_other', 'goalkeeper_punched_out',
+                                 'goalkeeper_shot_saved_off_target', 'shot_saved_off_target',
+                                 'goalkeeper_shot_saved_to_post', 'shot_saved_to_post',
+                                 'goalkeeper_lost_out', 'goalkeeper_lost_in_play',
+                                 'goalkeeper_success_out', 'goalkeeper_success_in_play',
+                                 'goalkeeper_saved_to_post', 'shot_kick_off',
+                                 'goalkeeper_penalty_saved_to_post'])
+
+# how each (key, nested_key) pair of the events is flattened: (kind, prefix, column name)
+# it is filled in as new pairs are seen so the column names are only built once
+_EVENT_KEY_SCHEMA = {}
+
+
+def _event_key_schema(key, nested_key):
+    """ Get how to flatten a nested event value, matching the rules in flatten_event."""
+    if nested_key == 'end_location':
+        schema = ('location', None, None)
+    elif nested_key == 'aerial_won':
+        schema = ('value', None, 'aerial_won')
+    elif nested_key in ['outcome', 'body_part', 'technique']:
+        schema = ('nested', f'{nested_key}_', None)
+    elif nested_key in ['freeze_frame', 'lineup']:
+        schema = (nested_key, None, None)
+    elif nested_key == 'type':
+        schema = ('nested', 'sub_type_', None)
+    else:
+        schema = ('value_or_nested', f'{key}_{nested_key}_', f'{key}_{nested_key}')
+    _EVENT_KEY_SCHEMA[(key, nested_key)] = schema
+    return schema
+
+
+def _schema_wanted(schema, columns):
+    """ Whether a nested event value flattened with the schema adds any of the columns."""
+    kind, prefix, name = schema
+    if kind == 'location':
+        return not columns.isdisjoint(['end_x', 'end_y', 'end_z'])
+    if name is not None:
+        # the deprecated pass through ball also sets the technique name
+        if name in columns or (name == 'pass_through_ball' and 'technique_name' in columns):
+            return True
+    if prefix is not None:
+        return any(column.startswith(prefix) for column in columns)
+    return False
+
+
+def _flatten_event_columns(events, match_id, columns=None, types=None, include=_EVENT_TABLES):
+    """ Flatten the events straight into columns (a dictionary of lists) rather than
+    into a list of dictionaries. The column order and values are the same as
+    creating a dataframe from the events flattened with flatten_event(dataframe=False).
+    The events can be any iterable, such as a generator of events parsed from a file.
+    The events are not modified, but the freeze-frame and tactics dictionaries are.
+
+    If columns (a set) is given, nested values that do not add any of the columns are skipped
+    and only these columns are kept. If types (a set) is given, only events with these
+    type names are flattened. The freeze frames and tactics are only flattened if they are
+    in include. The related events are collected for all the events, along with the id, index
+    and type_name of every event (lookup) so the related events can still be matched up."""
+    flat_columns = {}
+    related = []
+    lookup = {'id': [], 'index': [], 'type_name': []}
+    freeze = []
+    tactics = []
+    with_related = 'related' in include
+    with_freeze = 'freeze' in include
+    with_tactics = 'tactics' in include
+    # without a projection the lookup is the same as the id, index and type_name columns
+    with_lookup = with_related and (columns is not None or types is not None)
+    wanted = {}
+    num_events = 0
+    for row in events:
+        if with_lookup or (with_related and 'related_events' in row):
+            type_name = row['type']['name'].replace('Ball Receipt*', 'Ball Receipt')
+            if with_lookup:
+                lookup['id'].append(row['id'])
+                lookup['index'].append(row['index'])
+                lookup['type_name'].append(type_name)
+            if 'related_events' in row:
+                related.extend({'match_id': match_id, 'id': row['id'], 'index': row['index'],
+                                'type_name': type_name, 'id_related': related_event}
+                               for related_event in row['related_events'])
+        if types is not None and row['type']['name'] not in types:
+            continue
+        # the non-nested values keep their order, then the match_id and nested values follow
+        flat = {}
+        nested = []
+        for key, value in row.items():
+            if isinstance(value, dict):
+                nested.append((key, value))
+            elif key != 'location' and key != 'related_events':
+                flat[key] = value
+        flat['match_id'] = match_id
+        for key, value in nested:
+            for nested_key, nested_value in value.items():
+                schema = _EVENT_KEY_SCHEMA.get((key, nested_key))
+                if schema is None:
+                    schema = _event_key_schema(key, nested_key)
+                kind, prefix, name = schema
+                if kind == 'freeze_frame':
+                    if with_freeze:
+                        freeze.append(_flatten_freeze(nested_value, match_id, row['id']))
+                    continue
+                if kind == 'lineup':
+                    if with_tactics:
+                        tactics.append(_flatten_tactic(nested_value, match_id, row['id']))
+                    continue
+                if columns is not None:
+                    is_wanted = wanted.get(schema)
+                    if is_wanted is None:
+                        is_wanted = wanted[schema] = _schema_wanted(schema, columns)
+                    if not is_wanted:
+                        continue
+                if kind == 'value_or_nested':
+                    if isinstance(nested_value, dict):
+                        for k, v in nested_value.items():
+                            flat[prefix + k] = v
+                    else:
+                        flat[name] = nested_value
+                elif kind == 'nested':
+                    for k, v in nested_value.items():
+                        flat[prefix + k] = v
+                elif kind == 'location':
+                    _flatten_location(flat, nested_value, keyword='end_')
+                else:
+                    flat[name] = nested_value
+        if 'location' in row:
+            _flatten_location(flat, row['location'])
+        if 'type_name' in flat:
+            flat['type_name'] = flat['type_name'].replace('Ball Receipt*', 'Ball Receipt')
+        # pass through ball is deprecated now, but it was not always added to technique name
+        if 'pass_through_ball' in flat:
+            flat['technique_name'] = 'Through Ball'
+        _append_columns(flat_columns, flat, num_events, drop=_EVENT_COLS_TO_DROP, keep=columns)
+        num_events += 1
+    _fill_columns(flat_columns, num_events)
+    if with_related and not with_lookup:
+        lookup = {name: flat_columns.get(name, []) for name in lookup}
+    tactics = _flatten_list_of_lists(tactics, key='event_tactics_id')
+    freeze = _flatten_list_of_lists(freeze, key='event_freeze_id')
+    return flat_columns, related, lookup, freeze, tactics
+
+
+def _parse_timestamps(timestamps):
+    """ Parse the event timestamps (strings like '00:12:34.567') as a numpy timedelta64 array.
+    Parsing them as datetimes with a fixed format is vectorized, unlike pandas.to_timedelta."""
+    timestamps = pd.Series(timestamps, dtype=object)
+    try:
+        timedelta = pd.to_datetime(timestamps, format='%H:%M:%S.%f') - pd.Timestamp(1900, 1, 1)
+    except (TypeError, ValueError):
+        timedelta = pd.to_timedelta(timestamps)
+    return timedelta.to_numpy()
+
+
+def _event_dataframe(data, timestamp='time'):
+    """ Transform the event dictionary into a dataframe. The timestamp is one of
+    'time', 'timedelta' or 'seconds'."""
     df = pd.DataFrame(data)
     if df.empty:
         return None
     # tactics_formation from float to string
-    mask = df['tactics_formation'].notnull()
-    tactics = df.loc[mask, 'tactics_formation'].astype(int).astype(str)
-    df['tactics_formation'] = df['tactics_formation'].astype(str)
-    df.loc[mask, 'tactics_formation'] = tactics
-    df.loc[~mask, 'tactics_formation'] = None
-    df['timestamp'] = pd.to_datetime(df['timestamp']).dt.time
+    if 'tactics_formation' in df.columns:
+        mask = df['tactics_formation'].notnull()
+        tactics = df.loc[mask, 'tactics_formation'].astype(int).astype(str)
+        df['tactics_formation'] = df['tactics_formation'].astype(str)
+        df.loc[mask, 'tactics_formation'] = tactics
+        df.loc[~mask, 'tactics_formation'] = None
+    # the timestamps are parsed as timedelta64 so the sort is vectorized
+    df['timestamp'] = _parse_timestamps(df['timestamp'])
     df.sort_values(['period', 'timestamp', 'index'], inplace=True)
     df.reset_index(drop=True, inplace=True)
+    if timestamp == 'time':
+        df['timestamp'] = (pd.Timestamp(0) + df['timestamp']).dt.time
+    elif timestamp == 'seconds':
+        df['timestamp'] = df['timestamp'].dt.total_seconds()
     for col in ['counterpress', 'under_pressure', 'off_camera', 'out']:
         if col in df.columns:
             df[col] = df[col].astype(float)
     return df
 
 
+def _event_arrays(data, timestamp='time'):
+    """ Transform the event dictionary into a dictionary of numpy arrays,
+    formatted and sorted in the same way as _event_dataframe."""
+    if len(data.get('id', ())) == 0:
+        return None
+    arrays = _columns_to_arrays(data)
+    if 'tactics_formation' in arrays:
+        formation = arrays['tactics_formation']
+        arrays['tactics_formation'] = np.array(
+            [None if pd.isnull(value) else str(int(value)) for value in formation], dtype=object)
+    timedelta = pd.TimedeltaIndex(_parse_timestamps(arrays['timestamp']))
+    order = np.lexsort((arrays['index'], timedelta.to_numpy(), arrays['period']))
+    arrays = {name: array[order] for name, array in arrays.items()}
+    timedelta = timedelta[order]
+    if timestamp == 'time':
+        arrays['timestamp'] = (pd.Timestamp(0) + timedelta).time
+    elif timestamp == 'seconds':
+        arrays['timestamp'] = timedelta.total_seconds().to_numpy()
+    else:
+        arrays['timestamp'] = timedelta.to_numpy()
+    for col in ['counterpress', 'under_pressure', 'off_camera', 'out']:
+        if col in arrays:
+            arrays[col] = arrays[col].astype(np.float64)
+    return arrays
+
+
+def _flatten_event_arrays(events, match_id, dataframe, columns, types, include, timestamp):
+    """ Flatten the events into dictionaries of numpy arrays or structured arrays,
+    see flatten_event."""
+    keep = None
+    if columns is not None:
+        keep = set(columns) | {'id', 'index', 'period', 'timestamp'}
+    with _timed('flatten_time'):
+        events, related, lookup, freeze, tactics = _flatten_event_columns(
+            events, match_id, columns=keep, types=types, include=include)
+    events = _event_arrays(events, timestamp)
+    if 'related' in include:
+        related = _related_arrays(related, lookup)
+        if related is not None:
+            related = related[0]
+            if types is not None:
+                mask = np.isin(related['id'], [] if events is None else events['id'])
+                related = {name: array[mask] for name, array in related.items()}
+    if columns is not None and events is not None:
+        num_events = len(events['id'])
+        events = {name: events[name] if name in events else np.full(num_events, _NAN)
+                  for name in columns}
+    results = [events, related, _rows_to_arrays(freeze), _rows_to_arrays(tactics)]
+    return tuple(_array_output(result, dataframe) if table in include else None
+                 for table, result in zip(_EVENT_TABLES, results))
+
+
 def _related_dataframe(data, df_events):
     """ Transform the related-events dictionary into a dataframe. For carries, we also
     ensure that both the carry and the related event are related both ways.
-    Sometimes another event is not related to the carry event (but it is the other way round)"""
-    df = pd.DataFrame(data)
-    if df.empty:
+    Sometimes another event is not related to the carry event (but it is the other way round)
+
+    The related events are looked up by their integer position in the events and the
+    duplicates are found by hashing integer (id, id_related) pairs, rather than merging and
+    dropping duplicates on the string columns."""
+    result = _related_arrays(data, df_events)
+    if result is None:
         return None
-    cols = ['id', 'index', 'type_name']
-    df = df.merge(df_events[cols].rename({'id': 'id_related'}, axis='columns'),
-                  how='left', on='id_related', validate='m:1',
-                  suffixes=('', '_related'))
-    df_carry = df[df['type_name'] == 'Carry'].copy()
-    df_carry.rename({'id': 'id_related',
-                     'index': 'index_related',
-                     'type_name': 'type_name_related',
-                     'id_related': 'id',
-                     'index_related': 'index',
-                     'type_name_related': 'type_name'},
-                    axis='columns', inplace=True)
-    df = pd.concat([df, df_carry]).drop_duplicates()
-    return df
+    columns, take = result
+    return pd.DataFrame(columns, index=take)
+
+
+def _related_arrays(data, events):
+    """ Build the related events (see _related_dataframe) as a dictionary of numpy arrays.
+    The events can be a dataframe or a dictionary of lists/ arrays. Returns
+    (arrays, positions of the rows in data) or None if there are no related events."""
+    if len(data) == 0:
+        return None
+    related = {name: np.array([row[name] for row in data], dtype=object)
+               for name in ['match_id', 'id', 'index', 'type_name', 'id_related']}
+    related['index'] = related['index'].astype(np.int64)
+    related['match_id'] = related['match_id'].astype(np.int64)
+    num_related = len(data)
+    position = pd.Index(np.asarray(events['id'], dtype=object)).get_indexer(
+        related['id_related'])
+    missing = position == -1
+    index_related = np.asarray(events['index'])[position]
+    type_name_related = np.asarray(events['type_name'], dtype=object)[position]
+    if missing.any():
+        index_related = index_related.astype(np.float64)
+        index_related[missing] = np.nan
+        type_name_related[missing] = np.nan
+    # integer codes for the (id, id_related) pairs
+    codes, uniques = pd.factorize(np.concatenate([related['id'], related['id_related']]))
+    id_code = codes[:num_related].astype(np.int64)
+    related_code = codes[num_related:].astype(np.int64)
+    # the carries are added the other way round, unless the pair is already related
+    carry = np.flatnonzero(related['type_name'] == 'Carry')
+    keys = np.concatenate([id_code * len(uniques) + related_code,
+                           related_code[carry] * len(uniques) + id_code[carry]])
+    keep = ~pd.Index(keys).duplicated()
+    take = np.concatenate([np.arange(num_related), carry])[keep]
+    swap = np.arange(keys.size)[keep] >= num_related
+
+    def column(values, swapped_values):
+        return np.where(swap, swapped_values[take], values[take])
+
+    index = related['index']
+    type_name = related['type_name']
+    id_ = related['id']
+    id_related = related['id_related']
+    result = {'match_id': related['match_id'][take],
+              'id': column(id_, id_related),
+              'index': column(index, index_related),
+              'type_name': column(type_name, type_name_related),
+              'id_related': column(id_related, id_),
+              'index_related': column(index_related, index),
+              'type_name_related': column(type_name_related, type_name),
+              }
+    return result, take
 
 
 def _competition_dataframe(data):
@@ -569,7 +2679,8 @@ def _match_dataframe(data):
     return df
 
 
-def flatten_event(events, match_id, dataframe=True):
+def flatten_event(events, match_id, dataframe=True, compact=False, columns=None, types=None,
+                  include=_EVENT_TABLES, timestamp='time'):
     """ Flatten the events (list) so each row (dictionary) contains no nested events.
 
     Parameters
@@ -578,28 +2689,87 @@ def flatten_event(events, match_id, dataframe=True):
         The events to flatten.
     match_id : int
         The StatsBomb match identifier.
-    dataframe : bool, default True
+    dataframe : bool or str, default True
         Whether to return the results as a dataframe (True)
-        or as flattened lists of dictionaries (False)
+        or as flattened lists of dictionaries (False). Use 'numpy' for dictionaries of
+        numpy arrays or 'structured' for numpy structured arrays, which skip creating the
+        dataframes. The numbers and booleans with missing values are float arrays with
+        numpy.nan and the strings are object arrays. Empty results are None.
+    compact : bool, default False
+        Whether to return compact dataframes (only used if dataframe=True). These use
+        categoricals for the names with a fixed StatsBomb vocabulary, nullable integers
+        for the ids, and float32 for the coordinates. The columns and dtypes are the same
+        for every match, so the dataframes can be concatenated without changing the dtypes.
+    columns : list of str, default None
+        The columns of the events to return. Columns missing from the match are all
+        missing values. The default None returns all the columns.
+        Only the nested values needed for these columns are flattened.
+    types : list of str, default None
+        The event type names to return, e.g. ['Pass', 'Shot']. The related, freeze
+        and tactics results are only returned for these events.
+        The default None returns all the events.
+    include : tuple of str, default ('events', 'related', 'freeze', 'tactics')
+        The results to flatten. Results not included are returned as None.
+    timestamp : str, default 'time'
+        The type of the event timestamps (only used if dataframe=True). One of 'time'
+        (datetime.time objects), 'timedelta' (timedelta64) or 'seconds' (float seconds
+        since the start of the period). The timedelta and seconds are vectorized, so they
+        are faster to sort, filter and window than the time objects.
 
     Returns
     -------
     events, related, freeze, tactics
         If dataframe=True then returns dataframes else if dataframe=False
         each of the returned values is a list of dictionaries.
+
+    Examples
+    --------
+    >>> from mplsoccer import Pitch, Sbopen
+    >>> events = Sbopen(dataframe='numpy').event(3788741)[0]
+    >>> stats = Pitch().bin_statistic(events['x'], events['y'], statistic='count')
     """
+    unknown = set(include) - set(_EVENT_TABLES)
+    if len(unknown) > 0:
+        raise ValueError(f'include must only contain {_EVENT_TABLES}, got: {sorted(unknown)}')
+    if timestamp not in _TIMESTAMP_TYPES:
+        raise ValueError(f'timestamp must be one of {_TIMESTAMP_TYPES}, got: {timestamp!r}')
+    if types is not None:
+        types = set(types)
+        if 'Ball Receipt' in types:
+            types.add('Ball Receipt*')
+    if dataframe in _ARRAY_OUTPUTS:
+        return _flatten_event_arrays(events, match_id, dataframe, columns, types, include,
+                                     timestamp)
+    if dataframe:
+        keep = None
+        if columns is not None:
+            # the events are sorted by period, timestamp and index, and filtered by id
+            keep = set(columns) | {'id', 'index', 'period', 'timestamp'}
+        with _timed('flatten_time'):
+            events, related, lookup, freeze, tactics = _flatten_event_columns(
+                events, match_id, columns=keep, types=types, include=include)
+        events = _event_dataframe(events, timestamp)
+        if 'related' in include:
+            related = _related_dataframe(related, pd.DataFrame(lookup))
+            if related is not None and types is not None:
+                ids = [] if events is None else events['id']
+                related = related[related['id'].isin(ids)]
+        freeze = pd.DataFrame(freeze)
+        tactics = pd.DataFrame(tactics)
+        results = []
+        for table, df in zip(_EVENT_TABLES, [events, related, freeze, tactics]):
+            if table not in include:
+                df = None
+            elif compact and df is not None:
+                df = _compact_dataframe(df, table)
+            results.append(df)
+        if columns is not None and results[0] is not None:
+            results[0] = results[0].reindex(columns=list(columns))
+        return tuple(results)
+
     related = []
     freeze = []
     tactics = []
-    cols_to_drop = ['pass_through_ball', 'pass_outswinging', 'pass_inswinging', 'clearance_head',
-                    'clearance_left_foot', 'clearance_right_foot', 'pass_straight',
-                    'clearance_other', 'goalkeeper_punched_out',
-                    'goalkeeper_shot_saved_off_target', 'shot_saved_off_target',
-                    'goalkeeper_shot_saved_to_post', 'shot_saved_to_post', 'goalkeeper_lost_out',
-                    'goalkeeper_lost_in_play', 'goalkeeper_success_out',
-                    'goalkeeper_success_in_play', 'goalkeeper_saved_to_post',
-                    'shot_kick_off', 'goalkeeper_penalty_saved_to_post']
-
     for row in events:
         row['match_id'] = match_id
         for key in list(row):
@@ -633,7 +2803,7 @@ def flatten_event(events, match_id, dataframe=True):
         # pass through ball is deprecated now, but it was not always added to technique name
         if 'pass_through_ball' in row:
             row['technique_name'] = 'Through Ball'
-        for col in cols_to_drop:
+        for col in _EVENT_COLS_TO_DROP:
             row.pop(col, None)
         if 'related_events' in row:
             related.extend({'match_id': match_id, 'id': row['id'], 'index': row['index'],
@@ -643,15 +2813,20 @@ def flatten_event(events, match_id, dataframe=True):
             del row['related_events']
     tactics = _flatten_list_of_lists(tactics, key='event_tactics_id')
     freeze = _flatten_list_of_lists(freeze, key='event_freeze_id')
-    if dataframe:
-        events = _event_dataframe(events)
-        related = _related_dataframe(related, events)
-        freeze = pd.DataFrame(freeze)
-        tactics = pd.DataFrame(tactics)
-    return events, related, freeze, tactics
-
-
-def flatten_lineup(data, match_id, dataframe=True):
+    if types is not None:
+        events = [row for row in events if row['type_name'] in types]
+        ids = {row['id'] for row in events}
+        related = [row for row in related if row['id'] in ids]
+        freeze = [row for row in freeze if row['id'] in ids]
+        tactics = [row for row in tactics if row['id'] in ids]
+    if columns is not None:
+        events = [{column: row[column] for column in columns if column in row}
+                  for row in events]
+    return tuple(result if table in include else None
+                 for table, result in zip(_EVENT_TABLES, [events, related, freeze, tactics]))
+
+
+def flatten_lineup(data, match_id, dataframe=True, compact=False):
     """ Flatten the lineup (list) so each row (dictionary) contains no nested events.
 
     Parameters
@@ -660,9 +2835,13 @@ def flatten_lineup(data, match_id, dataframe=True):
         The lineup to flatten.
     match_id : int
         The StatsBomb match identifier.
-    dataframe : bool, default True
+    dataframe : bool or str, default True
         Whether to return the results as a dataframe (True)
-        or as flattened lists of dictionaries (False)
+        or as flattened lists of dictionaries (False). Use 'numpy' for a dictionary of
+        numpy arrays or 'structured' for a numpy structured array.
+    compact : bool, default False
+        Whether to return compact dataframes with smaller dtypes (only used if dataframe=True).
+        See ``mplsoccer.statsbomb.flatten_event``.
 
     Returns
     -------
@@ -670,23 +2849,28 @@ def flatten_lineup(data, match_id, dataframe=True):
         If dataframe=True then returns a dataframe else if dataframe=False
         returns a list of dictionaries.
     """
-    lineup = []
-    for row in data:
-        for player in row['lineup']:
-            player['match_id'] = match_id
-            player['team_id'] = row['team_id']
-            player['team_name'] = row['team_name']
-            if 'country' in player:
-                player['country_id'] = player['country']['id']
-                player['country_name'] = player['country']['name']
-                del player['country']
-            if 'player_nickname' in player and player['player_nickname'] is None:
-                player['player_nickname'] = player['player_name']
-            player.pop('positions', None)  # if flattened would be multiple lines
-            player.pop('cards', None)  # if flattened would be multiple lines
-            lineup.append(player)
+    with _timed('flatten_time'):
+        lineup = []
+        for row in data:
+            for player in row['lineup']:
+                player['match_id'] = match_id
+                player['team_id'] = row['team_id']
+                player['team_name'] = row['team_name']
+                if 'country' in player:
+                    player['country_id'] = player['country']['id']
+                    player['country_name'] = player['country']['name']
+                    del player['country']
+                if 'player_nickname' in player and player['player_nickname'] is None:
+                    player['player_nickname'] = player['player_name']
+                player.pop('positions', None)  # if flattened would be multiple lines
+                player.pop('cards', None)  # if flattened would be multiple lines
+                lineup.append(player)
+    if dataframe in _ARRAY_OUTPUTS:
+        return _array_output(_rows_to_arrays(lineup), dataframe)
     if dataframe:
         lineup = pd.DataFrame(lineup)
+        if compact:
+            lineup = _compact_dataframe(lineup, 'lineups')
     return lineup
 
 
@@ -697,9 +2881,10 @@ def flatten_match(match, dataframe=True):
     ----------
     match : list of dicts
         The match to flatten.
-    dataframe : bool, default True
+    dataframe : bool or str, default True
         Whether to return the results as a dataframe (True)
-        or as flattened lists of dictionaries (False)
+        or as flattened lists of dictionaries (False). Use 'numpy' for a dictionary of
+        numpy arrays or 'structured' for a numpy structured array.
 
     Returns
     -------
@@ -707,35 +2892,39 @@ def flatten_match(match, dataframe=True):
         If dataframe=True then returns a dataframe else if dataframe=False
         returns a list of dictionaries.
     """
-    for row in match:
-        for key in list(row):
-            value = row[key]
-            if isinstance(value, dict):
-                for nested_key in list(value):
-                    nested_value = value[nested_key]
-                    if isinstance(nested_value, list):
-                        nested_value = nested_value[0]
-                    if isinstance(nested_value, dict):
-                        for k in list(nested_value):
-                            if k == 'nickname' and not nested_value[k]:
-                                row[f'{key}_{nested_key}_{k}'] = nested_value['name']
-                            elif isinstance(nested_value[k], dict):
-                                for sub_k in nested_value[k]:
-                                    nested_sub_value = nested_value[k][sub_k]
-                                    row[f'{key}_{nested_key}_{k}_{sub_k}'] = nested_sub_value
-                            else:
-                                row[f'{key}_{nested_key}_{k}'] = nested_value[k]
-                    elif key in ['competition_stage', 'stadium', 'referee', 'metadata']:
-                        row[f'{key}_{nested_key}'] = nested_value
-                    else:
-                        row[nested_key] = nested_value
-                del row[key]
+    with _timed('flatten_time'):
+        for row in match:
+            for key in list(row):
+                value = row[key]
+                if isinstance(value, dict):
+                    for nested_key in list(value):
+                        nested_value = value[nested_key]
+                        if isinstance(nested_value, list):
+                            nested_value = nested_value[0]
+                        if isinstance(nested_value, dict):
+                            for k in list(nested_value):
+                                if k == 'nickname' and not nested_value[k]:
+                                    row[f'{key}_{nested_key}_{k}'] = nested_value['name']
+                                elif isinstance(nested_value[k], dict):
+                                    for sub_k in nested_value[k]:
+                                        nested_sub_value = nested_value[k][sub_k]
+                                        row[f'{key}_{nested_key}_{k}_{sub_k}'] = nested_sub_value
+                                else:
+                                    row[f'{key}_{nested_key}_{k}'] = nested_value[k]
+                        elif key in ['competition_stage', 'stadium', 'referee', 'metadata']:
+                            row[f'{key}_{nested_key}'] = nested_value
+                        else:
+                            row[nested_key] = nested_value
+                    del row[key]
+    if dataframe in _ARRAY_OUTPUTS:
+        # the dates are parsed in the dataframe, the matches are small
+        return _array_output(_dataframe_to_arrays(_match_dataframe(match)), dataframe)
     if dataframe:
         match = _match_dataframe(match)
     return match
 
 
-def flatten_360(data, match_id, dataframe=True):
+def flatten_360(data, match_id, dataframe=True, compact=False, arrays=False):
     """ Flatten the 360 data (list) so each row (dictionary) contains no nested events.
 
     Parameters
@@ -744,16 +2933,50 @@ def flatten_360(data, match_id, dataframe=True):
         The 360 data to flatten.
     match_id : int
         The StatsBomb match identifier.
-    dataframe : bool, default True
+    dataframe : bool or str, default True
         Whether to return the results as a dataframe (True)
-        or as flattened lists of dictionaries (False)
+        or as flattened lists of dictionaries (False). Use 'numpy' for dictionaries of
+        numpy arrays or 'structured' for numpy structured arrays.
+    compact : bool, default False
+        Whether to return compact dataframes with smaller dtypes (only used if dataframe=True).
+        See ``mplsoccer.statsbomb.flatten_event``.
+    arrays : bool, default False
+        Whether to return the frames as arrays instead (dataframe and compact are ignored).
+        The players are in a padded float32 array with the shape
+        (n_frames, max_players, 5) so calculations for every frame are vectorized.
 
     Returns
     -------
     frames, visible
         If dataframe=True then returns dataframes else if dataframe=False
         each of the returned values is a list of dictionaries.
+    FrameArrays
+        If arrays=True.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from mplsoccer import Sbopen
+    >>> frames = Sbopen().frame(3788741, arrays=True)
+    >>> players = frames.players  # x, y, teammate, actor, keeper
+    >>> num_opponents = np.sum(players[:, :, 2] == 0, axis=1)
     """
+    if arrays:
+        return _flatten_360_arrays(data, match_id)
+    if dataframe in _ARRAY_OUTPUTS:
+        with _timed('flatten_time'):
+            frames, visible = _flatten_360_columns(data, match_id)
+        return (_array_output(_columns_to_arrays(frames) if frames else None, dataframe),
+                _array_output(_columns_to_arrays(visible) if visible.get('id') else None,
+                              dataframe))
+    if dataframe:
+        with _timed('flatten_time'):
+            frames, visible = _flatten_360_columns(data, match_id)
+        frames, visible = pd.DataFrame(frames), pd.DataFrame(visible)
+        if compact:
+            return _compact_dataframe(frames, 'frames'), _compact_dataframe(visible, 'visible')
+        return frames, visible
+
     frames = []
     visible = []
     for row in data:
@@ -768,7 +2991,62 @@ def flatten_360(data, match_id, dataframe=True):
                          'visible_area': row['visible_area'],
                          }
         visible.append(frame_visible)
-    if dataframe:
-        frames = pd.DataFrame(frames)
-        visible = pd.DataFrame(visible)
+    return frames, visible
+
+
+def _flatten_360_arrays(data, match_id):
+    """ Flatten the 360 data into arrays. The data can be any iterable, such as a generator."""
+    ids = []
+    num_players = []
+    players = []
+    num_points = []
+    visible_area = []
+    for row in data:
+        ids.append(row['event_uuid'])
+        freeze_frame = row['freeze_frame']
+        num_players.append(len(freeze_frame))
+        for frame in freeze_frame:
+            x, y = frame['location'][:2]
+            players.append((x, y, frame['teammate'], frame['actor'], frame['keeper']))
+        area = row.get('visible_area') or []
+        num_points.append(len(area) // 2)
+        visible_area.extend(area)
+    num_players = np.array(num_players, dtype=np.int64)
+    n_frames = num_players.size
+    max_players = int(num_players.max()) if n_frames > 0 else 0
+    # scatter the players of each frame into the padded array
+    padded = np.full((n_frames, max_players, 5), np.nan, dtype=np.float32)
+    frame_idx = np.repeat(np.arange(n_frames), num_players)
+    starts = np.cumsum(num_players) - num_players
+    player_idx = np.arange(frame_idx.size) - np.repeat(starts, num_players)
+    padded[frame_idx, player_idx] = np.array(players, dtype=np.float32).reshape(-1, 5)
+    visible_offsets = np.zeros(n_frames + 1, dtype=np.int64)
+    np.cumsum(num_points, out=visible_offsets[1:])
+    return FrameArrays(match_id=match_id, id=np.array(ids, dtype=object),
+                       num_players=num_players, players=padded,
+                       visible_area=np.array(visible_area, dtype=np.float32).reshape(-1, 2),
+                       visible_offsets=visible_offsets)
+
+
+def _flatten_360_columns(data, match_id):
+    """ Flatten the 360 data straight into columns (dictionaries of lists) in the same order
+    as flatten_360(dataframe=False). The data can be any iterable, such as a generator."""
+    frames = {}
+    visible = {'match_id': [], 'id': [], 'visible_area': []}
+    num_frames = 0
+    for row in data:
+        event_id = row['event_uuid']
+        for frame in row['freeze_frame']:
+            flat = {key: value for key, value in frame.items() if key != 'location'}
+            flat['match_id'] = match_id
+            flat['id'] = event_id
+            _flatten_location(flat, frame['location'])
+            _append_columns(frames, flat, num_frames)
+            num_frames += 1
+        visible['match_id'].append(match_id)
+        visible['id'].append(event_id)
+        visible['visible_area'].append(row['visible_area'])
+    _fill_columns(frames, num_frames)
+    if len(visible['id']) == 0:  # no columns, as for a dataframe from an empty list
+        visible = {}
     return frames, visible
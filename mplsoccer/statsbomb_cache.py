@@ -0,0 +1,390 @@
+"""`mplsoccer.statsbomb_cache` is a python module for caching the StatsBomb responses on disk
+and the flattened results in memory."""
+
+import copy
+import dataclasses
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+__all__ = ['set_memory_cache', 'clear_memory_cache', 'memory_cache_info']
+
+
+class _ResponseCache:
+    """ A persistent on-disk cache of raw HTTP responses keyed by the request url.
+
+    Each response is stored as two files named after the sha256 hash of the url:
+    ``<hash>.body`` with the raw response content and ``<hash>.meta`` with the url, the time
+    it was fetched and the ETag/ Last-Modified validators. The modification time of the
+    body file records when the entry was last used, which is used to evict the
+    least-recently-used entries when the cache is larger than max_bytes.
+
+    Parameters
+    ----------
+    cache_dir : str
+        The directory to store the cached responses. It is created if it does not exist.
+    ttl : float, default None
+        The number of seconds a cached response is considered fresh. Stale responses
+        are revalidated with the server using the ETag/ Last-Modified headers.
+        If None, cached responses never expire.
+    max_bytes : int, default None
+        The maximum size of the cache in bytes. If None, the cache size is unbounded.
+    """
+
+    def __init__(self, cache_dir, ttl=None, max_bytes=None):
+        if ttl is not None and ttl < 0:
+            raise ValueError('ttl must be None or a non-negative number of seconds')
+        if max_bytes is not None and max_bytes < 0:
+            raise ValueError('max_bytes must be None or a non-negative number of bytes')
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url, user=None):
+        """ Get the body and metadata paths for a url (and user for authenticated requests)."""
+        if user is not None:
+            url = f'{url}\n{user}'
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        path = os.path.join(self.cache_dir, key)
+        return f'{path}.body', f'{path}.meta'
+
+    def _write(self, path, content):
+        """ Write the content to a temporary file and move it into place
+        so readers never see a partially written file."""
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as file:
+            file.write(content)
+        os.replace(file.name, path)
+
+    @staticmethod
+    def _read_meta(meta_path):
+        """ Read the metadata for a cached response or None if it is missing."""
+        try:
+            with open(meta_path, encoding='utf-8') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _read_body(self, body_path):
+        """ Read the cached response content and mark it as recently used."""
+        with open(body_path, 'rb') as file:
+            content = file.read()
+        os.utime(body_path)
+        return content
+
+    def get(self, url, fetch, user=None):
+        """ Get the response content for a url, fetching it if it is not cached or is stale.
+
+        Parameters
+        ----------
+        url : str
+        fetch : callable
+            Called as fetch(url, headers) to make the HTTP request.
+            It should return a requests.Response.
+        user : str, default None
+            The username for authenticated requests, so the responses for
+            different credentials are cached separately.
+
+        Returns
+        -------
+        content : bytes
+        status : str
+            Where the content came from: 'disk', 'revalidated' (from disk after the server
+            confirmed it is unchanged) or 'network'.
+        """
+        body_path, meta_path = self._paths(url, user)
+        meta = self._read_meta(meta_path)
+        headers = {}
+        if meta is not None and os.path.exists(body_path):
+            if self.ttl is None or (time.time() - meta['fetched']) < self.ttl:
+                try:
+                    return self._read_body(body_path), 'disk'
+                except FileNotFoundError:  # evicted by another process since the check
+                    meta = None
+            if meta is not None and meta.get('etag') is not None:
+                headers['If-None-Match'] = meta['etag']
+            if meta is not None and meta.get('last_modified') is not None:
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        resp = fetch(url, headers)
+        if resp.status_code == 304 and meta is not None:
+            try:
+                content = self._read_body(body_path)
+            except FileNotFoundError:
+                # the entry was evicted while revalidating, so fetch it again in full
+                return self.get(url, fetch, user)
+            meta['fetched'] = time.time()
+            self._write(meta_path, json.dumps(meta).encode('utf-8'))
+            return content, 'revalidated'
+        resp.raise_for_status()
+
+        content = resp.content
+        meta = {'url': url,
+                'fetched': time.time(),
+                'etag': resp.headers.get('ETag'),
+                'last_modified': resp.headers.get('Last-Modified'),
+                }
+        self._write(body_path, content)
+        self._write(meta_path, json.dumps(meta).encode('utf-8'))
+        self.evict()
+        return content, 'network'
+
+    def size(self):
+        """ The total size of the cached responses in bytes."""
+        return sum(size for _, _, size in self._entries())
+
+    def _entries(self):
+        """ List the cached entries as (last used time, key path, size in bytes)."""
+        entries = []
+        for filename in os.listdir(self.cache_dir):
+            if not filename.endswith('.body'):
+                continue
+            path = os.path.join(self.cache_dir, filename[:-5])
+            try:
+                body_stat = os.stat(f'{path}.body')
+                meta_size = os.path.getsize(f'{path}.meta')
+            except FileNotFoundError:
+                continue
+            entries.append((body_stat.st_mtime, path, body_stat.st_size + meta_size))
+        return entries
+
+    def evict(self):
+        """ Remove the least-recently-used entries until the cache is within max_bytes."""
+        if self.max_bytes is None:
+            return
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            for suffix in ['.body', '.meta']:
+                try:
+                    os.remove(f'{path}{suffix}')
+                except FileNotFoundError:
+                    pass
+            total -= size
+
+    def clear(self):
+        """ Remove all the cached responses."""
+        for _, path, _ in self._entries():
+            for suffix in ['.body', '.meta']:
+                try:
+                    os.remove(f'{path}{suffix}')
+                except FileNotFoundError:
+                    pass
+
+
+def _create_cache(cache_dir, ttl, max_bytes):
+    """ Create a response cache if a cache directory is given."""
+    if cache_dir is None:
+        return None
+    return _ResponseCache(cache_dir, ttl=ttl, max_bytes=max_bytes)
+
+
+def _freeze(value):
+    """ Convert the lists/ sets in a memory cache key to tuples so the key is hashable."""
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _copy_on_write():
+    """ Whether pandas copies shared data on write, so shallow copies of dataframes are safe."""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    try:
+        return pd.get_option('mode.copy_on_write') is True
+    except (KeyError, pd.errors.OptionError):
+        return False
+
+
+def _dataclass_arrays(result):
+    """ The numpy arrays in a dataclass result, e.g. a FrameArrays."""
+    values = (getattr(result, field.name) for field in dataclasses.fields(result))
+    return [value for value in values if isinstance(value, np.ndarray)]
+
+
+def _read_only(result):
+    """ Make the numpy arrays in a result read-only before it is cached."""
+    if isinstance(result, tuple):
+        return tuple(_read_only(item) for item in result)
+    if isinstance(result, np.ndarray):
+        result.flags.writeable = False
+    elif isinstance(result, dict):
+        for array in result.values():
+            array.flags.writeable = False
+    elif dataclasses.is_dataclass(result):
+        for array in _dataclass_arrays(result):
+            array.flags.writeable = False
+    return result
+
+
+def _share(result):
+    """ Get a copy of a cached result that the caller can change without changing the cache.
+    The dataframes are shallow copies if pandas copies on write (otherwise deep copies),
+    the lists of dictionaries are deep copies and the numpy arrays are read-only."""
+    if isinstance(result, tuple):
+        return tuple(_share(item) for item in result)
+    if isinstance(result, pd.DataFrame):
+        return result.copy(deep=not _copy_on_write())
+    if isinstance(result, list):
+        return copy.deepcopy(result)
+    if isinstance(result, dict):
+        return dict(result)
+    if dataclasses.is_dataclass(result):
+        return dataclasses.replace(result)
+    return result
+
+
+def _result_size(result):
+    """ The approximate size of a result in bytes."""
+    if isinstance(result, tuple):
+        return sum(_result_size(item) for item in result)
+    if isinstance(result, pd.DataFrame):
+        return int(result.memory_usage(index=True, deep=True).sum())
+    if isinstance(result, np.ndarray):
+        return result.nbytes
+    if isinstance(result, dict):
+        return sum(array.nbytes for array in result.values())
+    if dataclasses.is_dataclass(result):
+        return sum(array.nbytes for array in _dataclass_arrays(result))
+    if isinstance(result, list):
+        return sum(sys.getsizeof(row) for row in result)
+    return 0
+
+
+class _MemoryCache:
+    """ A process-wide in-memory LRU cache of the flattened results, shared by all the
+    Sbopen and Sbapi instances. The cache is disabled if max_bytes is 0.
+
+    Each entry is stored with its endpoint (e.g. 'events') and match_id, so the entries
+    can be invalidated by endpoint and/ or match. The results are stored as they are
+    flattened, and each call gets its own copy (see _share).
+    """
+
+    def __init__(self, max_bytes=0):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (result, size, endpoint, match_id)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, endpoint, match_id, load):
+        """ Get the result for the key, calling load() and caching its result if missing.
+        Returns (result, whether it came from the cache)."""
+        if self.max_bytes <= 0:
+            return load(), False
+        key = _freeze(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _share(entry[0]), True
+            self.misses += 1
+        result = _read_only(load())
+        size = _result_size(result)
+        with self._lock:
+            if size <= self.max_bytes:
+                self._remove(key)
+                self._entries[key] = (result, size, endpoint, match_id)
+                self._size += size
+                self._evict()
+        return _share(result), False
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self, endpoint=None, match_id=None):
+        with self._lock:
+            for key, (_, _, entry_endpoint, entry_match_id) in list(self._entries.items()):
+                if endpoint is not None and entry_endpoint != endpoint:
+                    continue
+                if match_id is not None and entry_match_id != match_id:
+                    continue
+                self._remove(key)
+
+    def info(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries),
+                    'bytes': self._size, 'max_bytes': self.max_bytes}
+
+
+_MEMORY_CACHE = _MemoryCache()
+
+
+def set_memory_cache(max_bytes):
+    """ Enable the process-wide in-memory cache of the StatsBomb results.
+
+    The cache is shared by all the Sbopen and Sbapi instances in the process, so the same
+    competitions, matches, events, lineups and 360 data are only downloaded and flattened
+    once, even by different parser instances. The entries are keyed by the url (endpoint,
+    version and ids) and the options used to flatten them, and the least-recently-used
+    entries are evicted when the cache is larger than max_bytes. The cached results cannot
+    be changed by the callers: each call returns a copy of the dataframes (a shallow copy
+    if pandas copies on write) or lists, and the numpy arrays are read-only.
+
+    Parameters
+    ----------
+    max_bytes : int
+        The maximum size of the cache in bytes. Use 0 to disable the cache (the default).
+
+    Examples
+    --------
+    >>> from mplsoccer import Sbopen
+    >>> from mplsoccer import set_memory_cache
+    >>> set_memory_cache(512 * 1024 ** 2)
+    >>> events = Sbopen().event(3788741)[0]
+    >>> events = Sbopen().event(3788741)[0]  # from the memory cache
+    """
+    if max_bytes < 0:
+        raise ValueError('max_bytes must not be negative')
+    _MEMORY_CACHE.resize(max_bytes)
+
+
+def clear_memory_cache(endpoint=None, match_id=None):
+    """ Remove entries from the process-wide in-memory cache, see ``set_memory_cache``.
+
+    Parameters
+    ----------
+    endpoint : str, default None
+        Only remove the entries for this endpoint: 'competitions', 'matches', 'events',
+        'lineups' or 'three-sixty'. The default None removes the entries for every endpoint.
+    match_id : int, default None
+        Only remove the entries for this match. The default None removes the entries
+        for every match.
+
+    Examples
+    --------
+    >>> from mplsoccer import clear_memory_cache
+    >>> clear_memory_cache(endpoint='events', match_id=3788741)
+    """
+    _MEMORY_CACHE.clear(endpoint=endpoint, match_id=match_id)
+
+
+def memory_cache_info():
+    """ Get the hits, misses, number of entries, size in bytes and max_bytes of
+    the process-wide in-memory cache as a dictionary, see ``set_memory_cache``."""
+    return _MEMORY_CACHE.info()
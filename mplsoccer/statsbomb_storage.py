@@ -0,0 +1,905 @@
+"""`mplsoccer.statsbomb_storage` is a python module for storing and indexing the flattened
+StatsBomb data on disk."""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .statsbomb import _EVENT_TABLES, _NAN, _TABLE_SCHEMAS
+
+__all__ = ['Sbarrow', 'Sbstore', 'Sbcatalog', 'SyncSummary']
+
+
+def _write_json(path, data):
+    """ Write the data to a JSON file atomically (write a temporary file and then rename it)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False,
+                                     encoding='utf-8', suffix='.tmp') as file:
+        json.dump(data, file)
+    os.replace(file.name, path)
+
+
+def _isoformat(timestamp):
+    """ Format a timestamp from the match data as a string (None if it is missing)."""
+    if timestamp is None or pd.isnull(timestamp):
+        return None
+    return pd.Timestamp(timestamp).isoformat()
+
+
+@dataclass
+class SyncSummary:
+    """ Dataclass for the Sbarrow.sync results (lists of match identifiers)."""
+    added: List[int] = field(default_factory=list)
+    updated: List[int] = field(default_factory=list)
+    updated_360: List[int] = field(default_factory=list)
+    unchanged: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    failed: List[int] = field(default_factory=list)
+
+
+def _import_pyarrow():
+    """ Import pyarrow, which is an optional dependency only needed for Sbarrow."""
+    try:
+        # pylint: disable=import-outside-toplevel
+        import pyarrow
+        import pyarrow.feather
+        import pyarrow.parquet
+    except ImportError as err:
+        raise ImportError('Sbarrow requires pyarrow. Install it with: pip install pyarrow') from err
+    return pyarrow
+
+
+def _to_arrow_table(pa, df, schema):
+    """ Convert a dataframe to an Arrow table with the columns and types in the schema.
+    Columns missing from the dataframe are filled with nulls and any columns
+    not in the schema are kept at the end with their types inferred."""
+    types = {'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_(), 'str': pa.string(),
+             'time': pa.time64('us'), 'float_list': pa.list_(pa.float64())}
+    names = []
+    arrays = []
+    for name, kind in schema.items():
+        if name in df.columns and kind == 'time' and df[name].dtype != object:
+            # timestamps stored as seconds or timedelta64 keep their own type
+            arrays.append(pa.array(df[name], from_pandas=True))
+        elif name in df.columns:
+            arrays.append(pa.array(df[name], type=types[kind], from_pandas=True))
+        else:
+            arrays.append(pa.nulls(len(df), type=types[kind]))
+        names.append(name)
+    for name in df.columns:
+        if name not in schema:
+            arrays.append(pa.array(df[name], from_pandas=True))
+            names.append(name)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+class Sbarrow:
+    """ Class for storing flattened StatsBomb data as Parquet or Feather files and loading
+    it back without parsing the JSON again.
+
+    The tables are stored as directory/{table}/{match_id}.{file_format}, where the tables are
+    events, related, freeze, tactics, lineups, frames and visible. Each table is written with
+    the same columns and types for every match, so the files for different matches can be
+    read and combined consistently. This requires pyarrow.
+
+    Parameters
+    ----------
+    directory : str
+        The directory the tables are stored in.
+    file_format : str, default 'parquet'
+        The file format: 'parquet' or 'feather'.
+    dataframe : bool, default True
+        Whether to return dataframes (True) or pyarrow Tables (False) from the class methods.
+    compression : str, default None
+        The compression used when writing the files. The default None uses 'snappy' for parquet
+        and 'uncompressed' for feather, so that memory-mapped feather files are read
+        without copying.
+
+    Examples
+    --------
+    >>> from mplsoccer import Sbopen, Sbarrow
+    >>> parser = Sbopen()
+    >>> store = Sbarrow('statsbomb', file_format='feather')
+    >>> store.write_event(3788741, *parser.event(3788741))
+    >>> events, related, freeze, tactics = store.event(3788741, columns=['type_name', 'x', 'y'])
+    """
+
+    def __init__(self, directory, file_format='parquet', dataframe=True, compression=None):
+        if file_format not in ['parquet', 'feather']:
+            raise ValueError("file_format must be one of 'parquet' or 'feather'")
+        self._pa = _import_pyarrow()
+        self.directory = directory
+        self.file_format = file_format
+        self.dataframe = dataframe
+        if compression is None:
+            compression = 'snappy' if file_format == 'parquet' else 'uncompressed'
+        self.compression = compression
+
+    def _path(self, table, match_id):
+        return os.path.join(self.directory, table, f'{match_id}.{self.file_format}')
+
+    def _write(self, table, match_id, df):
+        """ Write a dataframe with the table's schema. The file is written to a temporary
+        file first and then renamed so readers never see a partially written file.
+        None (no results) is written as an empty table."""
+        if df is None:
+            df = pd.DataFrame()
+        arrow_table = _to_arrow_table(self._pa, df, _TABLE_SCHEMAS[table])
+        path = self._path(table, match_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        os.close(handle)
+        try:
+            if self.file_format == 'parquet':
+                self._pa.parquet.write_table(arrow_table, tmp_path, compression=self.compression)
+            else:
+                self._pa.feather.write_feather(arrow_table, tmp_path,
+                                               compression=self.compression)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def _read(self, table, match_id, columns=None):
+        """ Read a table memory-mapped, only loading the columns requested."""
+        path = self._path(table, match_id)
+        if self.file_format == 'parquet':
+            result = self._pa.parquet.read_table(path, columns=columns, memory_map=True)
+        else:
+            result = self._pa.feather.read_table(path, columns=columns, memory_map=True)
+        if not self.dataframe:
+            return result
+        df = result.to_pandas()
+        # the flattened bool columns use NaN rather than None for the missing values
+        schema = _TABLE_SCHEMAS[table]
+        for name in df.columns:
+            if schema.get(name) == 'bool' and df[name].dtype == object:
+                df[name] = df[name].where(df[name].notna(), _NAN)
+        return df
+
+    def write_event(self, match_id, events, related, freeze, tactics):
+        """ Write the event dataframes, e.g. from Sbopen.event or Sblocal.event.
+
+        Parameters
+        ----------
+        match_id : int
+            The StatsBomb match identifier.
+        events, related, freeze, tactics : pandas.DataFrame
+            The dataframes returned by the event methods.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbopen, Sbarrow
+        >>> store = Sbarrow('statsbomb')
+        >>> store.write_event(3788741, *Sbopen().event(3788741))
+        """
+        for table, df in zip(_EVENT_TABLES, [events, related, freeze, tactics]):
+            self._write(table, match_id, df)
+
+    def write_lineup(self, match_id, lineup):
+        """ Write the lineup dataframe, e.g. from Sbopen.lineup or Sblocal.lineup.
+
+        Parameters
+        ----------
+        match_id : int
+            The StatsBomb match identifier.
+        lineup : pandas.DataFrame
+            The dataframe returned by the lineup methods.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbopen, Sbarrow
+        >>> store = Sbarrow('statsbomb')
+        >>> store.write_lineup(3788741, Sbopen().lineup(3788741))
+        """
+        self._write('lineups', match_id, lineup)
+
+    def write_frame(self, match_id, frames, visible):
+        """ Write the 360 dataframes, e.g. from Sbopen.frame or Sblocal.frame.
+
+        Parameters
+        ----------
+        match_id : int
+            The StatsBomb match identifier.
+        frames, visible : pandas.DataFrame
+            The dataframes returned by the frame methods.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbopen, Sbarrow
+        >>> store = Sbarrow('statsbomb')
+        >>> store.write_frame(3788741, *Sbopen().frame(3788741))
+        """
+        self._write('frames', match_id, frames)
+        self._write('visible', match_id, visible)
+
+    def event(self, match_id, columns=None):
+        """ Read the event data.
+
+        Parameters
+        ----------
+        match_id : int
+            The StatsBomb match identifier.
+        columns : list of str, default None
+            The columns of the events to read. The default None reads all the columns.
+
+        Returns
+        -------
+        events, related, freeze, tactics
+            Either dataframes or pyarrow Tables.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbarrow
+        >>> store = Sbarrow('statsbomb')
+        >>> events, related, freeze, tactics = store.event(3788741, columns=['x', 'y'])
+        """
+        return (self._read('events', match_id, columns), self._read('related', match_id),
+                self._read('freeze', match_id), self._read('tactics', match_id))
+
+    def lineup(self, match_id, columns=None):
+        """ Read the lineup data.
+
+        Parameters
+        ----------
+        match_id : int
+            The StatsBomb match identifier.
+        columns : list of str, default None
+            The columns to read. The default None reads all the columns.
+
+        Returns
+        -------
+        lineup
+            A dataframe or a pyarrow Table.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbarrow
+        >>> store = Sbarrow('statsbomb')
+        >>> lineup = store.lineup(3788741)
+        """
+        return self._read('lineups', match_id, columns)
+
+    def frame(self, match_id, columns=None):
+        """ Read the 360 data.
+
+        Parameters
+        ----------
+        match_id : int
+            The StatsBomb match identifier.
+        columns : list of str, default None
+            The columns of the frames to read. The default None reads all the columns.
+
+        Returns
+        -------
+        frames, visible
+            Either dataframes or pyarrow Tables.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbarrow
+        >>> store = Sbarrow('statsbomb')
+        >>> frames, visible = store.frame(3788741, columns=['id', 'x', 'y'])
+        """
+        return self._read('frames', match_id, columns), self._read('visible', match_id)
+
+    def _read_manifest(self):
+        """ Read the last_updated timestamps of the synced matches, keyed by match_id."""
+        path = os.path.join(self.directory, 'manifest.json')
+        if not os.path.isfile(path):
+            return {}
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)['matches']
+
+    def sync(self, parser, competition_id, season_id, lineup=True, frame=True,
+             max_workers=8, processes=None, errors='raise'):
+        """ Sync the matches for a season with the store, only fetching and flattening
+        the matches that are new or whose last_updated/ last_updated_360 have changed.
+
+        The last_updated timestamps of the stored matches are kept in directory/manifest.json.
+        The manifest is updated after each match is written, so an interrupted sync only
+        fetches the matches it did not finish when it is run again. Matches that are no longer
+        in the match list are reported as removed, but are not deleted from the store.
+
+        Parameters
+        ----------
+        parser : Sbopen or Sbapi
+            The parser used to fetch the data. It must return dataframes (dataframe=True).
+        competition_id, season_id : int
+            The StatsBomb competition and season identifiers.
+        lineup : bool, default True
+            Whether to also store the lineups, which are fetched when the events change.
+        frame : bool, default True
+            Whether to also store the 360 data, which is fetched when last_updated_360 changes.
+        max_workers : int, default 8
+            The number of threads used to download the events. See ``Sbopen.events_many``.
+        processes : int, default None
+            The number of processes used to flatten the events. See ``Sbopen.events_many``.
+        errors : str, default 'raise'
+            If 'raise', an error for a match raises a RuntimeError. If 'warn', a warning is
+            issued, the match is reported as failed and it is fetched again on the next sync.
+
+        Returns
+        -------
+        SyncSummary
+            The match identifiers that were added, updated, updated_360 (only the 360 data
+            changed), unchanged, removed, or failed.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbopen, Sbarrow
+        >>> store = Sbarrow('statsbomb')
+        >>> summary = store.sync(Sbopen(), competition_id=11, season_id=90)
+        >>> summary.updated
+        """
+        if errors not in ['raise', 'warn']:
+            raise ValueError("errors must be one of 'raise' or 'warn'")
+        if not parser.dataframe:
+            raise ValueError('The parser must return dataframes (dataframe=True)')
+        manifest = self._read_manifest()
+        summary = SyncSummary()
+        states = {}
+        fetch_events = []
+        fetch_frames = []
+        for match in parser.match(competition_id, season_id).to_dict('records'):
+            match_id = int(match['match_id'])
+            state = manifest.get(str(match_id))
+            last_updated = _isoformat(match.get('last_updated'))
+            last_updated_360 = _isoformat(match.get('last_updated_360'))
+            states[match_id] = {'competition_id': competition_id, 'season_id': season_id,
+                                'last_updated': last_updated,
+                                'last_updated_360': last_updated_360}
+            if state is None:
+                summary.added.append(match_id)
+                state = {'last_updated': None, 'last_updated_360': None}
+            if state['last_updated'] != last_updated:
+                fetch_events.append(match_id)
+                if match_id not in summary.added:
+                    summary.updated.append(match_id)
+            if frame and last_updated_360 is not None and \
+                    state['last_updated_360'] != last_updated_360:
+                fetch_frames.append(match_id)
+                if match_id not in summary.added and match_id not in summary.updated:
+                    summary.updated_360.append(match_id)
+            if match_id not in fetch_events and match_id not in fetch_frames:
+                summary.unchanged.append(match_id)
+        summary.removed = sorted(int(match_id) for match_id, state in manifest.items()
+                                 if state['competition_id'] == competition_id and
+                                 state['season_id'] == season_id and
+                                 int(match_id) not in states)
+
+        def failed(match_id, err):
+            msg = f'Failed to sync match_id={match_id}: {err!r}'
+            if errors == 'raise':
+                raise RuntimeError(msg) from err
+            warnings.warn(msg)
+            summary.failed.append(match_id)
+
+        def done(match_id, key):
+            # record the new timestamp for the data that was written
+            state = manifest.setdefault(str(match_id), {'competition_id': competition_id,
+                                                        'season_id': season_id,
+                                                        'last_updated': None,
+                                                        'last_updated_360': None})
+            state[key] = states[match_id][key]
+            _write_json(os.path.join(self.directory, 'manifest.json'), {'matches': manifest})
+
+        results = parser.events_many(fetch_events, max_workers=max_workers,
+                                     processes=processes, concat=False, errors=errors)
+        loaded = set()
+        for match_id, result in results:
+            loaded.add(match_id)
+            try:
+                self.write_event(match_id, *result)
+                if lineup:
+                    self.write_lineup(match_id, parser.lineup(match_id))
+            except Exception as err:  # pylint: disable=broad-except
+                failed(match_id, err)
+                continue
+            done(match_id, 'last_updated')
+        # events_many has already warned about the events that failed to load
+        summary.failed.extend(match_id for match_id in fetch_events if match_id not in loaded)
+        for match_id in fetch_frames:
+            if match_id in summary.failed:
+                continue
+            try:
+                self.write_frame(match_id, *parser.frame(match_id))
+            except Exception as err:  # pylint: disable=broad-except
+                failed(match_id, err)
+                continue
+            done(match_id, 'last_updated_360')
+        return summary
+
+
+def _codes_dtype(num_categories):
+    """ Get the smallest integer dtype for dictionary codes, which is the dtype pandas uses
+    for the categorical codes so they are not copied."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if num_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _encode_column(column):
+    """ Encode a column as a fixed-width numpy array. Strings are dictionary-encoded as
+    (codes, categories) with the code -1 for missing values. Returns None for columns that
+    cannot be stored with a fixed width, e.g. lists."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        categories = [str(category) for category in column.cat.categories]
+        codes = column.cat.codes.to_numpy().astype(_codes_dtype(len(categories)))
+        return codes, categories
+    if pd.api.types.is_extension_array_dtype(column.dtype) and not pd.api.types.is_string_dtype(
+            column.dtype):
+        # nullable integers/ booleans are stored as floats if they have missing values
+        if column.hasnans:
+            return column.to_numpy(dtype=np.float64, na_value=np.nan), None
+        return column.to_numpy(dtype=column.dtype.numpy_dtype), None
+    if column.dtype != object and not pd.api.types.is_string_dtype(column.dtype):
+        return column.to_numpy(), None
+    kind = pd.api.types.infer_dtype(column, skipna=True)
+    if kind in ['string', 'empty']:
+        codes, categories = pd.factorize(column, sort=True)
+        return codes.astype(_codes_dtype(len(categories))), [str(value) for value in categories]
+    if kind in ['boolean', 'integer', 'floating', 'mixed-integer-float']:
+        # e.g. the flattened bool columns with NaN for the missing values
+        return column.astype(np.float64).to_numpy(), None
+    if kind == 'time':
+        return pd.to_timedelta(column.astype(str).where(column.notna())).to_numpy(), None
+    return None
+
+
+class Sbstore:
+    """ Class for storing the flattened StatsBomb data for many matches in one columnar store
+    of memory-mapped numpy (.npy) files.
+
+    Each column is stored as a fixed-width array with the rows grouped by match, so the rows
+    of match i are rows offsets[i]:offsets[i + 1]. Strings are dictionary-encoded as integer
+    codes, which are returned as pandas categoricals. Slicing a match returns views of the
+    memory-mapped files without copying, and the selections by team or event type use an
+    index of the rows for each value so only the selected rows are read. Processes opening
+    the same store share the pages in the operating system's cache rather than each holding
+    its own copy, and a pickled Sbstore (e.g. sent to a process pool) only contains
+    the directory.
+
+    Nullable integer/ boolean columns with missing values are stored as floats, timestamps
+    stored as datetime.time are stored as timedelta64, and columns that do not have a fixed
+    width (e.g. lists) are not stored.
+
+    Parameters
+    ----------
+    directory : str
+        The directory the store is saved in.
+    dataframe : bool, default True
+        Whether to return dataframes (True) or dictionaries of numpy arrays (False) from the
+        class methods. The dictionaries contain the integer codes for the dictionary-encoded
+        columns, see ``Sbstore.categories``.
+
+    Examples
+    --------
+    >>> from mplsoccer import Sbopen, Sbstore
+    >>> parser = Sbopen(timestamp='seconds')
+    >>> matches = parser.match(competition_id=2, season_id=44)
+    >>> events, related, freeze, tactics = parser.events_many(matches.match_id)
+    >>> store = Sbstore('premier_league_2003')
+    >>> store.write(events)
+    >>> passes = store.select(team_name='Arsenal', type_name='Pass', columns=['x', 'y'])
+    """
+
+    def __init__(self, directory, dataframe=True):
+        self.directory = directory
+        self.dataframe = dataframe
+        self._meta = None
+        self._arrays = {}
+
+    def __getstate__(self):
+        return {'directory': self.directory, 'dataframe': self.dataframe}
+
+    def __setstate__(self, state):
+        self.__init__(state['directory'], dataframe=state['dataframe'])
+
+    def _load_meta(self):
+        if self._meta is None:
+            with open(os.path.join(self.directory, 'store.json'), encoding='utf-8') as file:
+                self._meta = json.load(file)
+        return self._meta
+
+    def _path(self, *names):
+        return os.path.join(self.directory, self._load_meta()['generation'], *names)
+
+    def _array(self, name, folder='columns'):
+        """ Open a column (or a row index) memory-mapped."""
+        key = (folder, name)
+        if key not in self._arrays:
+            path = self._path(folder, f'{name}.npy')
+            try:
+                self._arrays[key] = np.load(path, mmap_mode='r')
+            except ValueError:
+                # empty arrays cannot be memory-mapped
+                self._arrays[key] = np.load(path)
+        return self._arrays[key]
+
+    def write(self, events, index=('type_name', 'team_name')):
+        """ Write a dataframe with a match_id column, e.g. the concatenated events from
+        Sbopen.events_many, replacing the current contents of the store.
+
+        The files are written to a new sub-directory and the store only switches to them once
+        they are all written, so readers never see a partially written store.
+
+        Parameters
+        ----------
+        events : pandas.DataFrame
+            The flattened data for one or more matches.
+        index : tuple of str, default ('type_name', 'team_name')
+            The string columns to index for fast selections. Columns missing from
+            the dataframe are ignored.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbopen, Sbstore
+        >>> events, related, freeze, tactics = Sbopen().events_many([3788741, 3788742])
+        >>> Sbstore('statsbomb_store').write(events)
+        """
+        match_codes, match_ids = pd.factorize(events['match_id'])
+        if (match_codes == -1).any():
+            raise ValueError('match_id must not have missing values')
+        order = np.argsort(match_codes, kind='stable')
+        events = events.iloc[order]
+        offsets = np.zeros(len(match_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(match_codes, minlength=len(match_ids)), out=offsets[1:])
+        generation = f'{time.time_ns():x}'
+        folder = os.path.join(self.directory, generation)
+        os.makedirs(os.path.join(folder, 'columns'))
+        os.makedirs(os.path.join(folder, 'index'))
+        columns = {}
+        skipped = []
+        for name in events.columns:
+            encoded = _encode_column(events[name])
+            if encoded is None:
+                skipped.append(name)
+                continue
+            values, categories = encoded
+            np.save(os.path.join(folder, 'columns', f'{name}.npy'), values)
+            columns[name] = {'dtype': str(values.dtype), 'categories': categories}
+        if len(skipped) > 0:
+            warnings.warn(f'Columns without a fixed width are not stored: {skipped}')
+        indexes = {}
+        for name in index:
+            if name not in columns or columns[name]['categories'] is None:
+                continue
+            codes = np.load(os.path.join(folder, 'columns', f'{name}.npy'))
+            rows = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes + 1, minlength=len(columns[name]['categories']) + 1)
+            # the rows with missing values (code -1) are left out of the index
+            np.save(os.path.join(folder, 'index', f'{name}.npy'), rows[counts[0]:])
+            indexes[name] = np.concatenate([[0], np.cumsum(counts[1:])]).tolist()
+        old_generation = None
+        if os.path.exists(os.path.join(self.directory, 'store.json')):
+            old_generation = self._load_meta()['generation']
+        _write_json(os.path.join(self.directory, 'store.json'),
+                    {'generation': generation, 'match_ids': match_ids.tolist(),
+                     'offsets': offsets.tolist(), 'columns': columns, 'indexes': indexes})
+        self._meta = None
+        self._arrays = {}
+        if old_generation is not None and old_generation != generation:
+            # readers with the old files open keep them until they are closed
+            shutil.rmtree(os.path.join(self.directory, old_generation), ignore_errors=True)
+
+    @property
+    def match_ids(self):
+        """ The match identifiers in the order they are stored."""
+        return np.asarray(self._load_meta()['match_ids'])
+
+    @property
+    def offsets(self):
+        """ The row offsets of the matches (n_matches + 1,). The rows of the match at position
+        i in match_ids are rows offsets[i]:offsets[i + 1]."""
+        return np.asarray(self._load_meta()['offsets'])
+
+    @property
+    def columns(self):
+        """ The names of the stored columns."""
+        return list(self._load_meta()['columns'])
+
+    def __len__(self):
+        return self._load_meta()['offsets'][-1]
+
+    def categories(self, name):
+        """ Get the values of a dictionary-encoded column, i.e. the code i is the value
+        categories[i] and the code -1 is a missing value. Returns None for other columns."""
+        return self._column_meta(name)['categories']
+
+    def _column_meta(self, name):
+        columns = self._load_meta()['columns']
+        if name not in columns:
+            raise ValueError(f'Unknown column: {name}')
+        return columns[name]
+
+    def _match_rows(self, match_id):
+        meta = self._load_meta()
+        try:
+            position = meta['match_ids'].index(match_id)
+        except ValueError as err:
+            raise KeyError(f'match_id={match_id} is not in the store') from err
+        return slice(meta['offsets'][position], meta['offsets'][position + 1])
+
+    def _take(self, rows, columns):
+        """ Get the rows (a slice or an array of row numbers) of the columns."""
+        if columns is None:
+            columns = self.columns
+        result = {}
+        for name in columns:
+            categories = self._column_meta(name)['categories']
+            values = self._array(name)[rows]
+            if self.dataframe and categories is not None:
+                values = pd.Categorical.from_codes(values, categories=categories)
+            result[name] = values
+        if not self.dataframe:
+            return result
+        return pd.DataFrame(result, copy=False)
+
+    def _condition_rows(self, name, values):
+        """ Get the sorted row numbers where the column is one of the values."""
+        if not isinstance(values, (list, tuple, set, np.ndarray, pd.Series)):
+            values = [values]
+        categories = self._column_meta(name)['categories']
+        if categories is None:
+            return np.flatnonzero(np.isin(self._array(name), list(values)))
+        codes = [categories.index(value) for value in values if value in categories]
+        offsets = self._load_meta()['indexes'].get(name)
+        if offsets is None:
+            return np.flatnonzero(np.isin(self._array(name), codes))
+        rows = self._array(name, folder='index')
+        return np.sort(np.concatenate([np.asarray(rows[offsets[code]:offsets[code + 1]])
+                                       for code in codes] + [np.empty(0, dtype=np.int64)]))
+
+    def match(self, match_id, columns=None):
+        """ Get the rows for one match. These are views of the memory-mapped files,
+        so they are not copied.
+
+        Parameters
+        ----------
+        match_id : int
+            The StatsBomb match identifier.
+        columns : list of str, default None
+            The columns to return. The default None returns all the columns.
+
+        Returns
+        -------
+        pandas.DataFrame or dict of numpy.ndarray
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbstore
+        >>> events = Sbstore('statsbomb_store').match(3788741, columns=['type_name', 'x', 'y'])
+        """
+        return self._take(self._match_rows(match_id), columns)
+
+    def select(self, match_ids=None, columns=None, **conditions):
+        """ Get the rows for some matches and/ or the rows where columns have certain values.
+
+        Parameters
+        ----------
+        match_ids : sequence of int, default None
+            The matches to select. The default None selects all the matches.
+        columns : list of str, default None
+            The columns to return. The default None returns all the columns.
+        **conditions
+            The values to select for each column, either a single value or a list of values,
+            e.g. team_name='Arsenal' or type_name=['Pass', 'Carry']. The indexed columns
+            only read the rows that are selected.
+
+        Returns
+        -------
+        pandas.DataFrame or dict of numpy.ndarray
+            The rows in the order they are stored. A single match without any conditions
+            is not copied, see ``Sbstore.match``.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbstore
+        >>> store = Sbstore('statsbomb_store')
+        >>> shots = store.select(match_ids=[3788741, 3788742], type_name='Shot')
+        """
+        rows = None
+        if match_ids is not None:
+            slices = [self._match_rows(match_id) for match_id in match_ids]
+            if len(slices) == 1 and len(conditions) == 0:
+                return self._take(slices[0], columns)
+            rows = np.sort(np.concatenate([np.arange(rows.start, rows.stop) for rows in slices]
+                                          + [np.empty(0, dtype=np.int64)]))
+        for name, values in conditions.items():
+            condition_rows = self._condition_rows(name, values)
+            rows = condition_rows if rows is None else np.intersect1d(rows, condition_rows,
+                                                                      assume_unique=True)
+        if rows is None:
+            rows = slice(None)
+        return self._take(rows, columns)
+
+
+def _catalog_match(match):
+    """ Get the fields of a match for the catalog index."""
+    competition = match.get('competition', {})
+    season = match.get('season', {})
+    home_team = match.get('home_team', {})
+    away_team = match.get('away_team', {})
+    return {'match_id': match['match_id'],
+            'competition_id': competition.get('competition_id'),
+            'competition_name': competition.get('competition_name'),
+            'country_name': competition.get('country_name'),
+            'season_id': season.get('season_id'),
+            'season_name': season.get('season_name'),
+            'match_date': match.get('match_date'),
+            'kick_off': match.get('kick_off'),
+            'home_team_id': home_team.get('home_team_id'),
+            'home_team_name': home_team.get('home_team_name'),
+            'away_team_id': away_team.get('away_team_id'),
+            'away_team_name': away_team.get('away_team_name'),
+            'home_score': match.get('home_score'),
+            'away_score': match.get('away_score'),
+            'match_status': match.get('match_status'),
+            'match_status_360': match.get('match_status_360'),
+            'last_updated': match.get('last_updated'),
+            'last_updated_360': match.get('last_updated_360'),
+            }
+
+
+def _scan_files(directory):
+    """ Get the size and modification time of the files in a directory, keyed by file name."""
+    if not os.path.isdir(directory):
+        return {}
+    with os.scandir(directory) as entries:
+        return {entry.name: entry.stat() for entry in entries if entry.is_file()}
+
+
+class Sbcatalog:
+    """ Class for indexing a local copy of the StatsBomb open-data.
+
+    The index has a row for each match in the matches files, with the competition, season,
+    teams and dates, whether the 360 data exists, and the paths, sizes and modification times
+    of the event, lineup and 360 files. The index is saved to a JSON file and when it is
+    updated only the matches files that have changed since the last update are read again.
+
+    Parameters
+    ----------
+    root : str
+        The data directory of the open-data, which contains the matches, events, lineups
+        and three-sixty directories.
+    index_path : str, default None
+        The file the index is saved to. If None, uses mplsoccer_catalog.json in the root.
+
+    Attributes
+    ----------
+    index : pandas.DataFrame
+        The index with a row for each match.
+
+    Examples
+    --------
+    >>> from mplsoccer import Sbcatalog, Sblocal
+    >>> catalog = Sbcatalog('open-data/data')
+    >>> matches = catalog.filter(competition_id=11, has_360=True)
+    >>> parser = Sblocal()
+    >>> events = [parser.event(path) for path in matches.event_path]
+    """
+
+    def __init__(self, root, index_path=None):
+        self.root = root
+        if index_path is None:
+            index_path = os.path.join(root, 'mplsoccer_catalog.json')
+        self.index_path = index_path
+        self._files = {}
+        self._matches = {}
+        if os.path.isfile(index_path):
+            with open(index_path, encoding='utf-8') as file:
+                saved = json.load(file)
+            self._files = saved['files']
+            self._matches = saved['matches']
+        self.index = None
+        self.update()
+
+    def update(self):
+        """ Update the index, reading the matches files that are new or have changed.
+
+        Returns
+        -------
+        changed : list of str
+            The matches files (relative to the root) that were read.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbcatalog
+        >>> catalog = Sbcatalog('open-data/data')
+        >>> changed = catalog.update()
+        """
+        files = {}
+        changed = []
+        matches_dir = os.path.join(self.root, 'matches')
+        if os.path.isdir(matches_dir):
+            for competition in sorted(os.listdir(matches_dir)):
+                stats = _scan_files(os.path.join(matches_dir, competition))
+                for name, stat in sorted(stats.items()):
+                    if not name.endswith('.json'):
+                        continue
+                    rel_path = f'matches/{competition}/{name}'
+                    files[rel_path] = [stat.st_mtime_ns, stat.st_size]
+                    if self._files.get(rel_path) != files[rel_path]:
+                        changed.append(rel_path)
+        for rel_path in changed:
+            with open(os.path.join(self.root, rel_path), encoding='utf-8') as file:
+                self._matches[rel_path] = [_catalog_match(match) for match in json.load(file)]
+        for rel_path in set(self._matches) - set(files):
+            del self._matches[rel_path]
+        index_changed = len(changed) > 0 or files.keys() != self._files.keys()
+        self._files = files
+        if index_changed or not os.path.isfile(self.index_path):
+            self._save()
+        self.index = self._build_index()
+        return changed
+
+    def _save(self):
+        """ Save the index."""
+        _write_json(self.index_path, {'files': self._files, 'matches': self._matches})
+
+    def _build_index(self):
+        """ Build the index dataframe with the current sizes and modification times
+        of the event, lineup and 360 files."""
+        rows = [match for matches in self._matches.values() for match in matches]
+        df = pd.DataFrame(rows, columns=list(_catalog_match({'match_id': None})))
+        for prefix, directory in [('event', 'events'), ('lineup', 'lineups'),
+                                  ('frame', 'three-sixty')]:
+            stats = _scan_files(os.path.join(self.root, directory))
+            names = [f'{match_id}.json' for match_id in df['match_id']]
+            df[f'{prefix}_path'] = [os.path.join(self.root, directory, name) if name in stats
+                                    else None for name in names]
+            df[f'{prefix}_size'] = [stats[name].st_size if name in stats else None
+                                    for name in names]
+            df[f'{prefix}_mtime'] = pd.to_datetime([stats[name].st_mtime if name in stats
+                                                    else None for name in names], unit='s')
+        df['has_360'] = df['frame_path'].notnull()
+        df['match_date'] = pd.to_datetime(df['match_date'])
+        for date in ['last_updated', 'last_updated_360']:
+            if pd.__version__ < '2':
+                df[date] = pd.to_datetime(df[date])
+            else:
+                df[date] = pd.to_datetime(df[date], format='ISO8601')
+        df.sort_values(['competition_id', 'season_id', 'match_date', 'match_id'],
+                       inplace=True)
+        df.reset_index(drop=True, inplace=True)
+        return df
+
+    def filter(self, **conditions):
+        """ Filter the index.
+
+        Parameters
+        ----------
+        **conditions
+            Column names of the index and the value (or a list of values) to keep.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The rows of the index that match all the conditions.
+
+        Examples
+        --------
+        >>> from mplsoccer import Sbcatalog
+        >>> catalog = Sbcatalog('open-data/data')
+        >>> matches = catalog.filter(competition_id=[11, 16], has_360=True)
+        """
+        mask = pd.Series(True, index=self.index.index)
+        for column, value in conditions.items():
+            if column not in self.index.columns:
+                raise ValueError(f'{column} is not a column of the index')
+            if isinstance(value, (list, tuple, set)):
+                mask &= self.index[column].isin(value)
+            else:
+                mask &= self.index[column] == value
+        return self.index[mask]
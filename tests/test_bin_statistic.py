@@ -1,9 +1,14 @@
 """ Test the bin statistic methods for binning data on the pitch."""
 
+import warnings
+from functools import partial
+
 import numpy as np
 import pandas as pd
+import pytest
+from scipy.stats import circmean
 
-from mplsoccer import Pitch
+from mplsoccer import Pitch, VerticalPitch
 from mplsoccer.dimensions import valid, size_varies
 
 
@@ -92,3 +97,113 @@ def test_bin_statistic_positional_xedge():
                               size=x.size)
         stats = pitch.bin_statistic_positional(x, y)
         assert np.array([stat["statistic"].sum() for stat in stats]).sum() == 9000000
+
+
+def test_bincount_statistics_match_scipy():
+    """ Test the statistics calculated with numpy.bincount match the scipy callables,
+    including the points on the bin edges and outside the pitch."""
+    scipy_statistics = {'count': len, 'sum': np.nansum, 'mean': np.nanmean, 'std': np.nanstd,
+                        'min': np.nanmin, 'max': np.nanmax,
+                        'circmean': partial(circmean, nan_policy='omit'),
+                        circmean: lambda values: circmean(values)}
+    for pitch_type in valid:
+        if pitch_type in size_varies:
+            kwargs = {'pitch_length': 105, 'pitch_width': 68}
+        else:
+            kwargs = {}
+        pitch = VerticalPitch(pitch_type=pitch_type, **kwargs)
+        extent = pitch.dim.pitch_extent
+        x = np.random.uniform(low=extent[0] - 5, high=extent[1] + 5, size=2000)
+        y = np.random.uniform(low=min(extent[2:]) - 5, high=max(extent[2:]) + 5, size=2000)
+        x[:len(pitch.dim.x_markings_sorted)] = pitch.dim.x_markings_sorted
+        y[-len(pitch.dim.y_markings_sorted):] = pitch.dim.y_markings_sorted
+        values = np.random.uniform(low=0, high=2 * np.pi, size=2000)
+        values[::10] = np.nan
+        for statistic, scipy_statistic in scipy_statistics.items():
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                expected = pitch.bin_statistic(x, y, values, statistic=scipy_statistic,
+                                               bins=(6, 5))
+            stats = pitch.bin_statistic(x, y, values, statistic=statistic, bins=(6, 5))
+            np.testing.assert_allclose(stats['statistic'], expected['statistic'], rtol=1e-10)
+            assert (stats['binnumber'] == expected['binnumber']).all()
+            assert (stats['inside'] == expected['inside']).all()
+
+
+def test_bin_statistic_multiple():
+    """ Test several statistics calculated at once match calculating them one at a time."""
+    pitch = Pitch()
+    x = np.random.uniform(low=0, high=120, size=5000)
+    y = np.random.uniform(low=0, high=80, size=5000)
+    values = {'mean': np.random.normal(size=5000), 'median': np.random.normal(size=5000),
+              'circmean': np.random.uniform(low=0, high=2 * np.pi, size=5000)}
+    statistic = {'count': 'count', 'mean': 'mean', 'median': 'median', 'circmean': 'circmean'}
+    stats = pitch.bin_statistic(x, y, values=values, statistic=statistic, bins=(6, 5))
+    for name, name_statistic in statistic.items():
+        expected = pitch.bin_statistic(x, y, values=values.get(name), statistic=name_statistic,
+                                       bins=(6, 5))
+        np.testing.assert_allclose(stats[name]['statistic'], expected['statistic'])
+        assert (stats[name]['binnumber'] == expected['binnumber']).all()
+    assert stats['count']['binnumber'] is stats['mean']['binnumber']
+
+
+def test_bin_index():
+    """ Test the BinIndex results match bin_statistic for all the points and a subset."""
+    pitch = VerticalPitch(pitch_type='opta')
+    x = np.random.uniform(low=-5, high=105, size=5000)
+    y = np.random.uniform(low=-5, high=105, size=5000)
+    values = np.random.normal(size=5000)
+    index = pitch.bin_index(x, y, bins=(6, 5))
+    for statistic in ['count', 'mean', 'median']:
+        stats = index.reduce(values, statistic=statistic)
+        expected = pitch.bin_statistic(x, y, values, statistic=statistic, bins=(6, 5))
+        np.testing.assert_allclose(stats['statistic'], expected['statistic'])
+        assert (stats['binnumber'] == expected['binnumber']).all()
+        assert (stats['inside'] == expected['inside']).all()
+    resample = np.random.randint(0, 5000, size=5000)
+    stats = index.subset(resample).reduce(values[resample], statistic='mean')
+    expected = pitch.bin_statistic(x[resample], y[resample], values[resample], statistic='mean',
+                                   bins=(6, 5))
+    np.testing.assert_allclose(stats['statistic'], expected['statistic'])
+    assert (index.count()['statistic'] == pitch.bin_statistic(x, y, bins=(6, 5))['statistic']).all()
+    with pytest.raises(ValueError, match="invalid statistic 'meann'"):
+        index.reduce(values, statistic='meann')
+
+
+def test_bin_statistic_groups():
+    """ Test the grouped statistics match calculating the statistic for each group."""
+    pitch = Pitch()
+    x = np.random.uniform(low=0, high=120, size=5000)
+    y = np.random.uniform(low=0, high=80, size=5000)
+    values = np.random.normal(size=5000)
+    groups = np.random.choice([3, 1, 2], size=5000)
+    for statistic in ['count', 'mean', 'median']:
+        stats = pitch.bin_statistic(x, y, values, statistic=statistic, bins=(6, 4),
+                                    normalize=True, groups=groups)
+        assert stats['statistic'].shape == (3, 4, 6)
+        assert (stats['groups'] == [1, 2, 3]).all()
+        for group, group_statistic in zip(stats['groups'], stats['statistic']):
+            mask = groups == group
+            expected = pitch.bin_statistic(x[mask], y[mask], values[mask], statistic=statistic,
+                                           bins=(6, 4), normalize=True)
+            np.testing.assert_allclose(group_statistic, expected['statistic'])
+
+
+def test_bin_accumulator():
+    """ Test merging the accumulators for chunks of points matches binning all the points."""
+    pitch = VerticalPitch()
+    x = np.random.uniform(low=-5, high=125, size=10000)
+    y = np.random.uniform(low=-5, high=85, size=10000)
+    values = np.random.uniform(low=0, high=2 * np.pi, size=10000)
+    values[::10] = np.nan
+    accumulators = [pitch.bin_accumulator(bins=(6, 4)).update(x[i:i + 2500], y[i:i + 2500],
+                                                              values[i:i + 2500])
+                    for i in range(0, 10000, 2500)]
+    accumulator = accumulators[0]
+    for other in accumulators[1:]:
+        accumulator.merge(other)
+    for statistic in ['count', 'sum', 'mean', 'std', 'min', 'max', 'circmean']:
+        stats = accumulator.result(statistic)
+        expected = pitch.bin_statistic(x, y, values, statistic=statistic, bins=(6, 4))
+        np.testing.assert_allclose(stats['statistic'], expected['statistic'])
+        np.testing.assert_allclose(stats['cy'], expected['cy'])
@@ -0,0 +1,752 @@
+""" Test the StatsBomb loaders against the bundled fixture data and a local HTTP stand-in."""
+
+import asyncio
+import copy
+import gzip
+import hashlib
+import io
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from mplsoccer import (Sbopen, Sbapi, Sblocal, Sbarrow, Sbstore, Sbcatalog, AsyncSbopen,
+                       AsyncSbapi)
+from mplsoccer.statsbomb import (create_session, flatten_event, set_memory_cache,
+                                  clear_memory_cache, memory_cache_info, add_load_hook,
+                                  remove_load_hook, LoadStats, _event_dataframe,
+                                  _related_dataframe, _iter_json_array, _compact_dataframe)
+
+DATA = os.path.join(os.path.dirname(__file__), 'data', 'statsbomb')
+MATCH_ID = 7478
+
+
+class StandInServer:
+    """ A local HTTP server that serves the fixture data like the StatsBomb open-data,
+    with ETag validation, and records the requests it receives."""
+
+    def __init__(self, root=DATA):
+        self.root = root
+        self.requests = []
+        self.clients = []
+        self.overrides = {}
+        self.failures = {}
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                server.clients.append(self.client_address)
+                path = self.path.lstrip('/')
+                if server.failures.get(path, 0) > 0:
+                    server.failures[path] -= 1
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                content = server.content(self.path)
+                if content is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                etag = f'"{hashlib.md5(content).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(content)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}/'
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def content(self, path):
+        """ Get the content for a request path (open-data or API style urls)."""
+        path = path.lstrip('/')
+        if path in self.overrides:
+            return self.overrides[path]
+        parts = path.split('/')
+        if parts[0] == 'api':  # e.g. api/v6/events/7478
+            endpoint = parts[2:]
+            mapping = {'events': 'events', 'lineups': 'lineups', '360-frames': 'three-sixty'}
+            if endpoint[0] in mapping:
+                path = f'{mapping[endpoint[0]]}/{endpoint[1]}.json'
+            elif endpoint[0] == 'competitions' and len(endpoint) == 1:
+                path = 'competitions.json'
+            else:  # competitions/11/seasons/1/matches
+                path = f'matches/{endpoint[1]}/{endpoint[3]}.json'
+        file_path = os.path.join(self.root, path)
+        if not os.path.isfile(file_path):
+            return None
+        with open(file_path, 'rb') as file:
+            return file.read()
+
+    def count(self, fragment):
+        """ The number of requests with a path containing fragment."""
+        return sum(fragment in path for path, _ in self.requests)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    stand_in = StandInServer()
+    yield stand_in
+    stand_in.close()
+
+
+def open_parser(server, **kwargs):
+    parser = Sbopen(**kwargs)
+    parser.url = server.url
+    return parser
+
+
+def test_cache_hit_and_miss(server, tmp_path):
+    """ Test the second request for the same url is served from the disk cache."""
+    parser = open_parser(server, cache_dir=str(tmp_path))
+    events1 = parser.event(MATCH_ID)[0]
+    events2 = parser.event(MATCH_ID)[0]
+    assert server.count('events/') == 1
+    assert events1.equals(events2)
+    # a new parser using the same directory also hits the cache
+    open_parser(server, cache_dir=str(tmp_path)).event(MATCH_ID)
+    assert server.count('events/') == 1
+    parser.lineup(MATCH_ID)
+    assert server.count('lineups/') == 1
+
+
+def test_cache_revalidation(server, tmp_path):
+    """ Test stale responses are revalidated with the ETag and refreshed when changed."""
+    parser = open_parser(server, cache_dir=str(tmp_path), ttl=0)
+    matches = parser.match(11, 1)
+    matches_cached = parser.match(11, 1)
+    assert server.count('matches/') == 2
+    path, headers = server.requests[-1]
+    assert 'If-None-Match' in headers
+    assert matches.equals(matches_cached)
+    # the server data changes so revalidation returns the new content
+    server.overrides['matches/11/1.json'] = server.content('matches/11/1.json').replace(
+        b'"home_score": 2', b'"home_score": 5')
+    assert (parser.match(11, 1)['home_score'] == 5).all()
+
+
+def test_cache_ttl(server, tmp_path):
+    """ Test fresh responses are not revalidated within the ttl."""
+    parser = open_parser(server, cache_dir=str(tmp_path), ttl=60)
+    parser.competition()
+    parser.competition()
+    assert server.count('competitions') == 1
+
+
+def test_cache_eviction(server, tmp_path):
+    """ Test the least-recently-used responses are evicted when over max_bytes."""
+    event_size = os.path.getsize(os.path.join(DATA, 'events', f'{MATCH_ID}.json'))
+    parser = open_parser(server, cache_dir=str(tmp_path), max_bytes=int(event_size * 1.5))
+    parser.event(7478)
+    time.sleep(0.01)
+    parser.event(7479)  # over budget: the least-recently-used 7478 is evicted
+    assert parser.cache.size() <= parser.cache.max_bytes
+    parser.event(7479)
+    assert server.count('events/7479') == 1
+    parser.event(7478)
+    assert server.count('events/7478') == 2
+
+
+def test_api_cache(server, tmp_path):
+    """ Test the API loader uses the same cache."""
+    parser = Sbapi(username='user', password='password', cache_dir=str(tmp_path))
+    parser.url = f'{server.url}api/v'
+    events = parser.event(MATCH_ID)[0]
+    parser.event(MATCH_ID)
+    assert server.count('api/v6/events') == 1
+    assert events.match_id.unique().tolist() == [MATCH_ID]
+    assert server.requests[0][1]['Authorization'].startswith('Basic')
+    # other credentials sharing the cache directory do not get the cached responses
+    other = Sbapi(username='other', password='password', cache_dir=str(tmp_path))
+    other.url = f'{server.url}api/v'
+    other.event(MATCH_ID)
+    other.event(MATCH_ID)
+    assert server.count('api/v6/events') == 2
+
+
+def test_memory_cache(server):
+    """ Test the memory cache is shared by parser instances and callers get their own copy."""
+    set_memory_cache(100 * 1024 ** 2)
+    try:
+        events = open_parser(server).event(MATCH_ID)[0]
+        events.loc[0, 'type_name'] = 'changed'
+        cached = open_parser(server).event(MATCH_ID)[0]
+        assert server.count('events/') == 1
+        assert cached.loc[0, 'type_name'] != 'changed'
+        arrays = open_parser(server, dataframe='numpy').event(MATCH_ID)[0]
+        with pytest.raises(ValueError):
+            arrays['x'][0] = 0
+        # a different projection is a different entry
+        open_parser(server).event(MATCH_ID, columns=['x'])
+        assert server.count('events/') == 3
+        open_parser(server).lineup(MATCH_ID)
+        clear_memory_cache(endpoint='events', match_id=MATCH_ID)
+        open_parser(server).event(MATCH_ID)
+        open_parser(server).lineup(MATCH_ID)
+        assert server.count('events/') == 4 and server.count('lineups/') == 1
+        info = memory_cache_info()
+        assert info['hits'] >= 2 and 0 < info['bytes'] <= info['max_bytes']
+    finally:
+        set_memory_cache(0)
+        clear_memory_cache()
+
+
+def test_load_hooks(server, tmp_path):
+    """ Test the hooks get a record for each call with the cache status and stage times."""
+    records = []
+    stats = LoadStats()
+    add_load_hook(records.append, trace_memory=True)
+    add_load_hook(stats)
+    try:
+        parser = open_parser(server, cache_dir=str(tmp_path))
+        parser.event(MATCH_ID)
+        parser.event(MATCH_ID)
+        Sblocal().lineup(os.path.join(DATA, 'lineups', f'{MATCH_ID}.json'))
+    finally:
+        remove_load_hook(records.append)
+        remove_load_hook(stats)
+    parser.event(MATCH_ID)
+    assert [record.cache for record in records] == ['network', 'disk', 'file']
+    event_size = os.path.getsize(os.path.join(DATA, 'events', f'{MATCH_ID}.json'))
+    for record in records[:2]:
+        assert record.endpoint == 'events' and record.match_id == MATCH_ID
+        assert record.num_bytes == event_size and record.num_rows == 91
+        assert record.peak_memory > 0
+        stages = record.fetch_time + record.parse_time + record.flatten_time + \
+            record.dataframe_time
+        assert 0 < stages <= record.total_time
+    totals = stats.as_dict()
+    assert totals['events']['calls'] == 2 and totals['events']['cache_hits'] == 1
+    assert totals['lineups']['num_rows'] == 22
+
+
+def test_session_keep_alive(server):
+    """ Test the requests reuse the same pooled connection."""
+    parser = open_parser(server)
+    parser.lineup(7478)
+    parser.lineup(7479)
+    parser.competition()
+    assert len(set(server.clients)) == 1
+    assert 'gzip' in server.requests[0][1]['Accept-Encoding']
+
+
+def test_session_retry(server):
+    """ Test that 5xx responses are retried and the error is raised once retries run out."""
+    server.failures['lineups/7478.json'] = 2
+    parser = open_parser(server, retries=2, backoff_factor=0)
+    lineup = parser.lineup(7478)
+    assert server.count('lineups/7478') == 3
+    assert len(lineup) == 22
+    server.failures['lineups/7479.json'] = 3
+    with pytest.raises(requests.HTTPError):
+        parser.lineup(7479)
+
+
+def test_shared_session(server):
+    """ Test loaders can share one session."""
+    session = create_session(pool_size=2, retries=0)
+    parser1 = open_parser(server, session=session)
+    parser2 = Sbapi(username='user', password='password', session=session)
+    parser2.url = f'{server.url}api/v'
+    parser1.competition()
+    parser2.competition()
+    assert parser1.session is parser2.session
+    assert len(set(server.clients)) == 1
+
+
+def test_events_many(server):
+    """ Test loading many matches gives the same results, in order, as loading them one by one."""
+    parser = open_parser(server)
+    match_ids = [7479, 7478]
+    events, related, freeze, tactics = parser.events_many(match_ids, max_workers=2, processes=2)
+    assert events.match_id.unique().tolist() == match_ids
+    expected = [parser.event(match_id) for match_id in match_ids]
+    for idx, result in enumerate([events, related, freeze, tactics]):
+        expected_result = pd.concat([match[idx] for match in expected], ignore_index=True)
+        pd.testing.assert_frame_equal(result, expected_result)
+    # a projected load only flattens the requested columns, types and results
+    columns = ['match_id', 'type_name', 'x', 'y']
+    events, related, freeze, tactics = parser.events_many(match_ids, processes=0,
+                                                          columns=columns, types=['Pass'],
+                                                          include=('events',))
+    assert related is None and freeze is None and tactics is None
+    expected = pd.concat([parser.event(match_id, columns=columns, types=['Pass'])[0]
+                          for match_id in match_ids], ignore_index=True)
+    pd.testing.assert_frame_equal(events, expected)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 50, 182, 1000])
+def test_iter_events(server, chunk_size):
+    """ Test the event batches have chunk_size rows and concatenate to the same events."""
+    columns = ['match_id', 'id', 'type_name', 'x', 'y']
+    match_ids = [7479, 7478]
+    expected = pd.concat([Sblocal().event(os.path.join(DATA, 'events', f'{match_id}.json'),
+                                          columns=columns)[0] for match_id in match_ids],
+                         ignore_index=True)
+    paths = [os.path.join(DATA, 'events', f'{match_id}.json') for match_id in match_ids]
+    batches = list(Sblocal(stream=True).iter_events(paths, chunk_size=chunk_size,
+                                                     columns=columns))
+    assert [len(batch) for batch in batches[:-1]] == [chunk_size] * (len(batches) - 1)
+    assert 0 < len(batches[-1]) <= chunk_size
+    pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), expected)
+    batches = list(open_parser(server).iter_events(match_ids, chunk_size=chunk_size,
+                                                   columns=columns, arrays=True))
+    np.testing.assert_array_equal(np.concatenate([batch['x'] for batch in batches]),
+                                  expected.x.to_numpy())
+
+
+def test_events_many_generator_errors(server):
+    """ Test the generator yields in order and reports failed matches."""
+    parser = open_parser(server, retries=0)
+    results = parser.events_many([7478, 1, 7479], processes=0, concat=False, errors='warn')
+    with pytest.warns(UserWarning, match='match_id=1'):
+        loaded = [match_id for match_id, _ in results]
+    assert loaded == [7478, 7479]
+    with pytest.raises(RuntimeError, match='match_id=1'):
+        parser.events_many([7478, 1, 7479], processes=0)
+
+
+def test_async_open(server):
+    """ Test the asyncio loader gives the same results as the blocking loader."""
+    pytest.importorskip('aiohttp')
+
+    async def load():
+        async with AsyncSbopen(max_concurrency=2) as parser:
+            parser.url = server.url
+            return await asyncio.gather(parser.event(7478), parser.event(7479),
+                                        parser.lineup(7478), parser.match(11, 1),
+                                        parser.competition(), parser.frame(7478))
+
+    results = asyncio.run(load())
+    parser = open_parser(server)
+    expected = [parser.event(7478), parser.event(7479), parser.lineup(7478),
+                parser.match(11, 1), parser.competition(), parser.frame(7478)]
+    for result, expected_result in zip(results, expected):
+        if isinstance(result, tuple):
+            for df, expected_df in zip(result, expected_result):
+                pd.testing.assert_frame_equal(df, expected_df)
+        else:
+            pd.testing.assert_frame_equal(result, expected_result)
+
+
+def test_async_api(server):
+    """ Test the asyncio API loader authenticates and raises for missing data."""
+    aiohttp = pytest.importorskip('aiohttp')
+
+    async def load():
+        async with AsyncSbapi(username='user', password='password') as parser:
+            parser.url = f'{server.url}api/v'
+            events = await parser.event(7478)
+            with pytest.raises(aiohttp.ClientResponseError):
+                await parser.event(1)
+            return events
+
+    events = asyncio.run(load())[0]
+    assert events.match_id.unique().tolist() == [7478]
+    assert server.requests[0][1]['Authorization'].startswith('Basic')
+
+
+@pytest.mark.parametrize('match_id', [7478, 7479])
+def test_flatten_event_columns(match_id):
+    """ Test the columnar flatten gives the same dataframes as flattening to dictionaries."""
+    data = Sblocal._get_data(os.path.join(DATA, 'events', f'{match_id}.json'))
+    result = flatten_event(copy.deepcopy(data), match_id, dataframe=True)
+    events, related, freeze, tactics = flatten_event(copy.deepcopy(data), match_id,
+                                                     dataframe=False)
+    events = _event_dataframe(events)
+    expected = [events, _related_dataframe(related, events),
+                pd.DataFrame(freeze), pd.DataFrame(tactics)]
+    for df, expected_df in zip(result, expected):
+        pd.testing.assert_frame_equal(df, expected_df)
+
+
+@pytest.mark.parametrize('types', [None, ['Pass', 'Shot'], ['Ball Receipt', 'Starting XI']])
+def test_event_projection(types):
+    """ Test the column projection and type filtering give the same results as filtering
+    the full results."""
+    path = os.path.join(DATA, 'events', f'{MATCH_ID}.json')
+    parser = Sblocal()
+    columns = ['type_name', 'x', 'y', 'end_x', 'end_y', 'player_id', 'technique_name',
+               'outcome_name', 'not_a_column']
+    result = parser.event(path, columns=columns, types=types)
+    expected = parser.event(path)
+    events = expected[0]
+    if types is not None:
+        events = events[events.type_name.isin(types)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(result[0], events.reindex(columns=columns), check_dtype=False)
+    for df, expected_df in zip(result[1:], expected[1:]):
+        expected_df = expected_df[expected_df.id.isin(events.id)]
+        if len(expected_df) == 0:
+            assert len(df) == 0
+            continue
+        pd.testing.assert_frame_equal(df.reset_index(drop=True),
+                                      expected_df.reset_index(drop=True), check_dtype=False)
+    # the list of dictionaries are filtered the same way
+    events_list = Sblocal(dataframe=False).event(path, columns=columns, types=types)[0]
+    assert [row['type_name'] for row in events_list] == events.type_name.tolist()
+    events, related, freeze, tactics = parser.event(path, types=types, include=('events',))
+    assert related is None and freeze is None and tactics is None
+    with pytest.raises(ValueError):
+        parser.event(path, include=('events', 'lineup'))
+    # a projection without type_name
+    data = Sblocal._get_data(path)
+    events = flatten_event(data, MATCH_ID, dataframe=True, columns=['x', 'y', 'player_id'])[0]
+    assert list(events.columns) == ['x', 'y', 'player_id']
+    pd.testing.assert_frame_equal(events, expected[0][['x', 'y', 'player_id']],
+                                  check_dtype=False)
+
+
+def test_timestamp_and_related():
+    """ Test the timestamp types give the same ordering and the related events
+    are related both ways for carries."""
+    path = os.path.join(DATA, 'events', f'{MATCH_ID}.json')
+    events, related, _, _ = Sblocal().event(path)
+    seconds = Sblocal(timestamp='seconds').event(path)[0]
+    timedelta = Sblocal(timestamp='timedelta').event(path)[0]
+    assert seconds.timestamp.dtype == np.float64
+    assert pd.api.types.is_timedelta64_dtype(timedelta.timestamp)
+    pd.testing.assert_series_equal(seconds.id, events.id)
+    expected = [t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
+                for t in events.timestamp]
+    np.testing.assert_allclose(seconds.timestamp, expected)
+    np.testing.assert_allclose(timedelta.timestamp.dt.total_seconds(), expected)
+    with pytest.raises(ValueError):
+        Sblocal(timestamp='datetime').event(path)
+    pairs = set(zip(related.id, related.id_related))
+    carries = related[related.type_name == 'Carry']
+    assert all((id_related, id_) in pairs
+               for id_, id_related in zip(carries.id, carries.id_related))
+    assert not related.duplicated(['id', 'id_related']).any()
+
+
+def test_sync(server, tmp_path):
+    """ Test the sync only fetches the new and updated matches."""
+    pytest.importorskip('pyarrow')
+    parser = open_parser(server, retries=0)
+    store = Sbarrow(str(tmp_path))
+    summary = store.sync(parser, 11, 1, processes=0)
+    assert summary.added == [7478, 7479]
+    assert server.count('three-sixty/') == 1  # 7479 has no 360 data
+    pd.testing.assert_frame_equal(store.lineup(7479), parser.lineup(7479))
+    # nothing has changed
+    num_requests = len(server.requests)
+    summary = store.sync(parser, 11, 1, processes=0)
+    assert summary.unchanged == [7478, 7479]
+    assert len(server.requests) == num_requests + 1  # only the match list
+    # the events of one match and the 360 data of the other are updated
+    matches = json.loads(server.content('matches/11/1.json'))
+    matches[0]['last_updated_360'] = '2024-01-01T00:00:00'
+    matches[1]['last_updated'] = '2024-01-01T00:00:00'
+    server.overrides['matches/11/1.json'] = json.dumps(matches).encode('utf-8')
+    summary = store.sync(parser, 11, 1, processes=0)
+    assert (summary.updated, summary.updated_360) == ([7479], [7478])
+    assert server.count('events/7479') == 2 and server.count('events/7478') == 1
+    assert server.count('three-sixty/7478') == 2
+    # a failed match is fetched again on the next sync
+    matches[1]['last_updated'] = '2024-02-01T00:00:00'
+    server.overrides['matches/11/1.json'] = json.dumps(matches).encode('utf-8')
+    server.failures['events/7479.json'] = 1
+    with pytest.warns(UserWarning, match='match_id=7479'):
+        summary = store.sync(parser, 11, 1, processes=0, errors='warn')
+    assert summary.failed == [7479]
+    assert store.sync(parser, 11, 1, processes=0).updated == [7479]
+    # removed matches are reported
+    server.overrides['matches/11/1.json'] = json.dumps(matches[:1]).encode('utf-8')
+    assert store.sync(parser, 11, 1, processes=0).removed == [7479]
+
+
+def test_catalog(tmp_path):
+    """ Test the catalog indexes the matches and only reads the changed matches files."""
+    root = str(tmp_path / 'data')
+    shutil.copytree(DATA, root)
+    catalog = Sbcatalog(root)
+    assert catalog.index.match_id.tolist() == [7478, 7479]
+    assert catalog.filter(has_360=True).match_id.tolist() == [7478]
+    assert catalog.filter(competition_id=[11, 16], season_id=1).shape[0] == 2
+    assert os.path.getsize(catalog.index.event_path[0]) == catalog.index.event_size[0]
+    # a new catalog loads the saved index without reading the matches files again
+    catalog = Sbcatalog(root)
+    assert catalog.update() == []
+    # the 360 data is checked on every update
+    shutil.copy(os.path.join(root, 'three-sixty', '7478.json'),
+                os.path.join(root, 'three-sixty', '7479.json'))
+    assert catalog.update() == []
+    assert catalog.index.has_360.all()
+    # a changed matches file is read again
+    path = os.path.join(root, 'matches', '11', '1.json')
+    with open(path, encoding='utf-8') as file:
+        matches = json.load(file)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(matches[:1], file)
+    assert catalog.update() == ['matches/11/1.json']
+    assert catalog.index.match_id.tolist() == [7478]
+    with pytest.raises(ValueError):
+        catalog.filter(not_a_column=1)
+
+
+def test_frame_arrays():
+    """ Test the 360 arrays have the same players and visible areas as the dataframes."""
+    path = os.path.join(DATA, 'three-sixty', f'{MATCH_ID}.json')
+    frames, visible = Sblocal().frame(path)
+    result = Sblocal().frame(path, arrays=True)
+    counts = frames.groupby('id', sort=False).size()
+    assert result.id.tolist() == visible.id.tolist()
+    assert result.num_players.tolist() == counts.reindex(result.id, fill_value=0).tolist()
+    assert result.players.shape == (len(visible), counts.max(), 5)
+    assert result.players.dtype == np.float32
+    mask = np.arange(result.players.shape[1]) < result.num_players[:, np.newaxis]
+    players = result.players[mask]
+    assert np.isnan(result.players[~mask]).all()
+    expected = frames[['x', 'y', 'teammate', 'actor', 'keeper']].to_numpy(dtype=np.float32)
+    np.testing.assert_array_equal(players, expected)
+    for idx, area in enumerate(visible.visible_area):
+        np.testing.assert_allclose(result.visible_polygon(idx).ravel(), area, rtol=1e-6)
+    result_stream = Sblocal(stream=True, dataframe=False).frame(path, arrays=True)
+    np.testing.assert_array_equal(result_stream.players, result.players)
+
+
+def test_local_stream():
+    """ Test streaming the local files gives the same results as loading them in one go."""
+    event_path = os.path.join(DATA, 'events', f'{MATCH_ID}.json')
+    frame_path = os.path.join(DATA, 'three-sixty', f'{MATCH_ID}.json')
+    parser = Sblocal()
+    parser_stream = Sblocal(stream=True)
+    for df, expected_df in zip(parser_stream.event(event_path), parser.event(event_path)):
+        pd.testing.assert_frame_equal(df, expected_df)
+    for df, expected_df in zip(parser_stream.frame(frame_path), parser.frame(frame_path)):
+        pd.testing.assert_frame_equal(df, expected_df)
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_local_compressed(tmp_path, stream):
+    """ Test the gzip, zstandard and zip files load the same as the plain JSON files."""
+    with open(os.path.join(DATA, 'events', f'{MATCH_ID}.json'), 'rb') as file:
+        content = file.read()
+    gz_path = tmp_path / f'{MATCH_ID}.json.gz'
+    gz_path.write_bytes(gzip.compress(content))
+    zip_path = tmp_path / 'open-data-master.zip'
+    with zipfile.ZipFile(zip_path, 'w', compression=zipfile.ZIP_DEFLATED) as zip_file:
+        zip_file.writestr(f'open-data-master/data/events/{MATCH_ID}.json', content)
+        zip_file.writestr(f'open-data-master/data/events/{MATCH_ID}.json.gz',
+                          gzip.compress(content))
+    paths = [gz_path, f'{zip_path}/open-data-master/data/events/{MATCH_ID}.json',
+             os.path.join(str(zip_path), 'open-data-master', 'data', 'events',
+                          f'{MATCH_ID}.json.gz')]
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel
+        zst_path = tmp_path / f'{MATCH_ID}.json.zst'
+        zst_path.write_bytes(zstandard.ZstdCompressor().compress(content))
+        paths.append(zst_path)
+    except ImportError:
+        pass
+    parser = Sblocal(stream=stream)
+    expected = parser.event(os.path.join(DATA, 'events', f'{MATCH_ID}.json'))
+    for path in paths:
+        for df, expected_df in zip(parser.event(path), expected):
+            pd.testing.assert_frame_equal(df, expected_df)
+
+
+@pytest.mark.parametrize('dataframe', ['numpy', 'structured'])
+def test_array_output(dataframe):
+    """ Test the numpy outputs have the same columns and values as the dataframes."""
+    expected = Sblocal(timestamp='seconds').event(os.path.join(DATA, 'events',
+                                                               f'{MATCH_ID}.json'))
+    parser = Sblocal(dataframe=dataframe, timestamp='seconds')
+    result = parser.event(os.path.join(DATA, 'events', f'{MATCH_ID}.json'))
+    for arrays, expected_df in zip(result, expected):
+        names = arrays.dtype.names if dataframe == 'structured' else list(arrays)
+        assert list(names) == list(expected_df.columns)
+        assert len(arrays[names[0]]) == len(expected_df)
+        for name in ['x', 'y', 'end_x', 'timestamp', 'under_pressure', 'index_related']:
+            if name in expected_df.columns:
+                np.testing.assert_array_equal(arrays[name], expected_df[name].to_numpy(float))
+        for name in ['id', 'type_name', 'id_related', 'player_name']:
+            if name in expected_df.columns:
+                assert (pd.Series(arrays[name]).fillna('').tolist() ==
+                        expected_df[name].fillna('').tolist())
+    lineup = parser.lineup(os.path.join(DATA, 'lineups', f'{MATCH_ID}.json'))
+    assert lineup['player_id'].tolist() == Sblocal().lineup(
+        os.path.join(DATA, 'lineups', f'{MATCH_ID}.json')).player_id.tolist()
+
+
+@pytest.mark.parametrize('dataframe', ['numpy', 'structured'])
+def test_array_output_empty_frames(tmp_path, dataframe):
+    """ Test an empty 360 file gives no arrays rather than raising an error."""
+    path = tmp_path / f'{MATCH_ID}.json'
+    path.write_text('[]')
+    parser = Sblocal(dataframe=dataframe)
+    assert parser.frame(path) == (None, None)
+    assert parser.frames_many([path], processes=0) == (None, None)
+    frames, visible = parser.frame(os.path.join(DATA, 'three-sixty', f'{MATCH_ID}.json'))
+    expected_frames = Sblocal().frame(os.path.join(DATA, 'three-sixty', f'{MATCH_ID}.json'))[0]
+    np.testing.assert_array_equal(frames['x'], expected_frames.x)
+    assert frames['teammate'].dtype == bool
+
+
+def test_compact():
+    """ Test the compact dataframes have the same values, and the same columns and dtypes
+    for every match so they concatenate without changing the dtypes."""
+    parser = Sblocal()
+    parser_compact = Sblocal(compact=True)
+    results = []
+    for match_id in [7478, 7479]:
+        path = os.path.join(DATA, 'events', f'{match_id}.json')
+        result = parser_compact.event(path)
+        for df, expected_df in zip(result, parser.event(path)):
+            for column in expected_df.columns:
+                values = df[column].astype(object).where(df[column].notna(), None)
+                expected = expected_df[column].astype(object).where(expected_df[column].notna(),
+                                                                     None)
+                if df[column].dtype == 'float32':
+                    assert values.astype(float).round(4).equals(expected.astype(float).round(4))
+                else:
+                    assert values.tolist() == expected.tolist()
+        results.append(result)
+    for idx, df in enumerate(results[0]):
+        concat = pd.concat([df, results[1][idx]], ignore_index=True)
+        assert concat.dtypes.equals(df.dtypes)
+    assert isinstance(results[0][0].type_name.dtype, pd.CategoricalDtype)
+    assert results[0][0].x.dtype == 'float32'
+    frames, _ = parser_compact.frame(os.path.join(DATA, 'three-sixty', f'{MATCH_ID}.json'))
+    assert frames.teammate.dtype == 'boolean'
+    events = parser.event(os.path.join(DATA, 'events', f'{MATCH_ID}.json'))[0]
+    events.loc[0, 'type_name'] = 'New Type'
+    with pytest.warns(UserWarning, match='New Type'):
+        events = _compact_dataframe(events, 'events')
+    assert events.loc[0, 'type_name'] == 'New Type'
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'feather'])
+def test_arrow_round_trip(tmp_path, file_format):
+    """ Test the stored tables load back the same as flattening the JSON, with the same
+    columns for every match."""
+    pytest.importorskip('pyarrow')
+    parser = Sblocal()
+    store = Sbarrow(str(tmp_path), file_format=file_format)
+    columns = []
+    for match_id in [7478, 7479]:
+        expected = parser.event(os.path.join(DATA, 'events', f'{match_id}.json'))
+        store.write_event(match_id, *expected)
+        result = store.event(match_id)
+        for df, expected_df in zip(result, expected):
+            # columns missing from a match are stored as nulls
+            assert df.drop(columns=expected_df.columns).isna().all().all()
+            pd.testing.assert_frame_equal(df[expected_df.columns],
+                                          expected_df.reset_index(drop=True))
+        columns.append([list(df.columns) for df in result])
+    assert columns[0] == columns[1]
+    events = store.event(MATCH_ID, columns=['type_name', 'x', 'y'])[0]
+    assert list(events.columns) == ['type_name', 'x', 'y']
+    lineup = parser.lineup(os.path.join(DATA, 'lineups', f'{MATCH_ID}.json'))
+    store.write_lineup(MATCH_ID, lineup)
+    pd.testing.assert_frame_equal(store.lineup(MATCH_ID), lineup)
+    frames, visible = parser.frame(os.path.join(DATA, 'three-sixty', f'{MATCH_ID}.json'))
+    store.write_frame(MATCH_ID, frames, visible)
+    pd.testing.assert_frame_equal(store.frame(MATCH_ID)[0], frames)
+    visible_result = store.frame(MATCH_ID)[1]
+    assert visible_result.id.tolist() == visible.id.tolist()
+    assert visible_result.visible_area.map(list).tolist() == visible.visible_area.tolist()
+
+
+def test_store(tmp_path):
+    """ Test the multi-match store returns the same values as the flattened events,
+    without copying a match."""
+    parser = Sblocal(timestamp='seconds')
+    events = pd.concat([parser.event(os.path.join(DATA, 'events', f'{match_id}.json'))[0]
+                        for match_id in [7479, 7478]], ignore_index=True)
+    store = Sbstore(str(tmp_path))
+    store.write(events)
+    assert store.match_ids.tolist() == [7479, 7478]
+    assert len(store) == len(events)
+    columns = ['id', 'type_name', 'team_name', 'x', 'y', 'timestamp', 'under_pressure']
+    match = store.match(MATCH_ID, columns=columns)
+    expected = events[events.match_id == MATCH_ID].reset_index(drop=True)
+    pd.testing.assert_frame_equal(match.astype({'id': object, 'type_name': object,
+                                                'team_name': object}),
+                                  expected[columns].astype(object).astype(
+                                      {'x': float, 'y': float, 'timestamp': float,
+                                       'under_pressure': float}))
+    assert np.shares_memory(match['x'].to_numpy(), store._array('x'))
+    team_name = expected.team_name.iloc[0]
+    result = store.select(team_name=team_name, type_name=['Pass', 'Shot'], columns=['id'])
+    mask = (events.team_name == team_name) & events.type_name.isin(['Pass', 'Shot'])
+    assert sorted(result.id.astype(str)) == sorted(events.id[mask])
+    result = store.select(match_ids=[7478], period=2, columns=['id'])
+    assert sorted(result.id.astype(str)) == sorted(expected.id[expected.period == 2])
+    arrays = pickle.loads(pickle.dumps(Sbstore(str(tmp_path), dataframe=False)))
+    codes = arrays.match(MATCH_ID, columns=['type_name'])['type_name']
+    assert [arrays.categories('type_name')[code] for code in codes] == expected.type_name.tolist()
+    with pytest.raises(KeyError):
+        store.match(1)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64])
+def test_iter_json_array(chunk_size):
+    """ Test the incremental JSON parser across chunk boundaries."""
+    data = [{'a': 'x]y,z"\\', 'n': 12345.5e3, 'l': [1, [2, {'b': None}]], 'u': 'é☃'},
+            123456789, True, None, 'str]', [], {}, -0.5, 1e-7]
+    for text in [json.dumps(data, indent=2), json.dumps(data, separators=(',', ':'))]:
+        assert list(_iter_json_array(io.StringIO(text), chunk_size=chunk_size)) == data
+    for invalid in ['', '{}', '[1,', '[1 2]', '[{"a": 1}', '[1.]']:
+        with pytest.raises(ValueError):
+            list(_iter_json_array(io.StringIO(invalid), chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize('processes', [0, 2])
+def test_local_events_many(tmp_path, processes):
+    """ Test the bulk local loader gives the same events as loading the files one at a time."""
+    paths = [os.path.join(DATA, 'events', f'{match_id}.json') for match_id in [7478, 7479]]
+    parser = Sblocal()
+    expected = [pd.concat(frames, ignore_index=True)
+                for frames in zip(*(parser.event(path) for path in paths))]
+    result = parser.events_many(paths, processes=processes)
+    for df, expected_df in zip(result, expected):
+        pd.testing.assert_frame_equal(df, expected_df)
+    compact = Sblocal(compact=True)
+    expected = [pd.concat(frames, ignore_index=True)
+                for frames in zip(*(compact.event(path) for path in paths))]
+    for df, expected_df in zip(compact.events_many(paths, processes=processes), expected):
+        pd.testing.assert_frame_equal(df, expected_df)
+    bad_path = tmp_path / '1.json'
+    bad_path.write_text('{')
+    results = parser.events_many([paths[0], bad_path, paths[1]], processes=processes,
+                                 concat=False, errors='warn')
+    with pytest.warns(UserWarning, match='1.json'):
+        assert [path for path, _ in results] == [paths[0], paths[1]]
+    with pytest.raises(RuntimeError, match='1.json'):
+        parser.events_many([paths[0], bad_path], processes=processes)
+    # the lists of dictionaries with some of the tables left out
+    events, related, freeze, tactics = Sblocal(dataframe=False).events_many(
+        paths, processes=processes, include=('events',))
+    assert len(events) == len(expected[0])
+    assert related is None and freeze is None and tactics is None